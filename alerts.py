@@ -0,0 +1,231 @@
+"""Real-time level-cross alerts.
+
+Each symbol keeps a LevelIndex plus the pair of levels bracketing the last
+price. A tick that stays inside the bracket costs two comparisons; only a
+tick that leaves it does a binary search, and every level it jumped over
+produces an event, so fast moves never skip a level.
+
+Replay a tick file against anchors (same columns as the batch input):
+
+    python alerts.py ticks.csv anchors.csv --touch-ticks 2
+"""
+import argparse
+import collections
+import sys
+import time
+
+import numpy as np
+
+import batch
+import engine
+from level_index import DEFAULT_TICK_SIZE, LevelIndex
+
+AlertEvent = collections.namedtuple('AlertEvent', 'symbol kind level price timestamp')
+
+CROSS_UP = 'cross_up'
+CROSS_DOWN = 'cross_down'
+TOUCH = 'touch'
+TICK_COLUMNS = ('symbol', 'timestamp', 'price')
+
+
+class _SymbolState:
+    """Levels of one symbol and where the last price sits among them."""
+    def __init__(self, tick_size):
+        self.index = LevelIndex(tick_size)
+        self.position = None        # levels counted as below the price
+        self.lower = -np.inf
+        self.upper = np.inf
+        self.touching = None        # (value, anchor id) of the level in the touch band
+
+    def reset(self):
+        self.position = None
+        self.touching = None
+
+    def set_position(self, position):
+        values = self.index.values
+        self.position = position
+        self.lower = values[position - 1] if position else -np.inf
+        self.upper = values[position] if position < len(values) else np.inf
+
+
+class AlertEngine:
+    """Fires subscriber callbacks when ticks cross or touch a level."""
+    def __init__(self, tick_size=DEFAULT_TICK_SIZE, touch_ticks=0):
+        self.tick_size = tick_size
+        self.touch_distance = touch_ticks * tick_size
+        self.symbols = {}
+        self.subscriptions = {}
+        self._next_token = 0
+        self.ticks = 0
+        self.events = 0
+
+    # --- Subscriptions ---
+
+    def subscribe(self, callback, symbols=None, methods=None, kinds=None):
+        """Registers ``callback(event)``; returns a token for unsubscribe.
+
+        ``symbols``, ``methods`` and ``kinds`` restrict which events are
+        delivered; None means all.
+        """
+        token = self._next_token
+        self._next_token += 1
+        self.subscriptions[token] = (
+            callback,
+            frozenset(symbols) if symbols else None,
+            frozenset(methods) if methods else None,
+            frozenset(kinds) if kinds else None,
+        )
+        return token
+
+    def unsubscribe(self, token):
+        self.subscriptions.pop(token, None)
+
+    # --- Levels ---
+
+    def _state(self, symbol):
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = _SymbolState(self.tick_size)
+        return state
+
+    def add_anchor(self, symbol, method, anchor, sentiment=None):
+        """Adds an anchor's levels for ``symbol``; returns the anchor id or None."""
+        state = self._state(symbol)
+        anchor_id = state.index.add_anchor(method, anchor, sentiment)
+        state.reset()
+        return anchor_id
+
+    def remove_anchor(self, symbol, anchor_id):
+        state = self._state(symbol)
+        removed = state.index.remove_anchor(anchor_id)
+        state.reset()
+        return removed
+
+    # --- Ticks ---
+
+    def on_tick(self, symbol, price, timestamp=None):
+        """Processes one tick; returns the number of events fired (none for NaN or infinite prices)."""
+        if not -np.inf < price < np.inf:
+            # A blank or bad price cell reads as NaN, which would sort past every level.
+            return 0
+        self.ticks += 1
+        state = self.symbols.get(symbol)
+        if state is None or not len(state.index):
+            return 0
+
+        if state.position is None:
+            state.set_position(int(np.searchsorted(state.index.values, price)))
+        elif not state.lower < price < state.upper:
+            fired = self._move(symbol, state, price, timestamp)
+            return fired + self._check_touch(symbol, state, price, timestamp)
+        return self._check_touch(symbol, state, price, timestamp)
+
+    def _move(self, symbol, state, price, timestamp):
+        values = state.index.values
+        left = int(np.searchsorted(values, price, side='left'))
+        right = int(np.searchsorted(values, price, side='right'))
+        # A price sitting exactly on levels keeps the side it came from.
+        old = state.position
+        new = min(max(old, left), right)
+        state.set_position(new)
+        if new > old:
+            return self._fire_range(symbol, state, range(old, new), CROSS_UP, price, timestamp)
+        if new < old:
+            return self._fire_range(symbol, state, range(old - 1, new - 1, -1), CROSS_DOWN, price, timestamp)
+        return 0
+
+    def _check_touch(self, symbol, state, price, timestamp):
+        if price - state.lower <= self.touch_distance:
+            i = state.position - 1
+        elif state.upper - price <= self.touch_distance:
+            i = state.position
+        else:
+            state.touching = None
+            return 0
+        key = (state.index.values[i], state.index.anchor_ids[i])
+        if key == state.touching:
+            return 0
+        state.touching = key
+        return self._fire_range(symbol, state, (i,), TOUCH, price, timestamp)
+
+    def _fire_range(self, symbol, state, positions, kind, price, timestamp):
+        fired = 0
+        for i in positions:
+            level = state.index.level_at(i)
+            event = AlertEvent(symbol, kind, level, price, timestamp)
+            for callback, symbols, methods, kinds in tuple(self.subscriptions.values()):
+                if symbols is not None and symbol not in symbols:
+                    continue
+                if methods is not None and level.method not in methods:
+                    continue
+                if kinds is not None and kind not in kinds:
+                    continue
+                callback(event)
+            fired += 1
+        self.events += fired
+        return fired
+
+    def replay(self, path, chunk_size=batch.DEFAULT_CHUNK_SIZE):
+        """Feeds a (symbol, timestamp, price) tick file through on_tick in file order."""
+        on_tick = self.on_tick
+        for chunk in batch.iter_chunks(path, chunk_size, TICK_COLUMNS):
+            for symbol, timestamp, price in zip(chunk['symbol'], chunk['timestamp'], chunk['price'].tolist()):
+                on_tick(symbol, price, timestamp)
+
+
+def load_anchors(alert_engine, path, methods=engine.METHODS):
+    """Adds anchors from a batch-style file: highs anchor bullish levels, lows bearish ones.
+
+    Rows whose high or low is empty, NaN or infinite are skipped.
+    """
+    added = 0
+    for chunk in batch.iter_chunks(path):
+        finite = np.isfinite(chunk['high']) & np.isfinite(chunk['low'])
+        for symbol, high, low in zip(chunk['symbol'][finite], chunk['high'][finite].tolist(),
+                                     chunk['low'][finite].tolist()):
+            for method in methods:
+                if method == 'middle_l':
+                    anchor_ids = [alert_engine.add_anchor(symbol, method, (high, low))]
+                else:
+                    if method in ('gann_box', 'lvl369'):
+                        high_anchor, low_anchor = round(high), round(low)
+                    else:
+                        high_anchor, low_anchor = high, low
+                    anchor_ids = [
+                        alert_engine.add_anchor(symbol, method, high_anchor, 'bullish'),
+                        alert_engine.add_anchor(symbol, method, low_anchor, 'bearish'),
+                    ]
+                added += sum(anchor_id is not None for anchor_id in anchor_ids)
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay ticks and print level alerts.")
+    parser.add_argument('ticks', help="CSV or Parquet file with symbol, timestamp, price")
+    parser.add_argument('anchors', help="CSV or Parquet file with symbol, timestamp, high, low")
+    parser.add_argument('--tick-size', type=float, default=DEFAULT_TICK_SIZE)
+    parser.add_argument('--touch-ticks', type=int, default=0,
+                        help="distance in ticks that counts as touching a level")
+    parser.add_argument('--quiet', action='store_true', help="only print the summary")
+    args = parser.parse_args(argv)
+
+    alert_engine = AlertEngine(args.tick_size, args.touch_ticks)
+    try:
+        anchors = load_anchors(alert_engine, args.anchors)
+        if not args.quiet:
+            alert_engine.subscribe(lambda e: print(
+                f"{e.timestamp} {e.symbol} {e.kind} {e.level.method} {e.level.value:.2f} @ {e.price}"))
+        start = time.perf_counter()
+        alert_engine.replay(args.ticks)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(f"alerts: {e}", file=sys.stderr)
+        return 1
+    rate = alert_engine.ticks / elapsed if elapsed else 0.0
+    print(f"{anchors} anchors, {alert_engine.ticks} ticks, {alert_engine.events} events, "
+          f"{rate:,.0f} ticks/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
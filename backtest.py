@@ -0,0 +1,289 @@
+"""Backtests how price respects the levels.
+
+For every symbol and UTC day the anchors are taken the way the "how to use"
+page prescribes them, the levels are computed with the engine, and the rest
+of the day is scanned for the first bar that reaches each level:
+
+    GANN BOX / 369 LVL  high and low of the first 1h bar
+    REV LVL             high and low of the London session (08:00-16:30 Europe/London)
+    MIDDLE L            high and low of the first 15m bar
+
+Highs anchor the bullish levels and lows the bearish ones. A reached level
+counts as a break when that bar closes through it, otherwise as a rejection.
+Symbol/days are sharded across a process pool:
+
+    python backtest.py bars.csv --workers 16
+    python backtest.py ticks.csv --ticks --json stats.json
+
+Bars need symbol, timestamp, open, high, low, close; ticks need symbol,
+timestamp, price and are folded into 1-minute bars. Rows must be in time
+order within each symbol. Timestamps are ISO-8601 (UTC) or epoch seconds.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+
+import numpy as np
+
+import batch
+import engine
+import level_tables
+import resample
+
+BAR_COLUMNS = ('symbol', 'timestamp', 'open', 'high', 'low', 'close')
+TICK_COLUMNS = ('symbol', 'timestamp', 'price')
+SECONDS_PER_DAY = 86400
+TICK_BAR_SECONDS = 60
+
+# Anchor window of each method, in seconds after 00:00 UTC or as a resample.SESSIONS name.
+ANCHOR_WINDOWS = {
+    'gann_box': (0, 3600),
+    'lvl369': (0, 3600),
+    'rev_lvl': 'london',
+    'middle_l': (0, 900),
+}
+SESSION_FRAMES = {name: resample.SessionFrame(name, *resample.SESSIONS[name]) for name in resample.SESSIONS}
+STAT_FIELDS = ('levels', 'touched', 'rejected', 'broken')
+
+
+# --- Input ---
+
+def parse_timestamps(values):
+    """Converts ISO-8601 strings or epoch seconds to int64 epoch seconds."""
+    try:
+        return np.asarray(values, dtype=np.float64).astype(np.int64)
+    except ValueError:
+        pass
+    cleaned = [v[:-1] if v.endswith('Z') else v for v in values]
+    return np.array(cleaned, dtype='datetime64[s]').astype(np.int64)
+
+
+def ticks_to_bars(times, prices, seconds=TICK_BAR_SECONDS):
+    """Folds time-ordered ticks into OHLC bars; returns a (n, 5) bar array."""
+    buckets = times // seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(prices)] - 1
+    return np.column_stack([
+        buckets[starts] * seconds,
+        prices[starts],
+        np.maximum.reduceat(prices, starts),
+        np.minimum.reduceat(prices, starts),
+        prices[ends],
+    ]).astype(np.float64)
+
+
+def iter_symbol_days(chunks, ticks=False):
+    """Yields (symbol, bars) with one UTC day of (time, open, high, low, close) bars."""
+    pending = {}
+    for chunk in chunks:
+        times = parse_timestamps(chunk['timestamp'])
+        symbols = chunk['symbol']
+        for symbol in np.unique(symbols):
+            rows = np.flatnonzero(symbols == symbol)
+            t = times[rows]
+            if ticks:
+                price = chunk['price'][rows]
+                data = np.column_stack([t, price, price, price, price]).astype(np.float64)
+            else:
+                data = np.column_stack([t] + [chunk[name][rows] for name in BAR_COLUMNS[2:]])
+            days = t // SECONDS_PER_DAY
+            splits = np.flatnonzero(days[1:] != days[:-1]) + 1
+            for part, part_days in zip(np.split(data, splits), np.split(days, splits)):
+                day = part_days[0]
+                if symbol in pending and pending[symbol][0] != day:
+                    yield symbol, _finish_day(pending.pop(symbol)[1], ticks)
+                pending.setdefault(symbol, (day, []))[1].append(part)
+    for symbol, (_, parts) in pending.items():
+        yield symbol, _finish_day(parts, ticks)
+
+
+def _finish_day(parts, ticks):
+    bars = np.concatenate(parts)
+    bars = bars[np.isfinite(bars).all(axis=1)]
+    if ticks and len(bars):
+        bars = ticks_to_bars(bars[:, 0].astype(np.int64), bars[:, 4])
+    return bars
+
+
+# --- Level Evaluation ---
+
+def classify_levels(levels, opens, highs, lows, closes, tolerance=0.0):
+    """Counts (touched, rejected, broken) for ``levels`` over the given bars."""
+    touched = rejected = broken = 0
+    for level in levels:
+        reached = np.flatnonzero((lows <= level + tolerance) & (highs >= level - tolerance))
+        if not len(reached):
+            continue
+        i = reached[0]
+        touched += 1
+        before = closes[i - 1] if i else opens[i]
+        if before < level:
+            crossed = closes[i] > level + tolerance
+        else:
+            crossed = closes[i] < level - tolerance
+        if crossed:
+            broken += 1
+        else:
+            rejected += 1
+    return touched, rejected, broken
+
+
+def day_levels(method, high, low):
+    """Levels for one day's anchors: bullish from the high, bearish from the low."""
+    if method == 'middle_l':
+        levels, valid = engine.middle_l_levels([high], [low])
+        return levels[valid].ravel()
+    if method in ('gann_box', 'lvl369'):
+        # The integer methods take whole prices, like the GUI does.
+        high, low = np.rint(high), np.rint(low)
+    level_function = engine.ANCHOR_METHODS[method]
+    bullish, bull_valid = level_function([high], 'bullish')
+    bearish, bear_valid = level_function([low], 'bearish')
+    return np.concatenate([bullish[bull_valid].ravel(), bearish[bear_valid].ravel()]).astype(np.float64)
+
+
+def anchor_window(method, day_start):
+    """UTC (start, end) epoch seconds of ``method``'s anchor window on the day starting at ``day_start``."""
+    window = ANCHOR_WINDOWS[method]
+    if isinstance(window, str):
+        # Sessions follow their own zone, so the UTC window moves with DST.
+        return SESSION_FRAMES[window].day_bounds(int(day_start) // SECONDS_PER_DAY)
+    return day_start + window[0], day_start + window[1]
+
+
+def backtest_day(symbol, bars, methods=engine.METHODS, tolerance=0.0):
+    """Returns (symbol, {method: [levels, touched, rejected, broken]}) for one day of bars."""
+    stats = {method: [0, 0, 0, 0] for method in methods}
+    if not len(bars):
+        return symbol, stats
+    times = bars[:, 0]
+    day_start = times[0] - times[0] % SECONDS_PER_DAY
+    for method in methods:
+        window_start, window_end = anchor_window(method, day_start)
+        in_window = (times >= window_start) & (times < window_end)
+        after = times >= window_end
+        if not in_window.any() or not after.any():
+            continue
+        high = bars[in_window, 2].max()
+        low = bars[in_window, 3].min()
+        levels = day_levels(method, high, low)
+        opens, highs, lows, closes = (bars[after, column] for column in range(1, 5))
+        stats[method][0] += len(levels)
+        for field, count in enumerate(classify_levels(levels, opens, highs, lows, closes, tolerance), 1):
+            stats[method][field] += count
+    return symbol, stats
+
+
+def _backtest_task(args):
+    return backtest_day(*args)
+
+
+# --- Sharding ---
+
+def run(path, methods=engine.METHODS, ticks=False, tolerance=0.0, workers=None,
+        chunk_size=batch.DEFAULT_CHUNK_SIZE, level_table=None):
+    """Backtests ``path``; returns {symbol: {method: [levels, touched, rejected, broken]}}.
+
+    ``level_table`` is the path of a precomputed level table; every worker
+    maps the same file, so its pages are shared rather than copied.
+    """
+    columns = TICK_COLUMNS if ticks else BAR_COLUMNS
+    days = iter_symbol_days(batch.iter_chunks(path, chunk_size, columns), ticks)
+    tasks = ((symbol, bars, methods, tolerance) for symbol, bars in days)
+
+    results = {}
+
+    def collect(symbol, stats):
+        totals = results.setdefault(symbol, {method: [0, 0, 0, 0] for method in methods})
+        for method, counts in stats.items():
+            totals[method] = [a + b for a, b in zip(totals[method], counts)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        level_tables.install(level_table)
+        for task in tasks:
+            collect(*_backtest_task(task))
+        return results
+
+    # Keep a bounded number of days in flight so reading never runs far ahead.
+    max_pending = workers * 4
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=level_tables.install,
+                                                initargs=(level_table,)) as pool:
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(_backtest_task, task))
+            if len(pending) >= max_pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    collect(*future.result())
+        for future in concurrent.futures.as_completed(pending):
+            collect(*future.result())
+    return results
+
+
+def summarize(results, methods=engine.METHODS):
+    """Totals per method with hit and rejection rates."""
+    summary = {}
+    for method in methods:
+        levels, touched, rejected, broken = (sum(stats[method][i] for stats in results.values()) for i in range(4))
+        summary[method] = {
+            'levels': levels,
+            'touched': touched,
+            'rejected': rejected,
+            'broken': broken,
+            'hit_rate': touched / levels if levels else 0.0,
+            'rejection_rate': rejected / touched if touched else 0.0,
+        }
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"{'method':<10}{'levels':>10}{'touched':>10}{'rejected':>10}{'broken':>10}{'hit %':>8}{'reject %':>10}"]
+    for method, row in summary.items():
+        lines.append(
+            f"{method:<10}{row['levels']:>10}{row['touched']:>10}{row['rejected']:>10}{row['broken']:>10}"
+            f"{row['hit_rate'] * 100:>8.1f}{row['rejection_rate'] * 100:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+# --- Entry Point ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how price respects the GANN levels.")
+    parser.add_argument('input', help="CSV or Parquet file of bars (or ticks with --ticks)")
+    parser.add_argument('--ticks', action='store_true', help="input has symbol, timestamp, price columns")
+    parser.add_argument('--methods', default=','.join(engine.METHODS),
+                        help="comma-separated subset of: " + ', '.join(engine.METHODS))
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help="distance in price units that still counts as touching a level")
+    parser.add_argument('--workers', type=int, default=None, help="processes to use (default: all cores)")
+    parser.add_argument('--json', metavar='PATH', help="also write per-symbol and total stats as JSON")
+    parser.add_argument('--level-table', metavar='PATH',
+                        help="serve GANN BOX / 369 LVL levels from a table built by level_tables.py")
+    args = parser.parse_args(argv)
+
+    methods = tuple(m.strip() for m in args.methods.split(',') if m.strip())
+    unknown = [m for m in methods if m not in engine.METHODS]
+    if unknown:
+        parser.error(f"unknown method(s): {', '.join(unknown)}")
+
+    try:
+        results = run(args.input, methods, args.ticks, args.tolerance, args.workers,
+                      level_table=args.level_table)
+    except (OSError, ValueError) as e:
+        print(f"backtest: {e}", file=sys.stderr)
+        return 1
+
+    summary = summarize(results, methods)
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'symbols': results, 'total': summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
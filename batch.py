@@ -0,0 +1,326 @@
+"""Streaming batch runner for the level methods.
+
+Reads anchors (symbol, timestamp, high, low) from CSV or Parquet in chunks,
+runs them through the engine and appends one output row per level:
+
+    python up5.py anchors.csv levels.csv
+    python batch.py anchors.parquet levels.parquet --methods gann_box,middle_l
+
+Only one chunk is held in memory at a time, so input size is not bounded by RAM.
+
+With ``--tick-size`` (every symbol) or ``--tick-sizes`` (a symbol,tick_size
+CSV) prices are converted to int64 tick counts and the levels come out
+aligned to each instrument's tick; see ticks.py. ``--rev-rings N`` writes the
+first N square-root rings of REV LVL instead of one level (rev_lattice.py).
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+import cache
+import engine
+import level_tables
+import metrics
+import rev_lattice
+import ticks
+
+ANCHOR_COLUMNS = ('symbol', 'timestamp', 'high', 'low')
+TEXT_COLUMNS = ('symbol', 'timestamp')
+OUTPUT_COLUMNS = ('symbol', 'timestamp', 'method', 'anchor', 'sentiment', 'level', 'value')
+DEFAULT_CHUNK_SIZE = 100_000
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+def is_parquet(path):
+    return path.lower().endswith(PARQUET_SUFFIXES)
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def to_float_array(values):
+    """Parses a column to float64; unparsable cells become NaN."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        parsed = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = float(value)
+            except (TypeError, ValueError):
+                parsed[i] = np.nan
+        return parsed
+
+
+# --- Readers ---
+
+def iter_csv_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=ANCHOR_COLUMNS):
+    """Yields dicts of ``columns`` arrays with at most ``chunk_size`` rows each."""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip().lower() for name in header]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        positions = [header.index(name) for name in columns]
+
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            rows.append([row[i] if i < len(row) else '' for i in positions])
+            if len(rows) >= chunk_size:
+                yield _columns_to_chunk(columns, zip(*rows))
+                rows = []
+        if rows:
+            yield _columns_to_chunk(columns, zip(*rows))
+
+
+def _columns_to_chunk(names, values):
+    """Text columns (symbol, timestamp) stay as objects; the rest become float64."""
+    chunk = {}
+    for name, column in zip(names, values):
+        if name in TEXT_COLUMNS:
+            chunk[name] = np.array([str(v) for v in column], dtype=object)
+        else:
+            chunk[name] = to_float_array(column)
+    return chunk
+
+
+def iter_parquet_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=ANCHOR_COLUMNS):
+    pa = require_pyarrow()
+    parquet_file = pa.parquet.ParquetFile(path)
+    for record_batch in parquet_file.iter_batches(batch_size=chunk_size, columns=list(columns)):
+        data = record_batch.to_pydict()
+        yield _columns_to_chunk(columns, [data[name] for name in columns])
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, columns=ANCHOR_COLUMNS):
+    if is_parquet(path):
+        return iter_parquet_chunks(path, chunk_size, columns)
+    return iter_csv_chunks(path, chunk_size, columns)
+
+
+# --- Computation ---
+
+def method_levels(method, prices, sentiment, tick_size=None, dedupe=False, rev_rings=1):
+    """Engine levels, or tick-aligned ones with ``tick_size``; Middle L takes (highs, lows)."""
+    if method == 'rev_lvl' and rev_rings > 1:
+        return rev_lattice.lattice_levels(prices, sentiment, rev_rings, tick_size)
+    if tick_size is not None:
+        return ticks.price_levels(method, prices, sentiment, tick_size)
+    if method == 'middle_l':
+        return engine.middle_l_levels(*prices)
+    if dedupe:
+        return cache.dedupe_levels(engine.ANCHOR_METHODS[method], prices, sentiment)
+    return engine.ANCHOR_METHODS[method](prices, sentiment)
+
+
+def tick_groups(symbols, tick_sizes=None, default_tick=None):
+    """Splits a chunk by instrument tick size: [(tick size, row indices)].
+
+    Symbols missing from ``tick_sizes`` use ``default_tick``; a tick size of
+    None means the float engine. A single group has ``None`` for its rows.
+    """
+    if not tick_sizes:
+        return [(default_tick, None)]
+    codes_by_tick = {}
+    codes = np.fromiter(
+        (codes_by_tick.setdefault(tick_sizes.get(symbol, default_tick), len(codes_by_tick)) for symbol in symbols),
+        dtype=np.intp, count=len(symbols),
+    )
+    if len(codes_by_tick) == 1:
+        return [(next(iter(codes_by_tick)), None)]
+    return [(tick_size, np.flatnonzero(codes == code)) for tick_size, code in codes_by_tick.items()]
+
+
+def _grouped_levels(groups, method, prices, sentiment, dedupe, rev_rings):
+    if len(groups) == 1:
+        return method_levels(method, prices, sentiment, groups[0][0], dedupe, rev_rings)
+    rows_total = len(prices[0]) if method == 'middle_l' else len(prices)
+    levels = valid = None
+    for tick_size, rows in groups:
+        part = tuple(column[rows] for column in prices) if method == 'middle_l' else prices[rows]
+        part_levels, part_valid = method_levels(method, part, sentiment, tick_size, dedupe, rev_rings)
+        if levels is None:
+            levels = np.full((rows_total, part_levels.shape[1]), np.nan)
+            valid = np.zeros(rows_total, dtype=bool)
+        levels[rows] = part_levels
+        valid[rows] = part_valid
+    levels[~valid] = np.nan
+    return levels, valid
+
+
+def compute_chunk(chunk, methods=engine.METHODS, anchors=('high', 'low'), dedupe=False, tick_sizes=None,
+                  default_tick=None, rev_rings=1):
+    """Yields (method, anchor, sentiment, levels, valid) for one chunk.
+
+    With ``dedupe`` each distinct anchor price is computed once per chunk.
+    ``tick_sizes`` / ``default_tick`` switch symbols to fixed-point ticks.
+    ``rev_rings`` is how many REV LVL rings each anchor gets.
+    """
+    groups = tick_groups(chunk['symbol'], tick_sizes, default_tick)
+    for method in methods:
+        if method == 'middle_l':
+            levels, valid = _grouped_levels(groups, method, (chunk['high'], chunk['low']), None, dedupe, rev_rings)
+            yield method, 'high_low', '', levels, valid
+            continue
+        for anchor in anchors:
+            for sentiment in engine.SENTIMENTS:
+                levels, valid = _grouped_levels(groups, method, chunk[anchor], sentiment, dedupe, rev_rings)
+                yield method, anchor, sentiment, levels, valid
+
+
+def level_columns(chunk, method, anchor, sentiment, levels, valid):
+    """Flattens the valid rows of a level matrix into output columns."""
+    rows = np.flatnonzero(valid)
+    depth = levels.shape[1]
+    count = len(rows) * depth
+    return {
+        'symbol': np.repeat(chunk['symbol'][rows], depth),
+        'timestamp': np.repeat(chunk['timestamp'][rows], depth),
+        'method': np.full(count, method, dtype=object),
+        'anchor': np.full(count, anchor, dtype=object),
+        'sentiment': np.full(count, sentiment, dtype=object),
+        'level': np.tile(np.arange(1, depth + 1), len(rows)),
+        'value': levels[rows].ravel(),
+    }
+
+
+# --- Writers ---
+
+class CsvLevelWriter:
+    """Writes level columns to a CSV file as they are produced."""
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(OUTPUT_COLUMNS)
+
+    def write(self, columns):
+        self.writer.writerows(zip(*(columns[name].tolist() for name in OUTPUT_COLUMNS)))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetLevelWriter:
+    """Writes level columns to a Parquet file, one row group per write."""
+    def __init__(self, path):
+        self.pa = require_pyarrow()
+        self.schema = self.pa.schema([
+            ('symbol', self.pa.string()),
+            ('timestamp', self.pa.string()),
+            ('method', self.pa.string()),
+            ('anchor', self.pa.string()),
+            ('sentiment', self.pa.string()),
+            ('level', self.pa.int16()),
+            ('value', self.pa.float64()),
+        ])
+        self.writer = self.pa.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, columns):
+        table = self.pa.Table.from_arrays(
+            [self.pa.array(columns[name], type=field.type) for name, field in zip(OUTPUT_COLUMNS, self.schema)],
+            schema=self.schema,
+        )
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path):
+    if is_parquet(path):
+        return ParquetLevelWriter(path)
+    return CsvLevelWriter(path)
+
+
+# --- Entry Point ---
+
+def run(input_path, output_path, methods=engine.METHODS, anchors=('high', 'low'), chunk_size=DEFAULT_CHUNK_SIZE,
+        dedupe=False, tick_sizes=None, default_tick=None, rev_rings=1):
+    """Streams ``input_path`` through the engine; returns (rows read, rows rejected per method)."""
+    rows_read = 0
+    rejected = dict.fromkeys(methods, 0)
+    writer = open_writer(output_path)
+    try:
+        for chunk in iter_chunks(input_path, chunk_size):
+            rows_read += len(chunk['symbol'])
+            for method, anchor, sentiment, levels, valid in compute_chunk(chunk, methods, anchors, dedupe, tick_sizes,
+                                                                               default_tick, rev_rings):
+                if sentiment != 'bearish':  # validity does not depend on sentiment
+                    rejected[method] += int(np.count_nonzero(~valid))
+                if valid.any():
+                    writer.write(level_columns(chunk, method, anchor, sentiment, levels, valid))
+    finally:
+        writer.close()
+    return rows_read, rejected
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compute GANN levels for a file of anchors.")
+    parser.add_argument('input', help="CSV or Parquet file with symbol, timestamp, high, low columns")
+    parser.add_argument('output', help="CSV or Parquet file to write the levels to")
+    parser.add_argument('--methods', default=','.join(engine.METHODS),
+                        help="comma-separated subset of: " + ', '.join(engine.METHODS))
+    parser.add_argument('--anchors', default='high,low',
+                        help="which prices anchor the single-price methods (high, low or both)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="rows per chunk (default: %(default)s)")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="compute each distinct anchor price once per chunk (for inputs with many repeats)")
+    parser.add_argument('--level-table', metavar='PATH',
+                        help="serve GANN BOX / 369 LVL levels from a table built by level_tables.py")
+    parser.add_argument('--tick-size', type=ticks.parse_tick_size,
+                        help="compute in fixed-point ticks of this size, e.g. 0.0001 (default for all symbols)")
+    parser.add_argument('--tick-sizes', metavar='PATH',
+                        help="CSV of symbol,tick_size for per-instrument ticks")
+    parser.add_argument('--rev-rings', type=int, default=1,
+                        help="REV LVL square-root rings per anchor (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    args.methods = tuple(m.strip() for m in args.methods.split(',') if m.strip())
+    unknown = [m for m in args.methods if m not in engine.METHODS]
+    if unknown:
+        parser.error(f"unknown method(s): {', '.join(unknown)}")
+    args.anchors = tuple(a.strip() for a in args.anchors.split(',') if a.strip())
+    if not args.anchors or any(a not in ('high', 'low') for a in args.anchors):
+        parser.error("--anchors must be high, low or high,low")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    if args.rev_rings < 1:
+        parser.error("--rev-rings must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    metrics.configure_from_env()
+    try:
+        level_tables.install(args.level_table)
+        tick_sizes = ticks.load_tick_sizes(args.tick_sizes) if args.tick_sizes else None
+        rows_read, rejected = run(args.input, args.output, args.methods, args.anchors, args.chunk_size,
+                                  args.dedupe, tick_sizes, args.tick_size, args.rev_rings)
+    except (OSError, ValueError) as e:
+        print(f"batch: {e}", file=sys.stderr)
+        return 1
+    print(f"{rows_read} anchor rows processed", file=sys.stderr)
+    for method, count in rejected.items():
+        if count:
+            print(f"  {method}: {count} anchors rejected", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
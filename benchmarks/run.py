@@ -0,0 +1,351 @@
+"""Benchmark suite for the calculators, the batch paths, the service and the GUI.
+
+    python benchmarks/run.py                       # run, compare with the baseline
+    python benchmarks/run.py --save-baseline       # run and store a new baseline
+    python benchmarks/run.py --no-baseline         # run without comparing
+    python benchmarks/run.py --max-size 100000000  # batch sizes up to 10^8
+
+Results are written as JSON (``--output``). Every metric is compared with
+``--baseline`` (benchmarks/baseline.json is committed) and the run exits
+with status 1 if any metric is more than ``--tolerance`` worse, or if the
+baseline is missing. Throughput metrics (``/s``) are
+better when higher, times (``ms``) and memory (``MB``) when lower. GUI
+metrics are skipped when there is no display.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+import engine
+import service_load
+import startup
+
+DEFAULT_OUTPUT = os.path.join(ROOT, 'bench_output.json')
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+BATCH_CHUNK = 1_000_000
+STREAM_ROWS = 50_000
+
+
+def best_rate(func, count, repeat=3):
+    """Best items/second of ``func()`` processing ``count`` items."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = max(best, count / elapsed if elapsed else float('inf'))
+    return best
+
+
+def best_ms(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# --- Scalar Calculators ---
+
+class _Field:
+    """Stands in for the Entry and Label widgets that REV LVL and Middle L read and update."""
+    def __init__(self):
+        self.text = ''
+
+    def get(self):
+        return self.text
+
+    def config(self, **options):
+        pass
+
+
+def bench_scalar(calls=20_000):
+    """Single-anchor calls per second, with distinct anchors so nothing is cached."""
+    import up5
+
+    prices = [str(p) for p in range(1000, 1000 + calls)]
+    floats = [f"{p}.25" for p in range(1000, 1000 + calls)]
+    # The calculation methods only touch widgets through the stand-ins, so no Tk window is needed.
+    gann_program = up5.GannBoxProgram.__new__(up5.GannBoxProgram)
+    lvl369_program = up5.Lvl369Program.__new__(up5.Lvl369Program)
+    rev_program = up5.RevLvlProgram.__new__(up5.RevLvlProgram)
+    rev_program.price_entry, rev_program.result_label = _Field(), _Field()
+    middle_program = up5.MiddleLProgram.__new__(up5.MiddleLProgram)
+    middle_program.entry_high, middle_program.entry_low, middle_program.result_label = _Field(), _Field(), _Field()
+
+    def gann_box():
+        up5.LEVEL_CACHE.clear()
+        for price in prices:
+            gann_program.calculate_levels(price, 'bullish')
+
+    def lvl369():
+        up5.LEVEL_CACHE.clear()
+        for price in prices:
+            lvl369_program.calculate_bullish(price)
+
+    def rev_lvl():
+        up5.LEVEL_CACHE.clear()
+        for price in floats:
+            rev_program.price_entry.text = price
+            rev_program.calculate('bullish')
+
+    def middle_l():
+        up5.LEVEL_CACHE.clear()
+        middle_program.entry_high.text = '5000.75'
+        for price in floats:
+            middle_program.entry_low.text = price
+            middle_program.calculate_and_display()
+
+    results = {}
+    for name, func in (('gann_box', gann_box), ('lvl369', lvl369), ('rev_lvl', rev_lvl), ('middle_l', middle_l)):
+        results[f'scalar.{name}'] = (best_rate(func, calls, repeat=2), 'calls/s')
+    return results
+
+
+# --- Batch Engine ---
+
+def batch_sizes(max_size):
+    size = 1000
+    while size <= max_size:
+        yield size
+        size *= 10
+
+
+def bench_batch(max_size):
+    """Anchors per second through each batch function, in 10^6-row chunks."""
+    rng = np.random.default_rng(0)
+    chunk = rng.integers(10, 100_000, BATCH_CHUNK)
+    highs = chunk + rng.random(BATCH_CHUNK) * 50
+    lows = chunk.astype(np.float64)
+    functions = {
+        'gann_box': lambda n: engine.gann_box_levels(chunk[:n], 'bullish'),
+        'lvl369': lambda n: engine.lvl369_levels(chunk[:n], 'bullish'),
+        'rev_lvl': lambda n: engine.rev_lvl_levels(lows[:n], 'bullish'),
+        'middle_l': lambda n: engine.middle_l_levels(highs[:n], lows[:n]),
+    }
+    results = {}
+    for size in batch_sizes(max_size):
+        for name, func in functions.items():
+            def run(size=size, func=func):
+                remaining = size
+                while remaining:
+                    n = min(remaining, BATCH_CHUNK)
+                    func(n)
+                    remaining -= n
+            repeat = 3 if size <= 10 ** 6 else 1
+            results[f'batch.{name}.{size}'] = (best_rate(run, size, repeat), 'anchors/s')
+    return results
+
+
+# --- Streaming ---
+
+STREAM_SCRIPT = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+import batch
+start = time.perf_counter()
+rows, _ = batch.run({input!r}, {output!r}, chunk_size={chunk})
+elapsed = time.perf_counter() - start
+print(rows / elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def bench_streaming(rows=STREAM_ROWS, chunk=10_000):
+    """Rows per second and peak RSS of a batch.run job in a fresh process."""
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'anchors.csv')
+        output_path = os.path.join(tmp, 'levels.csv')
+        lows = rng.integers(1000, 5000, rows)
+        highs = lows + rng.integers(1, 50, rows)
+        with open(input_path, 'w') as f:
+            f.write('symbol,timestamp,high,low\n')
+            for i, (high, low) in enumerate(zip(highs.tolist(), lows.tolist())):
+                f.write(f'S{i % 100},{i},{high},{low}\n')
+        script = STREAM_SCRIPT.format(root=ROOT, input=input_path, output=output_path, chunk=chunk)
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    rate, max_rss_kb = result.stdout.split()
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'streaming.rows': (float(rate), 'rows/s'),
+        'streaming.peak_rss': (float(max_rss_kb) / divisor, 'MB'),
+    }
+
+
+# --- GUI ---
+
+def bench_gui():
+    """Timings of program switches, result updates and star drawing; empty without a display."""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return {}
+    import up5
+    try:
+        up5.configure_styles()
+        app = up5.Application(master=root)
+        root.geometry('1280x720')
+        root.update()
+
+        def switch(program_class):
+            app.show_program(program_class)
+            root.update()
+
+        results = {'gui.show_program.first': (best_ms(lambda: switch(up5.GannBoxProgram), repeat=1), 'ms')}
+        programs = (up5.GannBoxProgram, up5.Lvl369Program, up5.RevLvlProgram, up5.MiddleLProgram, up5.HowToUseProgram)
+        for program_class in programs:
+            switch(program_class)
+        results['gui.show_program.cached'] = (best_ms(lambda: [switch(p) for p in programs]) / len(programs), 'ms')
+
+        switch(up5.GannBoxProgram)
+        up5.set_entry(app.active_frame.price_entry, 2000)
+
+        def update_results():
+            app.active_frame.update_results('bullish')
+            root.update_idletasks()
+
+        results['gui.update_results'] = (best_ms(update_results), 'ms')
+
+        def draw_stars():
+            app.star_cells.clear()
+            app.bg_canvas.delete('stars')
+            app.star_tiles = []
+            app.draw_stars()
+            root.update_idletasks()
+
+        results['gui.draw_stars'] = (best_ms(draw_stars), 'ms')
+        return results
+    finally:
+        root.destroy()
+
+
+def bench_service(rate=2000, duration=3.0):
+    """Latency percentiles of a private service.py at a fixed request rate."""
+    measured = service_load.measure(rate=rate, duration=duration)
+    return {
+        'service.p50': (measured['p50_ms'], 'ms'),
+        'service.p99': (measured['p99_ms'], 'ms'),
+    }
+
+
+def bench_startup():
+    measured = startup.measure(runs=3)
+    results = {'startup.headless': (measured['headless'], 'ms')}
+    if measured['gui'] is not None:
+        results['startup.gui'] = (measured['gui'], 'ms')
+    return results
+
+
+# --- Comparison ---
+
+def higher_is_better(unit):
+    return unit.endswith('/s')
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of (name, value, baseline value, change) for regressions."""
+    regressions = []
+    for name, entry in results.items():
+        if name not in baseline:
+            continue
+        value, unit = entry['value'], entry['unit']
+        reference = baseline[name]['value']
+        if not reference:
+            continue
+        change = (value - reference) / reference
+        worse = -change if higher_is_better(unit) else change
+        if worse > tolerance:
+            regressions.append((name, value, reference, change))
+    return regressions
+
+
+def run_suite(max_size, sections):
+    results = {}
+    for section in sections:
+        print(f"running {section} ...", file=sys.stderr)
+        if section == 'scalar':
+            results.update(bench_scalar())
+        elif section == 'batch':
+            results.update(bench_batch(max_size))
+        elif section == 'streaming':
+            results.update(bench_streaming())
+        elif section == 'gui':
+            results.update(bench_gui())
+        elif section == 'service':
+            results.update(bench_service())
+        elif section == 'startup':
+            results.update(bench_startup())
+    return {name: {'value': value, 'unit': unit} for name, (value, unit) in results.items()}
+
+
+SECTIONS = ('scalar', 'batch', 'streaming', 'gui', 'service', 'startup')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--no-baseline', action='store_true', help="do not compare with a baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative regression (default: %(default)s)")
+    parser.add_argument('--max-size', type=int, default=10 ** 7, help="largest batch size (default: 10^7)")
+    parser.add_argument('--only', default=','.join(SECTIONS), help="comma-separated sections to run")
+    args = parser.parse_args(argv)
+
+    sections = [s.strip() for s in args.only.split(',') if s.strip()]
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(unknown)}")
+
+    results = run_suite(args.max_size, sections)
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, entry in results.items():
+        print(f"{name:<32} {entry['value']:>16,.1f} {entry['unit']}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if args.no_baseline:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"run: no baseline at {args.baseline} (use --save-baseline, or --no-baseline to skip the comparison)",
+              file=sys.stderr)
+        return 1
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance)
+    for name, value, reference, change in regressions:
+        print(f"REGRESSION {name}: {value:,.1f} vs baseline {reference:,.1f} ({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Load generator for service.py.
+
+    python benchmarks/service_load.py                        # start a service, 5000 req/s for 5 s
+    python benchmarks/service_load.py --rate 0               # closed loop: as fast as it answers
+    python benchmarks/service_load.py --url 127.0.0.1:8765 --connections 64
+
+Each connection is persistent and sends single-anchor /levels requests on
+a fixed schedule (``--rate`` across all connections). Latency is measured
+from the scheduled send time, so a stalled server is not hidden by the
+client waiting for it. Exits with status 1 when p99 is over ``--p99-budget``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+DEFAULT_RATE = 5000
+DEFAULT_CONNECTIONS = 32
+DEFAULT_DURATION = 5.0
+DEFAULT_P99_BUDGET_MS = 1.0
+REQUEST_VARIANTS = 256
+
+
+def request_bodies(count, seed=0):
+    """A mix of requests over all four methods, pre-encoded as HTTP."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        method = rng.choice(('gann_box', 'lvl369', 'rev_lvl', 'middle_l'))
+        sentiment = rng.choice(('bullish', 'bearish'))
+        if method == 'middle_l':
+            low = rng.uniform(100, 5000)
+            payload = {'method': method, 'high': round(low + rng.uniform(1, 50), 2), 'low': round(low, 2)}
+        elif method == 'rev_lvl':
+            payload = {'method': method, 'sentiment': sentiment, 'price': round(rng.uniform(100, 5000), 2)}
+        else:
+            payload = {'method': method, 'sentiment': sentiment, 'price': rng.randint(100, 5000)}
+        body = json.dumps(payload).encode()
+        requests.append(
+            b'POST /levels HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+            b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+        )
+    return requests
+
+
+async def read_response(reader):
+    """Reads one response; returns its status code."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def connection(open_connection, requests, interval, deadline, latencies, statuses, offset):
+    reader, writer = await open_connection()
+    next_send = time.perf_counter() + offset
+    i = 0
+    try:
+        while True:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            scheduled = next_send if interval else time.perf_counter()
+            if scheduled >= deadline:
+                break
+            writer.write(requests[i % len(requests)])
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - scheduled)
+            statuses[status] = statuses.get(status, 0) + 1
+            next_send += interval
+            i += 1
+    finally:
+        writer.close()
+
+
+async def generate(open_connection, rate, connections, duration):
+    requests = request_bodies(REQUEST_VARIANTS)
+    interval = connections / rate if rate else 0.0
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        connection(open_connection, requests[i:] + requests[:i], interval, deadline, latencies, statuses,
+                   interval * i / connections)
+        for i in range(connections)
+    ))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_service(port, workers):
+    """Starts service.py in a subprocess and waits until it accepts connections."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'service.py'), '--port', str(port), '--workers', str(workers)],
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("service did not start")
+
+
+def measure(url=None, unix=None, rate=DEFAULT_RATE, connections=DEFAULT_CONNECTIONS, duration=DEFAULT_DURATION,
+            workers=2):
+    """Runs a load test; starts a private service unless ``url`` or ``unix`` is given."""
+    process = None
+    if unix:
+        open_connection = lambda: asyncio.open_unix_connection(unix)
+    else:
+        if url:
+            host, _, port = url.rpartition(':')
+        else:
+            host, port = '127.0.0.1', free_port()
+            process = start_service(port, workers)
+        open_connection = lambda: asyncio.open_connection(host or '127.0.0.1', int(port))
+    try:
+        latencies, statuses, elapsed = asyncio.run(generate(open_connection, rate, connections, duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        'statuses': statuses,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the local calculation service.")
+    parser.add_argument('--url', help="host:port of a running service (default: start one)")
+    parser.add_argument('--unix', metavar='PATH', help="Unix socket of a running service")
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="requests per second over all connections; 0 for closed loop (default: %(default)s)")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help="seconds (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=2, help="workers of the service started here")
+    parser.add_argument('--p99-budget', type=float, default=DEFAULT_P99_BUDGET_MS,
+                        help="p99 latency limit in ms (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    result = measure(args.url, args.unix, args.rate, args.connections, args.duration, args.workers)
+    print(f"requests    {result['requests']}")
+    print(f"throughput  {result['throughput']:,.0f} req/s")
+    for name in ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms'):
+        print(f"{name:<11} {result[name]:.3f}")
+    print("statuses    " + ', '.join(f"{status}: {count}" for status, count in sorted(result['statuses'].items())))
+    if result['p99_ms'] > args.p99_budget:
+        print(f"p99 over budget ({args.p99_budget} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
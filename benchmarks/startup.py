@@ -0,0 +1,92 @@
+"""Cold-start budget for the headless core and the GUI.
+
+Each path runs in a fresh interpreter and is timed from its first import
+to its first result (best of ``--runs``). Exits with status 1 when a path
+goes over its budget:
+
+    python benchmarks/startup.py
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLESS_BUDGET_MS = 250
+GUI_BUDGET_MS = 750
+
+HEADLESS_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import engine, cache
+engine.gann_box_levels([2000], 'bullish')
+elapsed = time.perf_counter() - start
+loaded = [name for name in ('tkinter', 'pyperclip') if name in sys.modules]
+if loaded:
+    sys.exit('headless import pulled in ' + ', '.join(loaded))
+print(elapsed * 1000)
+"""
+
+GUI_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    sys.exit(3)
+import up5
+up5.configure_styles()
+app = up5.Application(master=root)
+root.update()
+elapsed = time.perf_counter() - start
+root.destroy()
+print(elapsed * 1000)
+"""
+
+NO_DISPLAY = 3
+
+
+def time_script(script, runs):
+    """Best in-process time (ms) over ``runs`` fresh interpreters, or None without a display."""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+        if result.returncode == NO_DISPLAY:
+            return None
+        if result.returncode:
+            raise RuntimeError(result.stderr.strip() or f"exit status {result.returncode}")
+        elapsed = float(result.stdout.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(runs=5):
+    """Returns {'headless': ms, 'gui': ms or None}."""
+    return {
+        'headless': time_script(HEADLESS_SCRIPT, runs),
+        'gui': time_script(GUI_SCRIPT, runs),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cold-start time against the budget.")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    failed = False
+    for name, budget in (('headless', HEADLESS_BUDGET_MS), ('gui', GUI_BUDGET_MS)):
+        elapsed = results[name]
+        if elapsed is None:
+            print(f"{name:<9} skipped (no display)")
+            continue
+        status = 'ok' if elapsed <= budget else 'OVER BUDGET'
+        failed |= elapsed > budget
+        print(f"{name:<9} {elapsed:7.1f} ms  (budget {budget} ms)  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Memoized level calculations.
+
+LevelCache is a bounded LRU map from (method, normalized anchor, sentiment,
+tick size) to the levels the engine returns for that anchor. With a tick
+size the anchor and the levels are tick counts (see ticks.py). It counts hits, misses
+and evictions, and can be saved to / loaded from a JSON file so warm
+anchors survive restarts; the GUI loads GANN_LEVEL_CACHE at start and saves
+it on exit when that is set. Rejected anchors are cached too (as None).
+"""
+import collections
+import os
+
+import numpy as np
+
+import engine
+import ticks
+
+DEFAULT_MAX_ENTRIES = 100_000
+PRICE_DECIMALS = 8
+FILE_VERSION = 2
+
+
+def normalize_anchor(method, anchor):
+    """Canonical key part for an anchor: a rounded float, or a pair for Middle L."""
+    if method == 'middle_l':
+        high, low = anchor
+        return (round(float(high), PRICE_DECIMALS), round(float(low), PRICE_DECIMALS))
+    if isinstance(anchor, (int, np.integer)):
+        return int(anchor)
+    return round(float(anchor), PRICE_DECIMALS)
+
+
+def compute_levels(method, anchor, sentiment=None, tick_size=None):
+    """Levels of one anchor as a tuple, or None when the engine rejects it."""
+    if tick_size is not None:
+        # Typed prices can be any size; the tick functions take int64.
+        if any(abs(a) > engine.MAX_PRICE for a in (anchor if method == 'middle_l' else (anchor,))):
+            return None
+        if method == 'middle_l':
+            levels, valid = ticks.middle_l_ticks([anchor[0]], [anchor[1]])
+        else:
+            levels, valid = ticks.TICK_METHODS[method]([anchor], sentiment, tick_size)
+    elif method == 'middle_l':
+        high, low = anchor
+        levels, valid = engine.middle_l_levels([high], [low])
+    else:
+        levels, valid = engine.ANCHOR_METHODS[method]([anchor], sentiment)
+    return tuple(levels[0].tolist()) if valid[0] else None
+
+
+def dedupe_levels(level_function, prices, *args):
+    """Runs ``level_function`` once per distinct price and expands the result."""
+    unique, inverse = np.unique(np.asarray(prices), return_inverse=True)
+    levels, valid = level_function(unique, *args)
+    return levels[inverse], valid[inverse]
+
+
+class LevelCache:
+    """Bounded LRU cache of per-anchor level results."""
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def levels(self, method, anchor, sentiment=None, tick_size=None):
+        """Cached engine levels for one anchor (None if the anchor is invalid)."""
+        key = (method, normalize_anchor(method, anchor), sentiment, tick_size)
+        try:
+            result = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            result = compute_levels(method, key[1], sentiment, tick_size)
+            self._store(key, result)
+            return result
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return result
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def metric_samples(self, name):
+        """Samples for metrics.register_collector, labelled with ``name``."""
+        labels = {'cache': name}
+        return [
+            ('gann_cache_entries', labels, len(self.entries)),
+            ('gann_cache_hits_total', labels, self.hits, 'counter'),
+            ('gann_cache_misses_total', labels, self.misses, 'counter'),
+            ('gann_cache_evictions_total', labels, self.evictions, 'counter'),
+        ]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    # --- Persistence ---
+
+    def save(self, path=None):
+        """Writes the entries, least recently used first, to a JSON file."""
+        import json
+
+        path = path or self.path
+        rows = [[method, anchor, sentiment, tick_size, levels]
+                for (method, anchor, sentiment, tick_size), levels in self.entries.items()]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': FILE_VERSION, 'entries': rows}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path=None):
+        """Adds the entries of a saved cache; unreadable files are ignored."""
+        import json
+
+        path = path or self.path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if data.get('version') != FILE_VERSION:
+            return 0
+        for method, anchor, sentiment, tick_size, levels in data['entries']:
+            tick_size = ticks.TickSize(*tick_size) if tick_size is not None else None
+            if method == 'middle_l':
+                anchor = tuple(anchor)
+            self._store((method, anchor, sentiment, tick_size), tuple(levels) if levels is not None else None)
+        return len(data['entries'])
+
+
+def path_from_env():
+    """GANN_LEVEL_CACHE, or None when it is unset or empty."""
+    return os.environ.get('GANN_LEVEL_CACHE') or None
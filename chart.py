@@ -0,0 +1,193 @@
+"""Price series storage and decimation for the chart view.
+
+PriceSeries keeps timestamps and prices in growable arrays plus a min/max
+pyramid: level k holds the low and high of every block of 2 ** k samples.
+Appends update only the blocks they complete, and a view of any range is
+reduced to one low/high pair per pixel column from the coarsest level whose
+blocks still fit in a column, so drawing costs O(columns) however many
+samples the range holds:
+
+    series = PriceSeries()
+    series.extend(timestamps, prices)
+    xs, ys = series.view(0, len(series), columns=800)
+
+Ranges with no more samples than columns are drawn raw; longer ones as a
+min/max envelope, which keeps every spike. ``method='lttb'`` uses LTTB
+(largest triangle three buckets) instead up to LTTB_MAX_RATIO samples per
+column; it keeps the shape of the line better but walks the buckets one by
+one, so it costs O(samples) rather than O(columns).
+"""
+import numpy as np
+
+INITIAL_CAPACITY = 4096
+# Up to this many samples per column LTTB is used; beyond it the min/max envelope.
+LTTB_MAX_RATIO = 8
+
+
+class PriceSeries:
+    """Append-only (timestamp, price) samples with a min/max pyramid."""
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.prices = np.empty(capacity, dtype=np.float64)
+        self.lows = []      # level k - 1 -> low of each block of 2 ** k samples
+        self.highs = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, count):
+        needed = self.size + count
+        if needed <= len(self.prices):
+            return
+        capacity = max(needed, 2 * len(self.prices))
+        for name in ('times', 'prices'):
+            grown = np.empty(capacity, dtype=np.float64)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+        for levels in (self.lows, self.highs):
+            for k, level in enumerate(levels, 1):
+                grown = np.empty(capacity >> k, dtype=np.float64)
+                grown[:self.size >> k] = level[:self.size >> k]
+                levels[k - 1] = grown
+
+    def append(self, timestamp, price):
+        self.extend([timestamp], [price])
+
+    def extend(self, timestamps, prices):
+        """Appends samples; only the pyramid blocks they complete are computed."""
+        prices = np.asarray(prices, dtype=np.float64)
+        count = len(prices)
+        if not count:
+            return
+        self._reserve(count)
+        old_size = self.size
+        self.times[old_size:old_size + count] = timestamps
+        self.prices[old_size:old_size + count] = prices
+        self.size += count
+
+        lower_lows = lower_highs = self.prices
+        k = 1
+        while self.size >> k:
+            if len(self.lows) < k:
+                self.lows.append(np.empty(len(self.prices) >> k, dtype=np.float64))
+                self.highs.append(np.empty(len(self.prices) >> k, dtype=np.float64))
+            first, last = old_size >> k, self.size >> k
+            if first == last:
+                break
+            lows, highs = self.lows[k - 1], self.highs[k - 1]
+            lows[first:last] = np.fmin(lower_lows[2 * first:2 * last:2], lower_lows[2 * first + 1:2 * last:2])
+            highs[first:last] = np.fmax(lower_highs[2 * first:2 * last:2], lower_highs[2 * first + 1:2 * last:2])
+            lower_lows, lower_highs = lows, highs
+            k += 1
+
+    def clear(self):
+        self.lows, self.highs = [], []
+        self.size = 0
+
+    # --- Views ---
+
+    def view(self, start, stop, columns, method='minmax'):
+        """(sample positions, prices) to draw ``start .. stop - 1`` across ``columns`` pixels."""
+        start, stop = max(0, int(start)), min(self.size, int(stop))
+        count = stop - start
+        if count <= 0:
+            return np.empty(0), np.empty(0)
+        if count <= columns:
+            return np.arange(start, stop, dtype=np.float64), self.prices[start:stop].copy()
+        if method == 'lttb' and count <= LTTB_MAX_RATIO * columns:
+            picked = lttb(self.prices[start:stop], columns)
+            return picked + float(start), self.prices[start + picked]
+        return self.envelope(start, stop, columns)
+
+    def envelope(self, start, stop, columns):
+        """Low then high of each column, positioned at the column's middle sample.
+
+        Columns are read from pyramid level k, where 2 ** k samples fit in a
+        column, so each inner column edge is rounded to its level-k block. The
+        first and last columns stop exactly at ``start`` and ``stop``, so no
+        sample outside the view is drawn.
+        """
+        per_column = (stop - start) / columns
+        k = min(int(np.log2(per_column)), len(self.lows))
+        lows, highs = (self.prices, self.prices) if k == 0 else (self.lows[k - 1], self.highs[k - 1])
+        edges = start + np.round(np.arange(columns + 1) * per_column).astype(np.int64)
+        blocks = self.size >> k
+        end_block = min(blocks, (stop + (1 << k) - 1) >> k)
+        firsts = edges[:-1] >> k
+        inside = firsts < end_block
+        column_lows = np.full(columns, np.inf)
+        column_highs = np.full(columns, -np.inf)
+        if inside.any():
+            column_lows[inside] = np.minimum.reduceat(lows[:end_block], firsts[inside])
+            column_highs[inside] = np.maximum.reduceat(highs[:end_block], firsts[inside])
+        # Samples after the last whole block are read raw; there are fewer than one column of them.
+        tail = blocks << k
+        if tail < stop:
+            for column in np.flatnonzero(edges[1:] > tail):
+                raw = self.prices[max(edges[column], tail):edges[column + 1]]
+                if len(raw):
+                    column_lows[column] = min(column_lows[column], raw.min())
+                    column_highs[column] = max(column_highs[column], raw.max())
+        for column in (0, columns - 1):
+            column_lows[column], column_highs[column] = self._extent(edges[column], edges[column + 1], k)
+        drawn = np.isfinite(column_lows)
+        middles = (edges[:-1] + edges[1:] - 1) / 2
+        xs = np.repeat(middles[drawn], 2)
+        ys = np.column_stack((column_lows[drawn], column_highs[drawn])).ravel()
+        return xs, ys
+
+    def _extent(self, lo, hi, k):
+        """Low and high of samples ``lo .. hi - 1``: whole level-k blocks from the pyramid, the ends raw."""
+        first_block, last_block = (lo + (1 << k) - 1) >> k, hi >> k
+        if k == 0 or first_block >= last_block:
+            raw = self.prices[lo:hi]
+            return (np.fmin.reduce(raw), np.fmax.reduce(raw)) if len(raw) else (np.inf, -np.inf)
+        low = self.lows[k - 1][first_block:last_block].min()
+        high = self.highs[k - 1][first_block:last_block].max()
+        for raw in (self.prices[lo:first_block << k], self.prices[last_block << k:hi]):
+            if len(raw):
+                low, high = np.fmin(low, np.fmin.reduce(raw)), np.fmax(high, np.fmax.reduce(raw))
+        return low, high
+
+
+def lttb(values, threshold):
+    """Indexes of ``threshold`` samples picked by largest-triangle-three-buckets."""
+    count = len(values)
+    if threshold >= count:
+        return np.arange(count)
+    if threshold < 3:
+        return np.array([0, count - 1])[:max(threshold, 0)]
+    # Bucket i (of threshold - 2) covers edges[i] .. edges[i + 1] - 1; the first and last samples stay.
+    edges = np.floor(np.arange(threshold - 1) * ((count - 2) / (threshold - 2))).astype(np.int64) + 1
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = (edges[bucket + 1] + edges[bucket + 2] - 1) / 2
+            next_y = values[edges[bucket + 1]:edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = count - 1, values[count - 1]
+        px, py = previous, values[previous]
+        areas = np.abs((px - next_x) * (values[lo:hi] - py) - (px - np.arange(lo, hi)) * (next_y - py))
+        previous = lo + int(np.argmax(areas))
+        picked[bucket + 1] = previous
+    return picked
+
+
+# --- Drawing ---
+
+def to_pixels(xs, ys, start, span, low, high, width, height):
+    """Flat [x0, y0, x1, y1, ...] canvas coordinates of samples in a ``width`` x ``height`` plot."""
+    px = (np.asarray(xs) - start) * (width / span)
+    py = (high - np.asarray(ys)) * ((height - 1) / (high - low))
+    return np.column_stack((px, py)).ravel().tolist()
+
+
+def price_labels(low, high, count):
+    """``count`` evenly spaced (price, text) axis labels, with decimals to suit the range."""
+    decimals = max(0, 2 - int(np.floor(np.log10(high - low))))
+    prices = np.linspace(low, high, count + 2)[1:-1]
+    return [(float(price), f"{price:.{decimals}f}") for price in prices]
@@ -0,0 +1,226 @@
+"""Cross-method confluence zones.
+
+ConfluenceIndex is a LevelIndex that also groups its levels into zones:
+walking the sorted levels once, a level joins the current zone when it is
+within the tolerance of the previous level and starts a new zone otherwise.
+Zones are ranked by how many methods contributed, then by how many levels
+and anchors they hold, so the places where GANN BOX, 369 LVL, REV LVL and
+Middle L levels from different anchors pile up come first.
+
+Adding or removing an anchor only re-checks the gaps next to the levels that
+moved, and add_anchor reports the zones the new levels landed in.
+
+Rank the zones of a file of anchors (same columns as the batch input, e.g.
+from resample.py):
+
+    python confluence.py anchors.csv --tolerance-ticks 5 --top 10
+"""
+import argparse
+import collections
+import sys
+
+import numpy as np
+
+import batch
+import engine
+from level_index import DEFAULT_TICK_SIZE, LevelIndex
+
+Zone = collections.namedtuple('Zone', 'low high levels anchors methods')
+
+DEFAULT_TOLERANCE_TICKS = 5
+DEFAULT_TOP = 10
+# Zone and anchor ids share one int64 key when counting anchors per zone.
+ANCHOR_ID_BITS = 32
+# Session-style anchors: highs anchor the bullish levels, lows the bearish ones.
+SESSION_METHODS = ('gann_box', 'lvl369', 'rev_lvl')
+# These take whole prices, so session highs and lows are rounded for them, like the GUI does.
+INTEGER_METHODS = ('gann_box', 'lvl369')
+
+
+def session_anchors(method, prices):
+    """``prices`` as ``method`` takes them: rounded to whole numbers for the integer methods."""
+    return np.rint(prices) if method in INTEGER_METHODS else prices
+
+
+class ConfluenceIndex(LevelIndex):
+    """Sorted levels of one symbol, clustered into confluence zones."""
+    def __init__(self, tick_size=DEFAULT_TICK_SIZE, tolerance_ticks=DEFAULT_TOLERANCE_TICKS):
+        super().__init__(tick_size)
+        self.tolerance = tolerance_ticks * tick_size
+        self.breaks = np.empty(0, dtype=bool)       # True where a level starts a new zone
+
+    def set_tolerance(self, tolerance_ticks):
+        self.tolerance = tolerance_ticks * self.tick_size
+        self.breaks = np.ones(len(self.values), dtype=bool)
+        self.breaks[1:] = np.diff(self.values) > self.tolerance
+
+    def _update_breaks(self, positions):
+        positions = np.unique(positions[(positions >= 0) & (positions < len(self.values))])
+        self.breaks[positions] = True
+        inner = positions[positions > 0]
+        self.breaks[inner] = self.values[inner] - self.values[inner - 1] > self.tolerance
+
+    # --- Updates ---
+
+    def add_levels(self, levels, method, anchor, sentiment=None):
+        levels = np.sort(np.asarray(levels, dtype=np.float64).ravel())
+        positions = np.searchsorted(self.values, levels)
+        anchor_id = super().add_levels(levels, method, anchor, sentiment)
+        self.breaks = np.insert(self.breaks, positions, True)
+        inserted = positions + np.arange(len(positions))
+        self._update_breaks(np.concatenate([inserted, inserted + 1]))
+        return anchor_id
+
+    def add_anchor(self, method, anchor, sentiment=None):
+        """Adds one anchor's levels; returns (anchor id, zones its levels fall in), or (None, [])."""
+        anchor_id = super().add_anchor(method, anchor, sentiment)
+        if anchor_id is None:
+            return None, []
+        return anchor_id, self.zones_at(self.anchor_positions(anchor_id))
+
+    def add_session(self, high, low):
+        """Adds every method for one high/low pair; returns the anchor ids that were accepted."""
+        anchor_ids = []
+        for method in SESSION_METHODS:
+            for price, sentiment in ((high, 'bullish'), (low, 'bearish')):
+                anchor_ids.append(super().add_anchor(method, float(session_anchors(method, price)), sentiment))
+        anchor_ids.append(super().add_anchor('middle_l', (high, low)))
+        return [anchor_id for anchor_id in anchor_ids if anchor_id is not None]
+
+    def add_sessions(self, highs, lows):
+        """add_session for many high/low pairs at once: one engine call per method and one merge."""
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        parts = []
+        for method, sentiment, prices in [(m, s, p) for m in SESSION_METHODS
+                                          for s, p in (('bullish', highs), ('bearish', lows))] + [('middle_l', None, None)]:
+            if method == 'middle_l':
+                levels, valid = engine.middle_l_levels(highs, lows)
+                anchors = list(zip(highs.tolist(), lows.tolist()))
+            else:
+                prices = session_anchors(method, prices)
+                levels, valid = engine.ANCHOR_METHODS[method](prices, sentiment)
+                anchors = prices.tolist()
+            rows = np.flatnonzero(valid)
+            anchor_ids = np.arange(self._next_id, self._next_id + len(rows), dtype=np.int64)
+            self._next_id += len(rows)
+            for anchor_id, row in zip(anchor_ids.tolist(), rows.tolist()):
+                self.anchors[anchor_id] = (method, anchors[row], sentiment)
+                self.anchor_levels[anchor_id] = levels[row]
+            depth = levels.shape[1]
+            parts.append((levels[rows].ravel(), np.full(len(rows) * depth, engine.METHODS.index(method)),
+                          np.full(len(rows) * depth, engine.sentiment_sign(sentiment) if sentiment else 0),
+                          np.repeat(anchor_ids, depth)))
+        values, methods, directions, anchor_ids = (np.concatenate([old] + [part[i] for part in parts])
+                                                   for i, old in enumerate((self.values, self.methods,
+                                                                            self.directions, self.anchor_ids)))
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.methods = methods[order].astype(np.int8)
+        self.directions = directions[order].astype(np.int8)
+        self.anchor_ids = anchor_ids[order]
+        self.set_tolerance(self.tolerance / self.tick_size)
+
+    def remove_anchor(self, anchor_id):
+        if anchor_id not in self.anchors:
+            return 0
+        gone = self.anchor_positions(anchor_id)
+        removed = super().remove_anchor(anchor_id)
+        if removed:
+            self.breaks = np.delete(self.breaks, gone)
+            # The level that followed each removed one now sits at its old index minus the removals before it.
+            self._update_breaks(gone - np.arange(len(gone)))
+        return removed
+
+    # --- Zones ---
+
+    def _zone_bounds(self):
+        starts = np.flatnonzero(self.breaks)
+        return starts, np.append(starts[1:], len(self.values))
+
+    def zone(self, start, stop):
+        """The Zone made of levels ``start .. stop - 1``."""
+        methods = np.unique(self.methods[start:stop])
+        return Zone(float(self.values[start]), float(self.values[stop - 1]), int(stop - start),
+                    len(np.unique(self.anchor_ids[start:stop])), tuple(engine.METHODS[m] for m in methods))
+
+    def zones_at(self, positions):
+        """The zones holding the levels at ``positions``, in price order."""
+        starts, stops = self._zone_bounds()
+        zones = np.unique(np.searchsorted(starts, positions, side='right') - 1)
+        return [self.zone(starts[z], stops[z]) for z in zones]
+
+    def zone_of(self, price):
+        """The zone within the tolerance of ``price``, or None."""
+        if not len(self.values):
+            return None
+        i = np.searchsorted(self.values, price)
+        nearest = [j for j in (i - 1, i) if 0 <= j < len(self.values)]
+        j = min(nearest, key=lambda j: abs(self.values[j] - price))
+        if abs(self.values[j] - price) > self.tolerance:
+            return None
+        return self.zones_at(np.array([j]))[0]
+
+    def zones(self, min_levels=2, min_methods=1, limit=None):
+        """Zones ranked by contributing methods, then levels, then anchors; narrower zones first on ties."""
+        starts, stops = self._zone_bounds()
+        if not len(starts):
+            return []
+        counts = stops - starts
+        method_counts = np.zeros(len(starts), dtype=np.int64)
+        for code in range(len(engine.METHODS)):
+            method_counts += np.add.reduceat(self.methods == code, starts) > 0
+        zone_ids = np.cumsum(self.breaks) - 1
+        pairs = np.unique((zone_ids << ANCHOR_ID_BITS) | self.anchor_ids)
+        anchor_counts = np.bincount(pairs >> ANCHOR_ID_BITS, minlength=len(starts))
+        widths = self.values[stops - 1] - self.values[starts]
+
+        keep = np.flatnonzero((counts >= min_levels) & (method_counts >= min_methods))
+        ranked = keep[np.lexsort((widths[keep], -anchor_counts[keep], -counts[keep], -method_counts[keep]))]
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.zone(starts[z], stops[z]) for z in ranked]
+
+
+# --- Entry Point ---
+
+def load_anchors(path, tick_size=DEFAULT_TICK_SIZE, tolerance_ticks=DEFAULT_TOLERANCE_TICKS):
+    """{symbol: ConfluenceIndex} with every method added for each anchor row."""
+    indexes = {}
+    for chunk in batch.iter_chunks(path):
+        symbols, codes = np.unique(chunk['symbol'], return_inverse=True)
+        for code, symbol in enumerate(symbols.tolist()):
+            index = indexes.get(symbol)
+            if index is None:
+                index = indexes[symbol] = ConfluenceIndex(tick_size, tolerance_ticks)
+            rows = codes == code
+            index.add_sessions(chunk['high'][rows], chunk['low'][rows])
+    return indexes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the confluence zones of a file of anchors.")
+    parser.add_argument('anchors', help="CSV or Parquet with symbol, timestamp, high, low columns")
+    parser.add_argument('--tick-size', type=float, default=DEFAULT_TICK_SIZE)
+    parser.add_argument('--tolerance-ticks', type=float, default=DEFAULT_TOLERANCE_TICKS,
+                        help="largest gap between neighbouring levels of one zone (default: %(default)s)")
+    parser.add_argument('--min-methods', type=int, default=2,
+                        help="only show zones with levels from this many methods (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help="zones per symbol (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        indexes = load_anchors(args.anchors, args.tick_size, args.tolerance_ticks)
+    except (OSError, ValueError) as e:
+        print(f"confluence: {e}", file=sys.stderr)
+        return 1
+    for symbol, index in sorted(indexes.items()):
+        print(f"{symbol}: {len(index)} levels")
+        for zone in index.zones(min_methods=args.min_methods, limit=args.top):
+            print(f"  {zone.low:.6g} - {zone.high:.6g}  {zone.levels} levels, {zone.anchors} anchors, "
+                  f"{', '.join(zone.methods)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Headless level engine.
+
+Batch versions of the GANN BOX, 369 LVL, REV LVL and Middle L calculators.
+Every function takes an array of anchors and returns ``(levels, valid)``:
+``levels`` is a matrix with one row per anchor and ``valid`` is a boolean
+mask of the rows whose input was accepted. Rejected rows are filled with 0
+(integer methods) or NaN (REV LVL / Middle L) instead of raising, so a bad
+row never stops a batch.
+"""
+import functools
+import time
+
+import numpy as np
+
+import metrics
+
+# --- Method Configuration ---
+GANN_BOX_DEPTH = 10
+LVL369_STEPS = (3, 6, 9)
+REV_LVL_STEP = 2
+
+# Integer methods need "a price with at least 2 digits". The upper bound is
+# where float64 stops representing every integer exactly.
+MIN_INT_PRICE = 10
+MAX_PRICE = 2 ** 53
+
+SENTIMENTS = ('bullish', 'bearish')
+
+
+def sentiment_sign(sentiment):
+    """Returns +1 for 'bullish' and -1 for 'bearish'."""
+    if sentiment == 'bullish':
+        return 1
+    if sentiment == 'bearish':
+        return -1
+    raise ValueError(f"Unknown sentiment: {sentiment!r}")
+
+
+def _instrumented(method):
+    """Records latency, rows and rejected rows of a batch function when metrics are on."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            levels, valid = func(*args, **kwargs)
+            metrics.observe('gann_engine_call_seconds', time.perf_counter() - start, method=method)
+            metrics.count('gann_engine_rows_total', len(valid), method=method)
+            metrics.count('gann_engine_rejected_rows_total', len(valid) - int(np.count_nonzero(valid)), method=method)
+            return levels, valid
+        return wrapper
+    return decorate
+
+
+# --- Precomputed Tables ---
+
+# A level_tables.LevelTable; GANN BOX and 369 LVL batches whose anchors it
+# covers are answered by indexing it instead of computing the ladder.
+_level_table = None
+
+
+def use_level_table(table):
+    """Serves in-range integer anchors from ``table``; None goes back to computing."""
+    global _level_table
+    _level_table = table
+
+
+def _table_levels(method, anchors, valid, sentiment, depth):
+    """Level rows from the installed table, or None if it can't answer this batch."""
+    table = _level_table
+    if table is None or table.depths[method] != depth or not table.covers(anchors[valid]):
+        return None
+    levels = table.lookup(method, np.where(valid, anchors, table.min_price), sentiment)
+    levels[~valid] = 0
+    return levels
+
+
+# --- Input Normalisation ---
+
+def as_int_prices(prices):
+    """Returns int64 prices and the mask of whole-number prices in range."""
+    arr = np.atleast_1d(np.asarray(prices))
+    if arr.dtype.kind in 'iu':
+        ints = arr.astype(np.int64, copy=False)
+        valid = ints <= MAX_PRICE
+    else:
+        arr = arr.astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            valid = np.isfinite(arr) & (arr == np.floor(arr)) & (np.abs(arr) <= MAX_PRICE)
+        ints = np.where(valid, arr, 0).astype(np.int64)
+    valid &= ints >= MIN_INT_PRICE
+    return ints, valid
+
+
+def as_float_prices(prices):
+    """Returns float64 prices and the mask of finite, non-negative prices."""
+    arr = np.atleast_1d(np.asarray(prices, dtype=np.float64))
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(arr) & (arr >= 0)
+    return arr, valid
+
+
+# --- GANN BOX ---
+
+# Gate for each digital root; index 0 is the root of 0 only, which has no gate.
+GATE_TABLE = np.array([0, 12, 15, 18, 12, 15, 18, 12, 15, 18], dtype=np.int64)
+
+
+def digital_root(values):
+    """Repeated digit sum of a non-negative integer or int64 array.
+
+    Since 10 = 1 (mod 9), every digit sum keeps n mod 9 unchanged and the
+    repetition stops at 1..9, so for n > 0 the root is 1 + (n - 1) % 9.
+    """
+    if isinstance(values, (int, np.integer)):
+        return 1 + (int(values) - 1) % 9 if values else 0
+    values = np.asarray(values, dtype=np.int64)
+    return np.where(values > 0, 1 + (values - 1) % 9, 0)
+
+
+def gate_values(roots):
+    """Maps digital roots to GANN BOX gates (12, 15, 18); 0 means no gate."""
+    if isinstance(roots, (int, np.integer)):
+        return int(GATE_TABLE[roots])
+    return GATE_TABLE[np.asarray(roots, dtype=np.intp)]
+
+
+@_instrumented('gann_box')
+def gann_box_levels(prices, sentiment, depth=GANN_BOX_DEPTH):
+    """GANN BOX ladder: ``depth`` levels spaced by the price's gate value."""
+    sign = sentiment_sign(sentiment)
+    anchors, valid = as_int_prices(prices)
+    levels = _table_levels('gann_box', anchors, valid, sentiment, depth)
+    if levels is not None:
+        return levels, valid
+    gates = gate_values(digital_root(np.where(valid, anchors, 0)))
+    valid &= gates > 0
+    steps = np.arange(1, depth + 1, dtype=np.int64)
+    levels = anchors[:, None] + sign * gates[:, None] * steps
+    levels[~valid] = 0
+    return levels, valid
+
+
+# --- 369 LVL ---
+
+@_instrumented('lvl369')
+def lvl369_levels(prices, sentiment):
+    """369 LVL: the anchor shifted by 3, then 6, then 9 (levels 3/6/9)."""
+    sign = sentiment_sign(sentiment)
+    anchors, valid = as_int_prices(prices)
+    # The calculator's "at least 2 digits" counted the minus sign, so every negative integer is an anchor.
+    valid |= (anchors < 0) & (anchors >= -MAX_PRICE)
+    levels = _table_levels('lvl369', anchors, valid, sentiment, len(LVL369_STEPS))
+    if levels is not None:
+        return levels, valid
+    offsets = np.cumsum(LVL369_STEPS, dtype=np.int64)
+    levels = anchors[:, None] + sign * offsets
+    levels[~valid] = 0
+    return levels, valid
+
+
+# --- REV LVL ---
+
+@_instrumented('rev_lvl')
+def rev_lvl_levels(prices, sentiment):
+    """REV LVL: ``(sqrt(price) +/- 2) ** 2`` as a one-column matrix."""
+    sign = sentiment_sign(sentiment)
+    anchors, valid = as_float_prices(prices)
+    roots = np.sqrt(np.where(valid, anchors, 0.0)) + sign * REV_LVL_STEP
+    levels = (roots * roots)[:, None]
+    levels[~valid] = np.nan
+    return levels, valid
+
+
+# --- Middle L ---
+
+@_instrumented('middle_l')
+def middle_l_levels(highs, lows):
+    """Middle L: geometric mean of each high/low pair as a one-column matrix."""
+    highs, valid_high = as_float_prices(highs)
+    lows, valid_low = as_float_prices(lows)
+    if highs.shape != lows.shape:
+        raise ValueError("highs and lows must have the same length")
+    valid = valid_high & valid_low
+    levels = np.sqrt(np.where(valid, highs * lows, 0.0))[:, None]
+    levels[~valid] = np.nan
+    return levels, valid
+
+
+# Single-anchor methods by name; Middle L takes a high/low pair instead.
+ANCHOR_METHODS = {
+    'gann_box': gann_box_levels,
+    'lvl369': lvl369_levels,
+    'rev_lvl': rev_lvl_levels,
+}
+METHODS = ('gann_box', 'lvl369', 'rev_lvl', 'middle_l')
@@ -0,0 +1,213 @@
+"""Columnar export of every calculation in a session.
+
+CalculationLog accumulates one record per level in a growable NumPy
+structured array: timestamp, method, anchor (and the low of a Middle L
+pair), sentiment, level index and value. flush() appends the records to:
+
+    *.npy       one structured array, appended in place; np.load(mmap_mode='r')
+    *.parquet   a directory with one Parquet part per flush (needs pyarrow)
+    *.arrow     a directory with one Arrow IPC part per flush (needs pyarrow)
+    *.csv       plain CSV, header written once
+
+Methods are stored as their index in engine.METHODS and sentiments as
++1 (bullish), -1 (bearish) or 0 (Middle L).
+"""
+import ast
+import csv
+import os
+import time
+
+import numpy as np
+
+import engine
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('method', 'i1'),
+    ('anchor', '<f8'),
+    ('anchor_low', '<f8'),
+    ('sentiment', 'i1'),
+    ('level', '<i2'),
+    ('value', '<f8'),
+])
+INITIAL_CAPACITY = 1024
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_ALIGNMENT = 64
+# Room in the .npy header for the row count to grow without moving the data.
+NPY_SHAPE_WIDTH = 20
+
+
+class CalculationLog:
+    """Growable columnar buffer of calculation records."""
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.records = np.empty(capacity, dtype=RECORD_DTYPE)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, count):
+        needed = self.size + count
+        if needed > len(self.records):
+            grown = np.empty(max(needed, 2 * len(self.records)), dtype=RECORD_DTYPE)
+            grown[:self.size] = self.records[:self.size]
+            self.records = grown
+
+    def record(self, method, anchor, sentiment, levels, timestamp=None):
+        """Adds the levels of one calculation; ``anchor`` is a (high, low) pair for Middle L."""
+        levels = np.asarray(levels, dtype=np.float64).ravel()
+        if method == 'middle_l':
+            anchor, anchor_low = anchor
+        else:
+            anchor_low = np.nan
+        count = len(levels)
+        self._reserve(count)
+        rows = self.records[self.size:self.size + count]
+        rows['timestamp'] = time.time() if timestamp is None else timestamp
+        rows['method'] = engine.METHODS.index(method)
+        rows['anchor'] = anchor
+        rows['anchor_low'] = anchor_low
+        rows['sentiment'] = engine.sentiment_sign(sentiment) if sentiment else 0
+        rows['level'] = np.arange(1, count + 1)
+        rows['value'] = levels
+        self.size += count
+
+    def record_batch(self, method, anchors, sentiment, levels, valid, timestamp=None, anchor_lows=None):
+        """Adds the valid rows of an engine result (levels matrix + mask) in one step."""
+        rows_index = np.flatnonzero(valid)
+        depth = levels.shape[1]
+        count = len(rows_index) * depth
+        self._reserve(count)
+        rows = self.records[self.size:self.size + count]
+        rows['timestamp'] = time.time() if timestamp is None else timestamp
+        rows['method'] = engine.METHODS.index(method)
+        rows['anchor'] = np.repeat(np.asarray(anchors, dtype=np.float64)[rows_index], depth)
+        if anchor_lows is None:
+            rows['anchor_low'] = np.nan
+        else:
+            rows['anchor_low'] = np.repeat(np.asarray(anchor_lows, dtype=np.float64)[rows_index], depth)
+        rows['sentiment'] = engine.sentiment_sign(sentiment) if sentiment else 0
+        rows['level'] = np.tile(np.arange(1, depth + 1), len(rows_index))
+        rows['value'] = levels[rows_index].ravel()
+        self.size += count
+
+    def extend(self, records):
+        """Adds rows that are already RECORD_DTYPE records, e.g. restored from a journal."""
+        count = len(records)
+        self._reserve(count)
+        self.records[self.size:self.size + count] = records
+        self.size += count
+
+    def view(self):
+        """The recorded rows (a view, not a copy)."""
+        return self.records[:self.size]
+
+    def clear(self):
+        self.size = 0
+
+    def flush(self, path):
+        """Appends all records to ``path`` (format by extension) and empties the buffer."""
+        records = self.view()
+        if path.endswith('.npy'):
+            append_npy(path, records)
+        elif path.endswith('.parquet'):
+            write_arrow_part(path, records, 'parquet')
+        elif path.endswith('.arrow'):
+            write_arrow_part(path, records, 'arrow')
+        else:
+            append_csv(path, records)
+        written = self.size
+        self.clear()
+        return written
+
+
+# --- .npy ---
+
+def _npy_header(count, data_offset=None):
+    header = repr({'descr': RECORD_DTYPE.descr, 'fortran_order': False, 'shape': (count,)})
+    if data_offset is None:
+        room = len(header) + NPY_SHAPE_WIDTH + len(NPY_MAGIC) + 2 + 1
+        data_offset = -(-room // NPY_ALIGNMENT) * NPY_ALIGNMENT
+    header_len = data_offset - len(NPY_MAGIC) - 2
+    body = header.ljust(header_len - 1) + '\n'
+    if len(body) != header_len:
+        raise ValueError("npy header does not fit; the file needs rewriting")
+    return NPY_MAGIC + header_len.to_bytes(2, 'little') + body.encode('latin1')
+
+
+def append_npy(path, records):
+    """Appends structured records to a .npy file, rewriting only its header."""
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(_npy_header(len(records)))
+            f.write(records.tobytes())
+        return
+
+    with open(path, 'r+b') as f:
+        magic = f.read(len(NPY_MAGIC))
+        if magic != NPY_MAGIC:
+            raise ValueError(f"{path}: not a version 1.0 .npy file")
+        header_len = int.from_bytes(f.read(2), 'little')
+        header = ast.literal_eval(f.read(header_len).decode('latin1'))
+        if np.dtype(header['descr']) != RECORD_DTYPE:
+            raise ValueError(f"{path}: has a different record layout")
+        data_offset = len(NPY_MAGIC) + 2 + header_len
+        count = header['shape'][0] + len(records)
+        f.seek(data_offset + header['shape'][0] * RECORD_DTYPE.itemsize)
+        f.write(records.tobytes())
+        f.truncate()
+        f.seek(0)
+        f.write(_npy_header(count, data_offset))
+
+
+# --- Arrow / Parquet ---
+
+def records_to_table(records):
+    import pyarrow as pa
+
+    return pa.table({
+        'timestamp': pa.array(records['timestamp']),
+        'method': pa.DictionaryArray.from_arrays(
+            pa.array(records['method'], type=pa.int8()), pa.array(engine.METHODS)),
+        'anchor': pa.array(records['anchor']),
+        'anchor_low': pa.array(records['anchor_low']),
+        'sentiment': pa.array(records['sentiment']),
+        'level': pa.array(records['level']),
+        'value': pa.array(records['value']),
+    })
+
+
+def write_arrow_part(directory, records, file_format):
+    """Writes ``records`` as the next part file of a Parquet or Arrow IPC dataset directory."""
+    try:
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow export need pyarrow: pip install pyarrow")
+
+    os.makedirs(directory, exist_ok=True)
+    part = sum(1 for name in os.listdir(directory) if name.startswith('part-'))
+    path = os.path.join(directory, f'part-{part:05d}.{file_format}')
+    table = records_to_table(records)
+    if file_format == 'parquet':
+        pyarrow.parquet.write_table(table, path)
+    else:
+        with pyarrow.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+# --- CSV ---
+
+def append_csv(path, records):
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    methods = np.array(engine.METHODS, dtype=object)[records['method']]
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(RECORD_DTYPE.names)
+        writer.writerows(zip(
+            records['timestamp'].tolist(), methods.tolist(), records['anchor'].tolist(),
+            records['anchor_low'].tolist(), records['sentiment'].tolist(),
+            records['level'].tolist(), records['value'].tolist(),
+        ))
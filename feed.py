@@ -0,0 +1,258 @@
+"""Live price feed for the GUI.
+
+PriceFeed runs an asyncio loop on a background thread that reads ticks from
+a local source, tracks each symbol's session high and low, and recomputes
+the levels whenever either one moves. The resulting LevelUpdates go into a
+thread-safe queue that the Tk side drains with ``after()``; drain() keeps
+only the newest update per symbol, so bursts collapse into one redraw.
+Every tick is also kept in a bounded buffer for drain_prices(), which the
+chart uses to plot the full price series. FeedStats turns the tick count
+and the time updates waited in the queue into ticks per second and UI lag.
+
+Sources (one "symbol,timestamp,price" line per tick):
+
+    ticks.csv                   follow a file as lines are appended
+    tcp://127.0.0.1:9000        read from a local socket
+
+Timestamps are epoch seconds; sessions are UTC days. Symbols with a tick
+size (``tick_sizes``, e.g. from ticks.tick_sizes_from_env()) get levels in
+tick counts, and their LevelUpdate carries that tick size. replay.py plays
+a historical tick file through the same path.
+"""
+import asyncio
+import collections
+import math
+import queue
+import threading
+import time
+
+import cache
+import ticks
+
+LevelUpdate = collections.namedtuple('LevelUpdate', 'symbol timestamp price high low levels tick_size')
+FeedReport = collections.namedtuple('FeedReport', 'events_per_second lag_mean lag_max')
+
+SECONDS_PER_SESSION = 86400
+TAIL_POLL_SECONDS = 0.05
+# Ticks kept for drain_prices(); older ones are dropped when nobody drains them.
+MAX_BUFFERED_PRICES = 100_000
+STATS_WINDOW_SECONDS = 1.0
+
+
+def parse_tick(line):
+    """Parses "symbol,timestamp,price"; returns None for headers and bad lines, NaN and infinite prices included."""
+    parts = line.strip().split(',')
+    if len(parts) != 3:
+        return None
+    symbol, timestamp, price = parts
+    try:
+        price = float(price)
+    except ValueError:
+        return None
+    if not math.isfinite(price):
+        return None
+    try:
+        timestamp = float(timestamp)
+    except ValueError:
+        timestamp = time.time()
+    return symbol.strip(), timestamp, price
+
+
+# --- Sources ---
+
+async def tail_file(path, from_start=False, poll_interval=TAIL_POLL_SECONDS):
+    """Yields ticks from lines appended to ``path``, like ``tail -f``."""
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, 2)
+        pending = ''
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                await asyncio.sleep(poll_interval)
+                continue
+            pending += chunk
+            if not pending.endswith('\n'):
+                continue
+            tick = parse_tick(pending)
+            pending = ''
+            if tick is not None:
+                yield tick
+
+
+async def read_socket(host, port):
+    """Yields ticks from a newline-delimited TCP stream."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            tick = parse_tick(line.decode(errors='replace'))
+            if tick is not None:
+                yield tick
+    finally:
+        writer.close()
+
+
+def open_source(source, from_start=False):
+    if source.startswith('tcp://'):
+        host, _, port = source[len('tcp://'):].rpartition(':')
+        return read_socket(host or '127.0.0.1', int(port))
+    return tail_file(source, from_start)
+
+
+# --- Re-anchoring ---
+
+class SessionAnchors:
+    """Session high/low per symbol; recomputes levels when either changes."""
+    def __init__(self, level_cache=None, tick_sizes=None):
+        self.level_cache = level_cache or cache.LevelCache()
+        self.tick_sizes = tick_sizes or {}
+        self.sessions = {}      # symbol -> [session, high, low]
+
+    def on_tick(self, symbol, price, timestamp):
+        """Returns a LevelUpdate when the tick sets a new session high or low."""
+        session = int(timestamp // SECONDS_PER_SESSION)
+        state = self.sessions.get(symbol)
+        if state is None or state[0] != session:
+            state = self.sessions[symbol] = [session, price, price]
+        elif state[2] <= price <= state[1]:
+            return None
+        else:
+            state[1] = max(state[1], price)
+            state[2] = min(state[2], price)
+        tick_size = self.tick_sizes.get(symbol)
+        levels = self.levels(state[1], state[2], tick_size)
+        return LevelUpdate(symbol, timestamp, price, state[1], state[2], levels, tick_size)
+
+    def levels(self, high, low, tick_size=None):
+        """Levels keyed by (method, sentiment): highs anchor bullish, lows bearish."""
+        if tick_size is not None:
+            high = ticks.price_to_ticks(high, tick_size)
+            low = ticks.price_to_ticks(low, tick_size)
+        levels = {}
+        for method in ('gann_box', 'lvl369', 'rev_lvl'):
+            if method == 'rev_lvl' or tick_size is not None:
+                anchors = (high, low)
+            else:
+                anchors = (round(high), round(low))
+            levels[(method, 'bullish')] = self.level_cache.levels(method, anchors[0], 'bullish', tick_size)
+            levels[(method, 'bearish')] = self.level_cache.levels(method, anchors[1], 'bearish', tick_size)
+        levels[('middle_l', None)] = self.level_cache.levels('middle_l', (high, low), None, tick_size)
+        return levels
+
+
+class PriceFeed:
+    """Reads a tick source on a background asyncio thread and queues LevelUpdates."""
+    def __init__(self, source, from_start=False, tick_sizes=None):
+        self.source = source
+        self.from_start = from_start
+        self.updates = queue.Queue()          # (perf_counter when queued, LevelUpdate)
+        self.prices = collections.deque(maxlen=MAX_BUFFERED_PRICES)
+        self.anchors = SessionAnchors(tick_sizes=tick_sizes)
+        self.ticks = 0
+        self.error = None
+        # When the oldest update taken by the last drain() was queued, or None.
+        self.oldest_queued_at = None
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='price-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Cancels the reading task; a no-op once the source has ended and the loop is closed."""
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass    # the loop closed between the check and the call
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            self.error = e
+
+    def tick_source(self):
+        """Async iterator of (symbol, timestamp, price) ticks."""
+        return open_source(self.source, self.from_start)
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        try:
+            async for symbol, timestamp, price in self.tick_source():
+                if not math.isfinite(price):
+                    # A replayed file is not parsed by parse_tick; rounding NaN would stop the feed.
+                    continue
+                self.ticks += 1
+                self.prices.append((symbol, timestamp, price))
+                update = self.anchors.on_tick(symbol, price, timestamp)
+                if update is not None:
+                    self.updates.put((time.perf_counter(), update))
+        except asyncio.CancelledError:
+            pass
+
+    def metric_samples(self):
+        """Samples for metrics.register_collector."""
+        labels = {'source': self.source}
+        return [
+            ('gann_feed_ticks_total', labels, self.ticks, 'counter'),
+            ('gann_feed_queue_depth', labels, self.updates.qsize()),
+        ]
+
+    def drain(self):
+        """Takes everything queued so far; returns the newest update per symbol."""
+        latest = {}
+        self.oldest_queued_at = None
+        while True:
+            try:
+                queued_at, update = self.updates.get_nowait()
+            except queue.Empty:
+                return latest
+            if self.oldest_queued_at is None:
+                self.oldest_queued_at = queued_at
+            latest[update.symbol] = update
+
+    def drain_prices(self):
+        """Takes every buffered tick, oldest first, as (symbol, timestamp, price)."""
+        prices = []
+        while True:
+            try:
+                prices.append(self.prices.popleft())
+            except IndexError:
+                return prices
+
+
+class FeedStats:
+    """Ticks per second and UI lag, reported once per window.
+
+    UI lag is the time from an update being queued to the widgets showing
+    it; observe_lag() takes one sample per drain that applied updates.
+    """
+    def __init__(self, window=STATS_WINDOW_SECONDS):
+        self.window = window
+        self.started = time.perf_counter()
+        self.ticks = 0
+        self.lags = []
+        self.report = None
+
+    def observe_lag(self, seconds):
+        self.lags.append(seconds)
+
+    def sample(self, ticks):
+        """Closes the window once it is old enough; returns the latest FeedReport, or None before the first."""
+        now = time.perf_counter()
+        elapsed = now - self.started
+        if elapsed >= self.window:
+            lags = self.lags
+            self.report = FeedReport((ticks - self.ticks) / elapsed,
+                                     sum(lags) / len(lags) if lags else 0.0, max(lags, default=0.0))
+            self.started, self.ticks, self.lags = now, ticks, []
+        return self.report
@@ -0,0 +1,254 @@
+"""Append-only journal of every calculation, for restoring a session.
+
+Each calculated level is one fixed-width record (RECORD_DTYPE) appended to
+the file as it is made, so a crash or a restart loses nothing. Every
+CHECKPOINT_INTERVAL records the newest calculation of each (method,
+sentiment) is appended again as checkpoint records and the header points
+at them. Opening a journal maps the file with np.memmap and reads only the
+last checkpoint and the records after it, so restoring takes the same few
+milliseconds after millions of records:
+
+    journal = Journal('session.gj')
+    journal.latest                 # {(method, sentiment): Calculation}
+    journal.unsaved()              # export.RECORD_DTYPE rows not yet saved
+    journal.record('rev_lvl', 1234.5, 'bullish', [1305.2], TickSize(1, 2))
+    journal.mark_saved()           # after "save file" wrote them elsewhere
+    journal.start_session()        # after restoring: a new segment for this session
+
+File layout: a HEADER_SIZE byte header (magic, record size, the index of
+the last checkpoint and the number of records already saved), then the
+records. A record torn by a crash is dropped when the journal is opened.
+
+The file never holds more than one session: start_session() and
+mark_saved() compact it to a single checkpoint of ``latest``, so restoring
+reads only the last session's records however long the journal has been in
+use. Records the previous session left unsaved are restored once; if they
+are not saved in the session that restored them they are gone.
+An open journal holds an exclusive lock on its file, so a second instance
+of the program gets JournalLocked instead of overwriting the records.
+The GUI journals to GANN_JOURNAL, or DEFAULT_PATH when it is unset; set it
+to 0 to turn the journal off.
+"""
+import collections
+import os
+import struct
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+import engine
+import export
+import ticks
+
+MAGIC = b'GANNJRNL'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')      # magic, version, record size, reserved, checkpoint, saved
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('anchor', '<f8'),
+    ('anchor_low', '<f8'),
+    ('value', '<f8'),
+    ('level', '<i2'),
+    ('method', 'i1'),
+    ('sentiment', 'i1'),
+    ('kind', 'i1'),
+    ('decimals', 'i1'),         # tick size of the typed price; -1 when there was none
+    ('tick_units', '<i4'),
+])
+LEVEL, CHECKPOINT = 0, 1
+CHECKPOINT_INTERVAL = 4096
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.gann_journal')
+
+Calculation = collections.namedtuple('Calculation', 'timestamp method anchor sentiment levels tick_size')
+
+
+class JournalLocked(OSError):
+    """Another open journal, usually in another instance of the program, holds the file."""
+
+
+def _lock(file, path):
+    try:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        raise JournalLocked(f"{path}: in use by another instance") from None
+
+
+def _sentiment_name(sign):
+    return {1: 'bullish', -1: 'bearish'}.get(int(sign))
+
+
+class Journal:
+    """An open journal file; ``latest`` holds the newest calculation per (method, sentiment)."""
+    def __init__(self, path):
+        self.path = path
+        self.latest = {}
+        self._saved = 0
+        self._checkpoint = 0
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        self.file = os.fdopen(os.open(path, flags, 0o644), 'r+b', buffering=0)
+        try:
+            _lock(self.file, path)
+            if os.fstat(self.file.fileno()).st_size == 0:
+                self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, 0, 0, 0).ljust(HEADER_SIZE, b'\0'))
+                self.file.seek(0)
+            self._load()
+        except Exception:
+            self.file.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def _load(self):
+        magic, version, record_size, _, checkpoint, saved = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a calculation journal")
+        if record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{self.path}: has a different record layout")
+        size = os.fstat(self.file.fileno()).st_size
+        self.count = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if HEADER_SIZE + self.count * RECORD_DTYPE.itemsize != size:
+            # The last write was cut short; drop the partial record.
+            self.file.truncate(HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+        self._checkpoint = checkpoint if checkpoint <= self.count else 0
+        self._saved = min(saved, self.count)
+        self._since_checkpoint = self.count - self._checkpoint
+        for calculation in _calculations(self.records(self._checkpoint)):
+            self.latest[(calculation.method, calculation.sentiment)] = calculation
+
+    def records(self, start=0, stop=None):
+        """Records ``start .. stop - 1`` as a read-only memmap (an empty array when there are none)."""
+        stop = self.count if stop is None else min(stop, self.count)
+        if start >= stop:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r',
+                         offset=HEADER_SIZE + start * RECORD_DTYPE.itemsize, shape=(stop - start,))
+
+    def unsaved(self):
+        """The level records since the last mark_saved(), as export.RECORD_DTYPE rows."""
+        records = self.records(self._saved)
+        levels = records['kind'] == LEVEL
+        rows = np.empty(np.count_nonzero(levels), dtype=export.RECORD_DTYPE)
+        # Field by field straight from the map; masking whole records first copies them twice.
+        for name in export.RECORD_DTYPE.names:
+            rows[name] = records[name][levels]
+        return rows
+
+    # --- Writing ---
+
+    def record(self, method, anchor, sentiment, levels, tick_size=None, timestamp=None):
+        """Appends one calculation; ``anchor`` is a (high, low) pair for Middle L."""
+        calculation = Calculation(time.time() if timestamp is None else timestamp, method, anchor, sentiment,
+                                  np.asarray(levels, dtype=np.float64).ravel(), tick_size)
+        if not len(calculation.levels):
+            return
+        self._append(_to_records(calculation, LEVEL))
+        self.latest[(method, sentiment)] = calculation
+        if self._since_checkpoint >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Appends the newest calculation of every (method, sentiment) and points the header at it."""
+        start = self.count
+        if self.latest:
+            self._append(np.concatenate([_to_records(c, CHECKPOINT) for c in self.latest.values()]))
+        self._checkpoint = start
+        self._since_checkpoint = 0
+        self._write_header()
+
+    def mark_saved(self):
+        """Records that everything journaled so far has been saved; nothing is left for unsaved()."""
+        self._saved = self.count
+        self._write_header()
+        self.compact()
+
+    def start_session(self):
+        """Starts this session's segment once the previous one is restored; its unsaved records are dropped."""
+        self.compact()
+
+    def compact(self):
+        """Cuts the file down to one checkpoint of ``latest``.
+
+        Every step leaves a file that opens to the same ``latest``: the
+        checkpoint is appended and pointed at first, then copied to the front,
+        the file cut after the copy (a checkpoint past the end reads as 0),
+        and only then is the header pointed at the front.
+        """
+        self.checkpoint()
+        start, size = self._checkpoint, self.count - self._checkpoint
+        if start < size:
+            return      # the copy would overlap its source; the file is already this small
+        records = self.records(start).tobytes()
+        self.file.seek(HEADER_SIZE)
+        self.file.write(records)
+        self.file.truncate(HEADER_SIZE + size * RECORD_DTYPE.itemsize)
+        self.count = self._saved = size
+        self._checkpoint = self._since_checkpoint = 0
+        self._write_header()
+
+    def _append(self, records):
+        self.file.seek(HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+        self.file.write(records.tobytes())
+        self.count += len(records)
+        self._since_checkpoint += len(records)
+
+    def _write_header(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, 0, self._checkpoint, self._saved))
+
+    def close(self):
+        self.file.close()
+
+
+def _to_records(calculation, kind):
+    count = len(calculation.levels)
+    records = np.zeros(count, dtype=RECORD_DTYPE)
+    if calculation.method == 'middle_l':
+        records['anchor'], records['anchor_low'] = calculation.anchor
+    else:
+        records['anchor'], records['anchor_low'] = calculation.anchor, np.nan
+    records['timestamp'] = calculation.timestamp
+    records['value'] = calculation.levels
+    records['level'] = np.arange(1, count + 1)
+    records['method'] = engine.METHODS.index(calculation.method)
+    records['sentiment'] = engine.sentiment_sign(calculation.sentiment) if calculation.sentiment else 0
+    records['kind'] = kind
+    tick_size = calculation.tick_size
+    records['decimals'] = -1 if tick_size is None else tick_size.decimals
+    records['tick_units'] = 0 if tick_size is None else tick_size.units
+    return records
+
+
+def _calculations(records):
+    """Splits records into Calculations; each one starts at its level 1 record."""
+    starts = np.flatnonzero(records['level'] == 1)
+    stops = np.append(starts[1:], len(records))
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        first = records[start]
+        method = engine.METHODS[first['method']]
+        if method == 'middle_l':
+            anchor = (float(first['anchor']), float(first['anchor_low']))
+        else:
+            anchor = float(first['anchor'])
+        tick_size = None if first['decimals'] < 0 else ticks.TickSize(int(first['tick_units']), int(first['decimals']))
+        yield Calculation(float(first['timestamp']), method, anchor, _sentiment_name(first['sentiment']),
+                          np.array(records['value'][start:stop]), tick_size)
+
+
+def path_from_env():
+    """GANN_JOURNAL, DEFAULT_PATH when it is unset, or None when it is 0 or empty."""
+    path = os.environ.get('GANN_JOURNAL')
+    if path is None:
+        return DEFAULT_PATH
+    return None if path in ('', '0') else path
@@ -0,0 +1,106 @@
+"""Lazy, unbounded GANN BOX ladders.
+
+A GANN BOX ladder is the arithmetic progression ``anchor + sign * gate * k``
+for k = 1, 2, ... . GannLadder keeps only the anchor and the step, so any
+rung, slice, price range or nearest rung is answered in closed form, and
+values are produced only when iterated:
+
+    ladder = GannLadder(2000, 'bullish')
+    ladder[0], ladder.level(25)      # 2015, 2375 (index 0 is level 1)
+    ladder[10:20]                    # range of levels 11..20
+    ladder.between(2100, 2400)       # range of every level in [2100, 2400]
+    ladder.nearest(2222)             # (15, 2225)
+
+Slices and range queries return ``range`` objects, which are lazy too. With
+a tick size the anchor and every value are tick counts (see ticks.py).
+"""
+import itertools
+import math
+
+import engine
+
+
+def _floor_div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return math.floor(a / b)
+
+
+def _ceil_div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return -(-a // b)
+    return math.ceil(a / b)
+
+
+class GannLadder:
+    """GANN BOX levels of one anchor, to any depth."""
+    __slots__ = ('anchor', 'sentiment', 'step')
+
+    def __init__(self, anchor, sentiment, tick_size=None):
+        anchor = int(anchor)
+        units = tick_size.units if tick_size is not None else 1
+        digits = anchor * units
+        if not engine.MIN_INT_PRICE <= digits <= engine.MAX_PRICE:
+            raise ValueError(f"GANN BOX needs a whole price from {engine.MIN_INT_PRICE} up to {engine.MAX_PRICE}")
+        self.anchor = anchor
+        self.sentiment = sentiment
+        self.step = engine.sentiment_sign(sentiment) * engine.gate_values(engine.digital_root(digits))
+
+    def __repr__(self):
+        return f"GannLadder({self.anchor}, {self.sentiment!r}, step={self.step})"
+
+    def level(self, k):
+        """Level ``k`` (1-based), the k-th rung away from the anchor."""
+        if k < 1:
+            raise IndexError("ladder levels start at 1")
+        return self.anchor + self.step * k
+
+    def __getitem__(self, index):
+        """``ladder[i]`` is level i + 1; a slice with a stop is a range of levels."""
+        if isinstance(index, slice):
+            start, stop, stride = index.start or 0, index.stop, index.step or 1
+            if stop is None:
+                raise ValueError("the ladder is unbounded; give the slice a stop or iterate it")
+            if start < 0 or stop < 0 or stride < 1:
+                raise ValueError("ladder slices need non-negative bounds and a positive step")
+            stop = max(stop, start)
+            return range(self.level(start + 1), self.anchor + self.step * (stop + 1), self.step * stride)
+        if index < 0:
+            raise IndexError("the ladder is unbounded; negative indexes have no meaning")
+        return self.level(index + 1)
+
+    def __iter__(self):
+        return itertools.count(self.anchor + self.step, self.step)
+
+    def __contains__(self, value):
+        offset = value - self.anchor
+        return offset % self.step == 0 and offset // self.step >= 1
+
+    def levels(self, count, first=1):
+        """Levels ``first`` .. ``first + count - 1`` as a range."""
+        return self[first - 1:first - 1 + count]
+
+    def rung_of(self, price):
+        """Fractional rung number of ``price`` (1.0 is level 1, 0.0 the anchor)."""
+        return (price - self.anchor) / self.step
+
+    def between(self, low, high):
+        """Every level in [low, high], ordered by rung, as a range."""
+        if self.step > 0:
+            first = _ceil_div(low - self.anchor, self.step)
+            last = _floor_div(high - self.anchor, self.step)
+        else:
+            first = _ceil_div(high - self.anchor, self.step)
+            last = _floor_div(low - self.anchor, self.step)
+        first = max(first, 1)
+        last = max(last, first - 1)
+        return range(self.anchor + self.step * first, self.anchor + self.step * (last + 1), self.step)
+
+    def nearest(self, price):
+        """(k, level) of the rung closest to ``price``; ties go to the rung nearer the anchor."""
+        offset = price - self.anchor
+        k = _floor_div(offset, self.step)
+        if abs(offset - self.step * (k + 1)) < abs(offset - self.step * k):
+            k += 1
+        k = max(k, 1)
+        return k, self.level(k)
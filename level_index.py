@@ -0,0 +1,166 @@
+"""In-memory index of live levels.
+
+Levels are kept in sorted, contiguous NumPy arrays (value, method, direction,
+anchor id), so "nearest level above/below" and "levels within N ticks" are
+binary searches. Adding or removing an anchor only records the change; the
+next read of the arrays merges every change since the last read in one pass:
+the new levels are sorted and inserted at their binary-search positions, and
+the removed anchors are masked out. Updates between two queries cost
+O(n + k log k) together instead of one full copy of the arrays each.
+"""
+import collections
+
+import numpy as np
+
+import engine
+
+Level = collections.namedtuple('Level', 'value method direction anchor_id')
+Levels = collections.namedtuple('Levels', 'values methods directions anchor_ids')
+
+DEFAULT_TICK_SIZE = 0.01
+
+
+def _merged(name):
+    """A sorted array attribute that applies the pending updates before it is read."""
+    def get(self):
+        if self._pending or self._removed:
+            self._merge()
+        return getattr(self, name)
+
+    def set(self, array):
+        setattr(self, name, array)
+    return property(get, set)
+
+
+class LevelIndex:
+    """Sorted levels for one symbol."""
+    values = _merged('_values')
+    methods = _merged('_methods')           # position in engine.METHODS
+    directions = _merged('_directions')     # +1 bullish, -1 bearish, 0 Middle L
+    anchor_ids = _merged('_anchor_ids')
+
+    def __init__(self, tick_size=DEFAULT_TICK_SIZE):
+        self.tick_size = tick_size
+        self._values = np.empty(0, dtype=np.float64)
+        self._methods = np.empty(0, dtype=np.int8)
+        self._directions = np.empty(0, dtype=np.int8)
+        self._anchor_ids = np.empty(0, dtype=np.int64)
+        self._pending = []                              # (values, methods, directions, anchor ids) to insert
+        self._removed = set()                           # anchor ids to mask out
+        self.anchors = {}                               # anchor id -> (method, anchor, sentiment)
+        self.anchor_levels = {}                         # anchor id -> its level values
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    # --- Updates ---
+
+    def add_levels(self, levels, method, anchor, sentiment=None):
+        """Adds precomputed levels for one anchor; returns the new anchor id."""
+        levels = np.sort(np.asarray(levels, dtype=np.float64).ravel())
+        anchor_id = self._next_id
+        self._next_id += 1
+        self.anchors[anchor_id] = (method, anchor, sentiment)
+        self.anchor_levels[anchor_id] = levels
+
+        count = len(levels)
+        direction = engine.sentiment_sign(sentiment) if sentiment else 0
+        self._pending.append((levels, np.full(count, engine.METHODS.index(method), dtype=np.int8),
+                              np.full(count, direction, dtype=np.int8), np.full(count, anchor_id, dtype=np.int64)))
+        return anchor_id
+
+    def add_anchor(self, method, anchor, sentiment=None):
+        """Computes and adds the levels of one anchor.
+
+        ``anchor`` is a price, or a (high, low) pair for Middle L. Returns the
+        anchor id, or None when the engine rejects the anchor.
+        """
+        if method == 'middle_l':
+            high, low = anchor
+            levels, valid = engine.middle_l_levels([high], [low])
+        else:
+            levels, valid = engine.ANCHOR_METHODS[method]([anchor], sentiment)
+        if not valid[0]:
+            return None
+        return self.add_levels(levels[0], method, anchor, sentiment)
+
+    def remove_anchor(self, anchor_id):
+        """Removes every level of ``anchor_id``; returns how many were removed."""
+        if anchor_id not in self.anchors:
+            return 0
+        del self.anchors[anchor_id]
+        self._removed.add(anchor_id)
+        return len(self.anchor_levels.pop(anchor_id))
+
+    def _merge(self):
+        """Applies every update since the last merge in one pass over the arrays."""
+        arrays = [self._values, self._methods, self._directions, self._anchor_ids]
+        if self._pending:
+            parts = [np.concatenate(column) for column in zip(*self._pending)]
+            order = np.argsort(parts[0], kind='stable')
+            positions = np.searchsorted(arrays[0], parts[0][order])
+            arrays = [np.insert(array, positions, part[order]) for array, part in zip(arrays, parts)]
+            self._pending.clear()
+        if self._removed:
+            # Ids are never reused, so this also drops levels that were added and removed before a merge.
+            removed = np.fromiter(self._removed, dtype=np.int64, count=len(self._removed))
+            keep = ~np.isin(arrays[3], removed)
+            arrays = [array[keep] for array in arrays]
+            self._removed.clear()
+        self._values, self._methods, self._directions, self._anchor_ids = arrays
+
+    def anchor_positions(self, anchor_id):
+        """Ascending indexes of ``anchor_id``'s levels, found by binary search on its level values."""
+        levels = np.unique(self.anchor_levels[anchor_id])
+        starts = np.searchsorted(self.values, levels, side='left').tolist()
+        stops = np.searchsorted(self.values, levels, side='right').tolist()
+        # Only the runs of equal values holding this anchor's levels are checked for its id.
+        candidates = np.concatenate([np.empty(0, dtype=np.intp)] +
+                                    [np.arange(start, stop) for start, stop in zip(starts, stops)])
+        return candidates[self.anchor_ids[candidates] == anchor_id]
+
+    def replace_anchor(self, anchor_id, anchor):
+        """Moves an existing anchor to a new price; returns the new anchor id."""
+        method, _, sentiment = self.anchors[anchor_id]
+        self.remove_anchor(anchor_id)
+        return self.add_anchor(method, anchor, sentiment)
+
+    # --- Queries ---
+
+    def level_at(self, i):
+        return Level(float(self.values[i]), engine.METHODS[self.methods[i]],
+                     int(self.directions[i]), int(self.anchor_ids[i]))
+
+    def above(self, price):
+        """Nearest level strictly above ``price``, or None."""
+        i = np.searchsorted(self.values, price, side='right')
+        return self.level_at(i) if i < len(self.values) else None
+
+    def below(self, price):
+        """Nearest level strictly below ``price``, or None."""
+        i = np.searchsorted(self.values, price, side='left')
+        return self.level_at(i - 1) if i else None
+
+    def nearest(self, price):
+        """Closest level to ``price`` on either side, or None."""
+        if not len(self.values):
+            return None
+        i = np.searchsorted(self.values, price)
+        if i == 0:
+            return self.level_at(0)
+        if i == len(self.values):
+            return self.level_at(i - 1)
+        return self.level_at(i if self.values[i] - price < price - self.values[i - 1] else i - 1)
+
+    def between(self, low, high):
+        """Levels in [low, high] as array views, in ascending order."""
+        start = np.searchsorted(self.values, low, side='left')
+        stop = np.searchsorted(self.values, high, side='right')
+        return Levels(self.values[start:stop], self.methods[start:stop],
+                      self.directions[start:stop], self.anchor_ids[start:stop])
+
+    def within(self, price, ticks):
+        """Levels within +/- ``ticks`` ticks of ``price``."""
+        distance = ticks * self.tick_size
+        return self.between(price - distance, price + distance)
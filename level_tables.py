@@ -0,0 +1,160 @@
+"""Precomputed, memory-mapped GANN BOX and 369 LVL tables.
+
+For whole-number anchors both methods depend only on the price and the
+sentiment, so their level rows can be computed once for a price range and
+stored in a file. Every process that opens the file maps the same pages,
+and engine lookups for in-range anchors become plain array indexing:
+
+    python level_tables.py build levels.tbl --min 10 --max 1000000
+    python level_tables.py info levels.tbl
+
+    engine.use_level_table(level_tables.LevelTable('levels.tbl'))
+
+The 64-byte header holds a format version and a fingerprint of the engine
+settings the table was built with; a table that no longer matches the
+engine is refused with StaleTableError.
+"""
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+import engine
+
+MAGIC = b'GANNTBL\x00'
+TABLE_VERSION = 1
+HEADER = struct.Struct('<8sIIqqII')
+HEADER_SIZE = 64
+BUILD_CHUNK = 1_000_000
+SECTIONS = (
+    ('gann_box', 'bullish'),
+    ('gann_box', 'bearish'),
+    ('lvl369', 'bullish'),
+    ('lvl369', 'bearish'),
+)
+
+
+class StaleTableError(ValueError):
+    """The table file was built by a different format or engine configuration."""
+
+
+def engine_fingerprint():
+    """CRC of the engine settings that determine the tabulated levels."""
+    settings = repr((engine.GANN_BOX_DEPTH, engine.LVL369_STEPS, engine.GATE_TABLE.tolist()))
+    return zlib.crc32(settings.encode())
+
+
+def method_depth(method):
+    return engine.GANN_BOX_DEPTH if method == 'gann_box' else len(engine.LVL369_STEPS)
+
+
+def build(path, min_price, max_price):
+    """Writes a table covering ``min_price..max_price`` (inclusive), chunk by chunk.
+
+    The table is built next to ``path`` and renamed over it when complete, so
+    an interrupted build never leaves a half-filled table behind.
+    """
+    min_price = max(min_price, engine.MIN_INT_PRICE)
+    if max_price < min_price or max_price > engine.MAX_PRICE:
+        raise ValueError("invalid price range")
+    count = max_price - min_price + 1
+    gann_depth, lvl369_depth = method_depth('gann_box'), method_depth('lvl369')
+    header = HEADER.pack(MAGIC, TABLE_VERSION, engine_fingerprint(), min_price, max_price, gann_depth, lvl369_depth)
+
+    partial_path = path + '.partial'
+    try:
+        with open(partial_path, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\x00'))
+            f.truncate(HEADER_SIZE + count * 8 * 2 * (gann_depth + lvl369_depth))
+
+        data = np.memmap(partial_path, dtype=np.int64, mode='r+', offset=HEADER_SIZE)
+        offset = 0
+        for method, sentiment in SECTIONS:
+            depth = method_depth(method)
+            section = data[offset:offset + count * depth].reshape(count, depth)
+            for start in range(0, count, BUILD_CHUNK):
+                stop = min(start + BUILD_CHUNK, count)
+                prices = np.arange(min_price + start, min_price + stop, dtype=np.int64)
+                levels, _ = engine.ANCHOR_METHODS[method](prices, sentiment)
+                section[start:stop] = levels
+            offset += count * depth
+        data.flush()
+        del data
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+def install(path):
+    """Opens the table at ``path`` and makes the engine use it (no-op for None)."""
+    if path:
+        engine.use_level_table(LevelTable(path))
+
+
+class LevelTable:
+    """Read-only view of a table file, shared between processes through mmap."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            raise StaleTableError(f"{path}: not a level table")
+        magic, version, fingerprint, min_price, max_price, gann_depth, lvl369_depth = HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise StaleTableError(f"{path}: not a level table")
+        if version != TABLE_VERSION:
+            raise StaleTableError(f"{path}: table format {version}, expected {TABLE_VERSION}")
+        if fingerprint != engine_fingerprint():
+            raise StaleTableError(f"{path}: built for different engine settings; rebuild it")
+
+        self.min_price = min_price
+        self.max_price = max_price
+        self.depths = {'gann_box': gann_depth, 'lvl369': lvl369_depth}
+        count = max_price - min_price + 1
+        data = np.memmap(path, dtype=np.int64, mode='r', offset=HEADER_SIZE)
+        self.sections = {}
+        offset = 0
+        for method, sentiment in SECTIONS:
+            depth = self.depths[method]
+            self.sections[(method, sentiment)] = data[offset:offset + count * depth].reshape(count, depth)
+            offset += count * depth
+
+    def covers(self, prices):
+        """True when every price lies inside the table's range."""
+        return not len(prices) or (prices.min() >= self.min_price and prices.max() <= self.max_price)
+
+    def lookup(self, method, prices, sentiment):
+        """Level rows for in-range int64 ``prices`` (a copy, one gather)."""
+        return self.sections[(method, sentiment)][prices - self.min_price]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect precomputed level tables.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build_parser = commands.add_parser('build', help="precompute a table file")
+    build_parser.add_argument('path')
+    build_parser.add_argument('--min', type=int, default=engine.MIN_INT_PRICE, help="lowest price (default: 10)")
+    build_parser.add_argument('--max', type=int, required=True, help="highest price")
+    info_parser = commands.add_parser('info', help="show a table's range and check it is current")
+    info_parser.add_argument('path')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            build(args.path, args.min, args.max)
+        table = LevelTable(args.path)
+    except (OSError, ValueError) as e:
+        print(f"level_tables: {e}", file=sys.stderr)
+        return 1
+    print(f"{table.path}: prices {table.min_price}..{table.max_price}, "
+          f"GANN BOX depth {table.depths['gann_box']}, 369 LVL depth {table.depths['lvl369']}, current")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Opt-in instrumentation.
+
+Calculation entry points and GUI actions are wrapped with ``timed``; while
+metrics are disabled (the default) the wrapper is one flag check before the
+real call. Enable with ``GANN_METRICS=1`` or ``metrics.enable()``.
+
+Metrics are exported in the Prometheus text format, either as a file
+(``GANN_METRICS_FILE``, written at exit, or ``write_textfile``) or over
+HTTP on 127.0.0.1 (``GANN_METRICS_PORT`` or ``serve``). ``GANN_PROFILE=path``
+also starts the sampling profiler and writes folded stacks at exit.
+"""
+import bisect
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0)
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+enabled = os.environ.get('GANN_METRICS', '') not in ('', '0')
+
+_lock = threading.Lock()
+_counters = collections.defaultdict(float)      # (name, labels) -> value
+_histograms = {}                                # (name, labels) -> [bucket counts..., sum, count]
+_collectors = []
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+# --- Recording ---
+
+def count(name, value=1, **labels):
+    """Adds ``value`` to a counter; no-op while disabled."""
+    if not enabled:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] += value
+
+
+def observe(name, seconds, **labels):
+    """Records one latency sample in a histogram; no-op while disabled."""
+    if not enabled:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-2] += seconds
+        histogram[-1] += 1
+
+
+def timed(name, **labels):
+    """Decorator recording each call's latency in histogram ``name``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
+
+
+def register_collector(collector):
+    """Adds ``collector()`` to every export.
+
+    It returns (name, labels dict, value) gauges, or (name, labels dict,
+    value, 'counter') for running totals kept elsewhere.
+    """
+    _collectors.append(collector)
+    return collector
+
+
+def unregister_collector(collector):
+    if collector in _collectors:
+        _collectors.remove(collector)
+
+
+# --- Export ---
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value):
+    """Whole numbers as ints, so large totals keep every digit; the rest as repr(float)."""
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(values)) for key, values in _histograms.items())
+
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f'# TYPE {name} counter')
+            typed.add(name)
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for (name, labels), values in histograms:
+        if name not in typed:
+            lines.append(f'# TYPE {name} histogram')
+            typed.add(name)
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS + ('+Inf',), values):
+            cumulative += bucket
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {values[-2]:.9f}')
+        lines.append(f'{name}_count{_format_labels(labels)} {values[-1]}')
+
+    for collector in list(_collectors):
+        for name, labels, value, *kind in collector():
+            if name not in typed:
+                lines.append(f'# TYPE {name} {kind[0] if kind else "gauge"}')
+                typed.add(name)
+            lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path):
+    """Writes render() atomically, for node_exporter's textfile collector."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+
+def serve(port, host='127.0.0.1'):
+    """Serves render() at http://host:port/metrics from a daemon thread."""
+    import http.server
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('', '/metrics'):
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+# --- Sampling Profiler ---
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval and counts folded stacks."""
+    def __init__(self, interval=DEFAULT_SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='metrics-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        """Writes "stack count" lines, the input format of flamegraph tools."""
+        with open(path, 'w') as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f'{stack} {samples}\n')
+
+
+def configure_from_env():
+    """Starts the exporters and profiler requested by GANN_METRICS_* / GANN_PROFILE."""
+    import atexit
+
+    port = os.environ.get('GANN_METRICS_PORT')
+    path = os.environ.get('GANN_METRICS_FILE')
+    profile_path = os.environ.get('GANN_PROFILE')
+    if port:
+        try:
+            serve(int(port))
+        except (ValueError, OverflowError, OSError) as e:
+            # A bad port must not stop the program; it just runs without the HTTP exporter.
+            print(f"metrics: not serving GANN_METRICS_PORT={port!r}: {e}", file=sys.stderr)
+            port = None
+    if port or path:
+        enable()
+    if path:
+        atexit.register(write_textfile, path)
+    if profile_path:
+        profiler = SamplingProfiler().start()
+        atexit.register(lambda: (profiler.stop(), profiler.write_folded(profile_path)))
@@ -0,0 +1,190 @@
+"""Replay a historical tick file through the live feed path.
+
+ReplayFeed is a feed.PriceFeed whose ticks come from a local file (CSV,
+Parquet or .npy with the symbol, timestamp and price columns of resample.py)
+instead of a live source. Every tick goes through the level engine; ticks
+are paced by their timestamps at 1x to 1000x real time, or read as fast as
+possible. The GUI applies updates once per frame exactly as for a live
+feed, so a replay rehearses a session and measures end-to-end latency:
+
+    python up5.py --replay ticks.csv 100 EURUSD     # 100x, follow EURUSD
+    python up5.py --replay ticks.csv max            # as fast as possible
+    python replay.py ticks.csv --speed 1000         # headless: ticks/s and lag
+
+In the GUI, Ctrl+. and Ctrl+, step the speed up and down through SPEEDS.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import feed
+import resample
+import ticks
+
+MIN_SPEED = 1
+MAX_SPEED = 1000
+# Speed steps for the GUI keys; None replays as fast as possible.
+SPEEDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, None)
+# Ticks due sooner than this are read without sleeping.
+MIN_SLEEP_SECONDS = 0.001
+# Small chunks keep a max-speed replay responsive to stop().
+REPLAY_CHUNK_SIZE = 10_000
+# How often the headless run drains, like the GUI's FEED_REFRESH_MS.
+DEFAULT_FRAME_MS = 16
+
+
+def parse_speed(text):
+    """'100', '100x' or 'max' -> 100.0, 100.0 or None."""
+    text = str(text).strip().lower()
+    if text == 'max':
+        return None
+    speed = float(text.removesuffix('x'))
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"replay speed must be from {MIN_SPEED}x to {MAX_SPEED}x, or max")
+    return speed
+
+
+def speed_text(speed):
+    return "max" if speed is None else f"{speed:g}x"
+
+
+class ReplayClock:
+    """Maps tick timestamps to wall time at an adjustable speed.
+
+    The first tick after a start or a speed change is due at once; later
+    ticks are due when as much wall time as their timestamp distance from
+    it, divided by the speed, has passed.
+    """
+    def __init__(self, speed=None):
+        self.speed = speed
+        self.behind = 0.0       # seconds the last tick was read after it was due
+        self._base = None       # (wall time, timestamp) of the first tick at this speed
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.behind = 0.0
+        self._base = None
+
+    def delay(self, timestamp):
+        """Seconds until ``timestamp`` is due; zero or less when it already is."""
+        speed, base = self.speed, self._base
+        if speed is None:
+            return 0.0
+        now = time.perf_counter()
+        if base is None:
+            self._base = (now, timestamp)
+            return 0.0
+        delay = base[0] + (timestamp - base[1]) / speed - now
+        self.behind = max(0.0, -delay)
+        return delay
+
+
+async def replay_ticks(path, clock, chunk_size=REPLAY_CHUNK_SIZE):
+    """Yields (symbol, timestamp, price) from a tick file, paced by ``clock``."""
+    for symbols, timestamps, prices, _, _, _ in resample.iter_chunks(path, chunk_size):
+        for symbol, timestamp, price in zip(symbols.tolist(), timestamps.tolist(), prices.tolist()):
+            delay = clock.delay(timestamp)
+            if delay >= MIN_SLEEP_SECONDS:
+                await asyncio.sleep(delay)
+            yield symbol, timestamp, price
+        await asyncio.sleep(0)
+
+
+class ReplayFeed(feed.PriceFeed):
+    """A PriceFeed that plays a tick file at ``speed`` times real time (None: as fast as possible)."""
+    def __init__(self, path, speed=None, tick_sizes=None, chunk_size=REPLAY_CHUNK_SIZE):
+        super().__init__(path, from_start=True, tick_sizes=tick_sizes)
+        self.clock = ReplayClock(speed)
+        self.chunk_size = chunk_size
+        self.finished = False
+
+    @property
+    def speed(self):
+        return self.clock.speed
+
+    def set_speed(self, speed):
+        self.clock.set_speed(speed)
+
+    def step_speed(self, steps):
+        """Moves ``steps`` places along SPEEDS from the nearest step at or below the current speed."""
+        speed = self.speed
+        if speed is None:
+            index = len(SPEEDS) - 1
+        else:
+            index = max(i for i, step in enumerate(SPEEDS[:-1]) if step <= speed)
+        self.set_speed(SPEEDS[min(max(index + steps, 0), len(SPEEDS) - 1)])
+
+    def tick_source(self):
+        return replay_ticks(self.source, self.clock, self.chunk_size)
+
+    async def _main(self):
+        try:
+            await super()._main()
+        finally:
+            self.finished = True
+
+    def status_text(self, report=None):
+        """Short replay status for the window title."""
+        text = f"replay {speed_text(self.speed)}"
+        if self.finished:
+            text += " done"
+        elif self.clock.behind >= 1.0:
+            text += f" ({self.clock.behind:.0f}s behind)"
+        if report is not None:
+            text += (f", {report.events_per_second:,.0f} ticks/s, "
+                     f"UI lag {report.lag_mean * 1000:.1f} ms (max {report.lag_max * 1000:.1f})")
+        return text
+
+    def metric_samples(self):
+        labels = {'source': self.source}
+        return super().metric_samples() + [
+            ('gann_replay_speed', labels, self.speed or 0),
+            ('gann_replay_behind_seconds', labels, self.clock.behind),
+        ]
+
+
+# --- Entry Point ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a tick file through the level engine without the GUI.")
+    parser.add_argument('ticks', help="CSV, Parquet or .npy with symbol, timestamp, price columns")
+    parser.add_argument('--speed', default='max', help="1 to 1000 (times real time) or max (default: %(default)s)")
+    parser.add_argument('--frame-ms', type=float, default=DEFAULT_FRAME_MS,
+                        help="drain the updates this often, like the GUI (default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        speed = parse_speed(args.speed)
+    except ValueError as e:
+        print(f"replay: {e}", file=sys.stderr)
+        return 1
+
+    replay = ReplayFeed(args.ticks, speed, tick_sizes=ticks.tick_sizes_from_env())
+    stats = feed.FeedStats()
+    reported = None
+    started = time.perf_counter()
+    replay.start()
+    try:
+        while True:
+            finished = replay.finished
+            if replay.drain():
+                stats.observe_lag(time.perf_counter() - replay.oldest_queued_at)
+            report = stats.sample(replay.ticks)
+            if report is not reported:
+                print(replay.status_text(report), file=sys.stderr)
+                reported = report
+            if finished:
+                break
+            time.sleep(args.frame_ms / 1000)
+    except KeyboardInterrupt:
+        replay.stop()
+    if replay.error is not None:
+        print(f"replay: {replay.error}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(f"{replay.ticks} ticks in {elapsed:.2f}s ({replay.ticks / elapsed:,.0f} ticks/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+"""Streaming resampler: raw ticks or 1-minute bars in, anchor bars out.
+
+Reads a tick archive ("symbol,timestamp,price") or 1-minute bars
+("symbol,timestamp,open,high,low,close") chunk by chunk and keeps the open
+bar of every symbol and frame up to date. Each bar that completes is
+emitted once, so a multi-year, multi-symbol archive is resampled in one pass
+and memory stays at one open bar per symbol and frame:
+
+    python resample.py ticks.csv anchors.csv --frames 1h,15m,london
+    python resample.py bars.parquet anchors.csv --bars --frames london
+    python resample.py ticks.npy levels.csv --frames 1h --levels
+
+Frames are fixed timeframes such as 15m, 1h or 1d (aligned to UTC) and
+trading sessions such as london (08:00-16:30 Europe/London, DST aware).
+The anchors file has batch.py's symbol, timestamp, high and low columns, so
+it can be fed to batch.py as is; ``--levels`` runs GANN BOX, REV LVL and
+Middle L on each bar straight away. Inputs are CSV, Parquet, or a NumPy
+structured array (.npy) that is memory-mapped rather than read.
+
+Timestamps are epoch seconds or ISO 8601 in UTC. Within a symbol, ticks must
+arrive in time order; a tick for a bar that was already emitted is counted
+as late and skipped.
+"""
+import argparse
+import collections
+import csv
+import datetime
+import re
+import sys
+import zoneinfo
+
+import numpy as np
+
+import batch
+import ticks
+
+TICK_COLUMNS = ('symbol', 'timestamp', 'price')
+BAR_INPUT_COLUMNS = ('symbol', 'timestamp', 'open', 'high', 'low', 'close')
+ANCHOR_COLUMNS = ('symbol', 'timestamp', 'frame', 'end', 'open', 'high', 'low', 'close')
+LEVEL_METHODS = ('gann_box', 'rev_lvl', 'middle_l')
+DEFAULT_FRAMES = '1h,15m,london'
+SECONDS_PER_DAY = 86400
+UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': SECONDS_PER_DAY}
+# Buckets are below 2 ** 40 for any timestamp before the year 30000.
+SYMBOL_SHIFT = 40
+
+AnchorBar = collections.namedtuple('AnchorBar', 'symbol frame start end open high low close')
+
+
+# --- Frames ---
+
+class TimeFrame:
+    """Fixed-length bars aligned to the epoch."""
+    def __init__(self, name, seconds):
+        self.name = name
+        self.seconds = seconds
+
+    def buckets(self, timestamps):
+        """(bucket, start, end) of every timestamp; all of them fall in a bar."""
+        buckets = np.floor(timestamps / self.seconds).astype(np.int64)
+        starts = buckets * self.seconds
+        return buckets, starts, starts + self.seconds
+
+
+class SessionFrame:
+    """One bar per local trading day, from ``open`` to ``close`` in ``zone``."""
+    def __init__(self, name, zone, open_time, close_time):
+        if close_time <= open_time:
+            raise ValueError(f"session {name}: close must be after open")
+        self.name = name
+        self.zone = zoneinfo.ZoneInfo(zone)
+        self.open_time = open_time
+        self.close_time = close_time
+        self._bounds = {}
+
+    def day_bounds(self, day):
+        """UTC (open, close) in epoch seconds of the session on local date ``day`` (days since 1970)."""
+        bounds = self._bounds.get(day)
+        if bounds is None:
+            if len(self._bounds) > 1024:
+                self._bounds.clear()
+            date = datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day))
+            bounds = self._bounds[day] = tuple(
+                int(datetime.datetime.combine(date, moment, tzinfo=self.zone).timestamp())
+                for moment in (self.open_time, self.close_time)
+            )
+        return bounds
+
+    def buckets(self, timestamps):
+        """(bucket, start, end) of every timestamp; bucket is -1 outside the session."""
+        utc_days = np.floor(timestamps / SECONDS_PER_DAY).astype(np.int64)
+        buckets = np.full(len(timestamps), -1, dtype=np.int64)
+        starts = np.zeros(len(timestamps), dtype=np.int64)
+        ends = np.zeros(len(timestamps), dtype=np.int64)
+        # A zone is less than a day from UTC, so the local date is the UTC one or a neighbour.
+        days = np.unique(utc_days)
+        at = np.searchsorted(days, utc_days)
+        for shift in (-1, 0, 1):
+            candidates = days + shift
+            opens, closes = np.array([self.day_bounds(day) for day in candidates], dtype=np.int64).reshape(-1, 2).T
+            inside = (timestamps >= opens[at]) & (timestamps < closes[at])
+            buckets[inside] = candidates[at[inside]]
+            starts[inside] = opens[at[inside]]
+            ends[inside] = closes[at[inside]]
+        return buckets, starts, ends
+
+
+SESSIONS = {
+    'london': ('Europe/London', datetime.time(8, 0), datetime.time(16, 30)),
+}
+
+
+def parse_frame(name):
+    """A TimeFrame ('15m', '1h', '1d') or a SessionFrame from SESSIONS ('london')."""
+    name = name.strip().lower()
+    if name in SESSIONS:
+        return SessionFrame(name, *SESSIONS[name])
+    match = re.fullmatch(r'(\d+)([mhd])', name)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"unknown frame {name!r}: use e.g. 15m, 1h, 1d or one of {', '.join(SESSIONS)}")
+    return TimeFrame(name, int(match.group(1)) * UNIT_SECONDS[match.group(2)])
+
+
+def parse_frames(text):
+    return [parse_frame(name) for name in text.split(',') if name.strip()]
+
+
+# --- Readers ---
+
+def to_epoch_seconds(values):
+    """Epoch seconds from numbers or ISO 8601 text (UTC); unparsable cells become NaN."""
+    seconds = batch.to_float_array(values)
+    text = np.isnan(seconds)
+    if text.any():
+        rows = np.flatnonzero(text)
+        try:
+            parsed = np.array([str(values[i]).strip() for i in rows], dtype='datetime64[ms]')
+            seconds[rows] = parsed.astype(np.int64) / 1000
+        except ValueError:
+            for i in rows:
+                try:
+                    seconds[i] = np.datetime64(str(values[i]).strip(), 'ms').astype(np.int64) / 1000
+                except ValueError:
+                    pass
+    return seconds
+
+
+def iter_npy_chunks(path, chunk_size=batch.DEFAULT_CHUNK_SIZE, columns=TICK_COLUMNS):
+    """Yields chunks of a structured .npy array through a read-only memory map."""
+    data = np.load(path, mmap_mode='r')
+    missing = [name for name in columns if name not in (data.dtype.names or ())]
+    if missing:
+        raise ValueError(f"{path}: missing field(s) {', '.join(missing)}")
+    for start in range(0, len(data), chunk_size):
+        part = data[start:start + chunk_size]
+        chunk = {}
+        for name in columns:
+            column = part[name]
+            if name == 'symbol':
+                chunk[name] = column.astype(str)
+            elif name == 'timestamp' and column.dtype.kind == 'M':
+                chunk[name] = column.astype('datetime64[ms]').astype(np.int64) / 1000
+            else:
+                chunk[name] = np.asarray(column, dtype=np.float64)
+        yield chunk
+
+
+def iter_chunks(path, chunk_size=batch.DEFAULT_CHUNK_SIZE, bars=False):
+    """Yields (symbols, timestamps, opens, highs, lows, closes) per chunk."""
+    columns = BAR_INPUT_COLUMNS if bars else TICK_COLUMNS
+    if path.lower().endswith('.npy'):
+        chunks = iter_npy_chunks(path, chunk_size, columns)
+    else:
+        chunks = batch.iter_chunks(path, chunk_size, columns)
+    for chunk in chunks:
+        timestamps = chunk['timestamp']
+        if timestamps.dtype.kind not in 'fiu':
+            timestamps = to_epoch_seconds(timestamps)
+        if bars:
+            yield chunk['symbol'], timestamps, chunk['open'], chunk['high'], chunk['low'], chunk['close']
+        else:
+            price = chunk['price']
+            yield chunk['symbol'], timestamps, price, price, price, price
+
+
+# --- Resampling ---
+
+class Resampler:
+    """Open bars per (symbol, frame); ``process`` returns the bars each chunk completes."""
+    def __init__(self, frames):
+        self.frames = frames
+        self.open_bars = {}     # (symbol, frame name) -> (bucket, start, end, open, high, low, close)
+        self.rows = 0
+        self.late = 0
+
+    def process(self, symbols, timestamps, opens, highs, lows, closes):
+        """Folds one chunk in; returns the completed bars as AnchorBar columns."""
+        self.rows += len(symbols)
+        usable = np.isfinite(timestamps) & np.isfinite(opens + highs + lows + closes)
+        names, codes = np.unique(symbols, return_inverse=True)
+        names = names.tolist()
+        # Group by symbol; the stable sort keeps each symbol's rows in arrival order.
+        order = np.argsort(codes, kind='stable') if len(names) > 1 else np.arange(len(codes))
+        order = order[usable[order]]
+        timestamps = np.where(usable, timestamps, 0)
+        late = np.zeros(len(symbols), dtype=bool)
+        completed = []
+        for frame in self.frames:
+            completed.extend(self._process_frame(frame, names, codes, order, late, timestamps, opens, highs, lows,
+                                                 closes))
+        self.late += int(np.count_nonzero(late))
+        return bar_columns(completed)
+
+    def _process_frame(self, frame, names, codes, order, late, timestamps, opens, highs, lows, closes):
+        buckets, starts, ends = frame.buckets(timestamps)
+        rows = order[buckets[order] >= 0]
+        if not len(rows):
+            return []
+        row_codes, row_buckets = codes[rows], buckets[rows]
+        open_buckets = np.array([self.open_bars.get((name, frame.name), (-1,))[0] for name in names])
+        keys = (row_codes.astype(np.int64) << SYMBOL_SHIFT) | row_buckets
+        in_order = (keys == np.maximum.accumulate(keys)) & (row_buckets >= open_buckets[row_codes])
+        late[rows[~in_order]] = True
+        rows, row_codes, row_buckets = rows[in_order], row_codes[in_order], row_buckets[in_order]
+        if not len(rows):
+            return []
+
+        # One run per (symbol, bucket): the bar's part that is in this chunk.
+        new_run = np.ones(len(rows), dtype=bool)
+        new_run[1:] = (row_codes[1:] != row_codes[:-1]) | (row_buckets[1:] != row_buckets[:-1])
+        firsts = np.flatnonzero(new_run)
+        lasts = np.append(firsts[1:], len(rows)) - 1
+        runs = {
+            'code': row_codes[firsts],
+            'bucket': row_buckets[firsts],
+            'start': starts[rows[firsts]],
+            'end': ends[rows[firsts]],
+            'open': opens[rows[firsts]],
+            'high': np.maximum.reduceat(highs[rows], firsts),
+            'low': np.minimum.reduceat(lows[rows], firsts),
+            'close': closes[rows[lasts]],
+        }
+        symbol_change = np.ones(len(firsts) + 1, dtype=bool)
+        symbol_change[1:-1] = runs['code'][1:] != runs['code'][:-1]
+        first_runs = np.flatnonzero(symbol_change[:-1])
+        last_runs = np.flatnonzero(symbol_change[1:])
+
+        completed = []
+        for run in first_runs:
+            symbol = names[runs['code'][run]]
+            bar = self.open_bars.pop((symbol, frame.name), None)
+            if bar is None:
+                continue
+            if bar[0] == runs['bucket'][run]:
+                runs['open'][run] = bar[3]
+                runs['high'][run] = max(bar[4], runs['high'][run])
+                runs['low'][run] = min(bar[5], runs['low'][run])
+            else:
+                completed.append(AnchorBar(symbol, frame.name, *bar[1:]))
+        done = np.ones(len(firsts), dtype=bool)
+        done[last_runs] = False
+        completed.extend(
+            AnchorBar(names[code], frame.name, start, end, o, h, l, c)
+            for code, start, end, o, h, l, c in zip(*(runs[name][done].tolist() for name in
+                                                     ('code', 'start', 'end', 'open', 'high', 'low', 'close')))
+        )
+        for run in last_runs:
+            self.open_bars[(names[runs['code'][run]], frame.name)] = tuple(
+                runs[name][run].item() for name in ('bucket', 'start', 'end', 'open', 'high', 'low', 'close')
+            )
+        return completed
+
+    def current(self, symbol, frame_name):
+        """The open bar of ``symbol`` in ``frame_name`` as an AnchorBar, or None."""
+        bar = self.open_bars.get((symbol, frame_name))
+        return AnchorBar(symbol, frame_name, *bar[1:]) if bar is not None else None
+
+    def flush(self):
+        """Closes every open bar (end of input); returns them as AnchorBar columns."""
+        bars = [AnchorBar(symbol, frame_name, *bar[1:]) for (symbol, frame_name), bar in self.open_bars.items()]
+        self.open_bars.clear()
+        return bar_columns(bars)
+
+
+def bar_columns(bars):
+    """AnchorBars as columns named after ANCHOR_COLUMNS (``timestamp`` is the bar start)."""
+    return {
+        'symbol': np.array([bar.symbol for bar in bars], dtype=object),
+        'timestamp': np.array([bar.start for bar in bars], dtype=np.int64),
+        'frame': np.array([bar.frame for bar in bars], dtype=object),
+        'end': np.array([bar.end for bar in bars], dtype=np.int64),
+        'open': np.array([bar.open for bar in bars], dtype=np.float64),
+        'high': np.array([bar.high for bar in bars], dtype=np.float64),
+        'low': np.array([bar.low for bar in bars], dtype=np.float64),
+        'close': np.array([bar.close for bar in bars], dtype=np.float64),
+    }
+
+
+def anchor_bars(columns):
+    """Iterates bar columns as AnchorBar events."""
+    for symbol, start, frame, end, o, h, l, c in zip(*(columns[name].tolist() for name in ANCHOR_COLUMNS)):
+        yield AnchorBar(symbol, frame, start, end, o, h, l, c)
+
+
+# --- Writers ---
+
+class AnchorWriter:
+    """Writes anchor bars to a CSV file that batch.py can read."""
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(ANCHOR_COLUMNS)
+
+    def write(self, columns):
+        self.writer.writerows(zip(*(columns[name].tolist() for name in ANCHOR_COLUMNS)))
+
+    def close(self):
+        self.file.close()
+
+
+class AnchorLevelWriter:
+    """Runs GANN BOX, REV LVL and Middle L on anchor bars and writes batch.py level rows."""
+    def __init__(self, path, tick_sizes=None, default_tick=None):
+        self.writer = batch.open_writer(path)
+        self.tick_sizes = tick_sizes
+        self.default_tick = default_tick
+
+    def write(self, columns):
+        chunk = {name: columns[name] for name in batch.ANCHOR_COLUMNS}
+        chunk['timestamp'] = chunk['timestamp'].astype(str).astype(object)
+        for method, anchor, sentiment, levels, valid in batch.compute_chunk(
+                chunk, LEVEL_METHODS, tick_sizes=self.tick_sizes, default_tick=self.default_tick):
+            if valid.any():
+                self.writer.write(batch.level_columns(chunk, method, anchor, sentiment, levels, valid))
+
+    def close(self):
+        self.writer.close()
+
+
+# --- Entry Point ---
+
+def run(input_path, writer, frames, bars=False, chunk_size=batch.DEFAULT_CHUNK_SIZE, include_open=False):
+    """Resamples ``input_path`` into ``writer`` in one pass; returns the Resampler."""
+    resampler = Resampler(frames)
+    for chunk in iter_chunks(input_path, chunk_size, bars):
+        columns = resampler.process(*chunk)
+        if len(columns['symbol']):
+            writer.write(columns)
+    if include_open:
+        columns = resampler.flush()
+        if len(columns['symbol']):
+            writer.write(columns)
+    return resampler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resample ticks or 1-minute bars into anchor bars.")
+    parser.add_argument('input', help="CSV, Parquet or .npy file of ticks (symbol, timestamp, price)")
+    parser.add_argument('output', help="CSV file for the anchor bars (CSV or Parquet with --levels)")
+    parser.add_argument('--frames', default=DEFAULT_FRAMES,
+                        help="comma-separated timeframes and sessions (default: %(default)s)")
+    parser.add_argument('--bars', action='store_true',
+                        help="the input is bars with open, high, low and close columns instead of ticks")
+    parser.add_argument('--chunk-size', type=int, default=batch.DEFAULT_CHUNK_SIZE,
+                        help="rows per chunk (default: %(default)s)")
+    parser.add_argument('--include-open', action='store_true',
+                        help="also write the bars still open when the input ends")
+    parser.add_argument('--levels', action='store_true',
+                        help="write GANN BOX, REV LVL and Middle L levels of one frame instead of bars")
+    parser.add_argument('--tick-size', type=ticks.parse_tick_size,
+                        help="with --levels, compute in fixed-point ticks of this size")
+    parser.add_argument('--tick-sizes', metavar='PATH',
+                        help="with --levels, CSV of symbol,tick_size for per-instrument ticks")
+    args = parser.parse_args(argv)
+    try:
+        frames = parse_frames(args.frames)
+    except ValueError as e:
+        parser.error(str(e))
+    if not frames:
+        parser.error("--frames needs at least one frame")
+    if args.levels and len(frames) != 1:
+        parser.error("--levels takes exactly one frame")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    try:
+        if args.levels:
+            tick_sizes = ticks.load_tick_sizes(args.tick_sizes) if args.tick_sizes else None
+            writer = AnchorLevelWriter(args.output, tick_sizes, args.tick_size)
+        else:
+            writer = AnchorWriter(args.output)
+        try:
+            resampler = run(args.input, writer, frames, args.bars, args.chunk_size, args.include_open)
+        finally:
+            writer.close()
+    except (OSError, ValueError) as e:
+        print(f"resample: {e}", file=sys.stderr)
+        return 1
+    print(f"{resampler.rows} rows resampled", file=sys.stderr)
+    if resampler.late:
+        print(f"  {resampler.late} late rows skipped", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
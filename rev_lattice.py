@@ -0,0 +1,147 @@
+"""REV LVL square-root lattices.
+
+REV LVL moves the square root of the anchor by one step: ``(sqrt(p) +/- 2)
+** 2``. Repeating the move gives a lattice of rings around every anchor,
+
+    ring k = (sqrt(anchor) + k * step) ** 2
+
+with k > 0 above the anchor (bullish), k < 0 below it (bearish) and ring 0
+the anchor itself; rings +1 and -1 are the REV LVL levels. In square-root
+space the rings are evenly spaced, so any ring, the ring a price sits on and
+the rings inside a price range are closed-form and vectorized over anchors:
+
+    lattice = RevLattice([1024.0, 2500.0])
+    lattice.rings([1, 2, 3])              # rings 1..3 of both anchors
+    lattice.levels('bearish', depth=5)    # rings -1..-5, engine-style
+    lattice.locate(1300.0)                # (ring, fraction) of 1300 for each anchor
+    lattice.between(900.0, 1600.0)        # (first, last) ring inside the range
+
+Prices broadcast against the anchors, so a column of prices (shape
+``(m, 1)``) is located against every anchor at once. As in the engine, a
+ring whose root falls below zero squares the negative root, so rings below
+``lowest`` fold back up and the inverse lookups only use the rings from
+``lowest`` up. With a tick size the anchors and levels are tick counts,
+rounded to the nearest tick like ticks.rev_lvl_ticks, and invalid anchors
+get NO_RING.
+"""
+import collections
+
+import numpy as np
+
+import engine
+import ticks
+
+DEFAULT_DEPTH = 5
+NO_RING = -1
+
+RingPosition = collections.namedtuple('RingPosition', 'ring fraction')
+
+
+class RevLattice:
+    """Square-root rings of many anchors."""
+    def __init__(self, anchors, step=engine.REV_LVL_STEP, tick_size=None):
+        if not step > 0:
+            raise ValueError("the ring step must be positive")
+        self.step = step
+        self.tick_size = tick_size
+        if tick_size is None:
+            self.anchors, self.valid = engine.as_float_prices(anchors)
+            self.size = 1.0
+        else:
+            self.anchors = np.atleast_1d(np.asarray(anchors, dtype=np.int64))
+            self.valid = (self.anchors >= 0) & (self.anchors <= engine.MAX_PRICE)
+            self.size = tick_size.units / 10 ** tick_size.decimals
+        self.roots = np.sqrt(np.where(self.valid, self.anchors, 0) * self.size)
+        self.roots[~self.valid] = np.nan
+        self.missing = np.nan if tick_size is None else NO_RING
+        # The lowest ring of each anchor whose root is still at or above zero.
+        self.lowest = -np.floor(np.where(self.valid, self.roots, 0.0) / step).astype(np.int64)
+
+    def __len__(self):
+        return len(self.anchors)
+
+    # --- Rings ---
+
+    def rings(self, ks):
+        """Ring ``ks[j]`` of every anchor as an (anchors, len(ks)) matrix."""
+        ks = np.atleast_1d(np.asarray(ks, dtype=np.int64))
+        return self._ring_levels(ks, np.broadcast_to(self.valid[:, None], (len(self), len(ks))), axis=1)
+
+    def levels(self, sentiment, depth=DEFAULT_DEPTH, first=1):
+        """Rings ``first .. first + depth - 1`` away from the anchor, as ``(levels, valid)``."""
+        if depth < 1 or first < 1:
+            raise ValueError("depth and first ring must be at least 1")
+        ks = engine.sentiment_sign(sentiment) * np.arange(first, first + depth, dtype=np.int64)
+        return self.rings(ks), self.valid
+
+    # --- Inverse lookup ---
+
+    def _price_roots(self, prices):
+        prices = np.asarray(prices, dtype=np.float64) * self.size
+        with np.errstate(invalid='ignore'):
+            return np.sqrt(np.where(prices >= 0, prices, np.nan))
+
+    def position(self, prices):
+        """Fractional ring number of ``prices`` (1.5 is halfway between rings 1 and 2 in root space)."""
+        return (self._price_roots(prices) - self.roots) / self.step
+
+    def locate(self, prices):
+        """RingPosition of ``prices``: the ring at or below each one and the fraction past it."""
+        position = self.position(prices)
+        with np.errstate(invalid='ignore'):
+            ring = np.floor(position)
+            fraction = position - ring
+        return RingPosition(np.where(np.isfinite(ring), ring, 0).astype(np.int64), fraction)
+
+    def nearest(self, prices):
+        """(ring, level) of the ring closest to each price; ties go to the lower ring."""
+        below = np.maximum(self.locate(prices).ring, self.lowest)
+        below_levels, above_levels = self._ring_levels(below), self._ring_levels(below + 1)
+        prices = np.asarray(prices)
+        ring = np.where(np.abs(above_levels - prices) < np.abs(prices - below_levels), below + 1, below)
+        levels = np.where(ring == below, below_levels, above_levels)
+        levels[~np.broadcast_to(self.valid, levels.shape)] = self.missing
+        return ring, levels
+
+    def between(self, low, high):
+        """(first, last) ring inside [low, high] for each anchor; first > last when there is none."""
+        with np.errstate(invalid='ignore'):
+            first = np.maximum(np.ceil(self.position(np.maximum(low, 0))), self.lowest)
+            last = np.floor(self.position(high))
+        first = np.where(np.isfinite(first), first, 1).astype(np.int64)
+        last = np.maximum(np.where(np.isfinite(last), last, 0), self.lowest - 1).astype(np.int64)
+        # Float roots can land a hair off a ring that sits exactly on a bound.
+        first -= (first > self.lowest) & (self._ring_levels(first - 1) >= low)
+        first += self._ring_levels(first) < low
+        last += self._ring_levels(last + 1) <= high
+        last -= (last >= self.lowest) & (self._ring_levels(last) > high)
+        return np.where(self.valid, first, 1), np.where(self.valid, last, 0)
+
+    def _ring_levels(self, ks, exists=None, axis=None):
+        """Level of ring ``ks`` of each anchor; anchors run along ``axis`` (the last one by default)."""
+        roots = self.roots if axis is None else self.roots[:, None]
+        if self.tick_size is None:
+            roots = roots + ks * self.step
+            levels = roots * roots
+        else:
+            anchors = np.where(self.valid, self.anchors, 0)
+            levels = ticks.square_root_ticks(anchors if axis is None else anchors[:, None], ks * self.step,
+                                             self.tick_size)
+        if exists is not None:
+            levels[~exists] = self.missing
+        return levels
+
+
+def lattice_levels(prices, sentiment, depth=DEFAULT_DEPTH, tick_size=None, step=engine.REV_LVL_STEP):
+    """Numeric prices in, ``depth`` REV LVL rings out as float prices (NaN for invalid anchors)."""
+    if tick_size is None:
+        return RevLattice(prices, step).levels(sentiment, depth)
+    anchors, valid = ticks.to_ticks(prices, tick_size)
+    lattice = RevLattice(anchors, step, tick_size)
+    levels, lattice_valid = lattice.levels(sentiment, depth)
+    valid &= lattice_valid
+    missing = levels == NO_RING
+    levels = ticks.from_ticks(levels, tick_size)
+    levels[missing] = np.nan
+    levels[~valid] = np.nan
+    return levels, valid
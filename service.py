@@ -0,0 +1,404 @@
+"""Local calculation service.
+
+Serves the level methods over HTTP/1.1 on 127.0.0.1 or a Unix socket, so
+bots and GUI instances can share one warm engine without importing Tk:
+
+    python service.py --port 8765
+    python service.py --unix /tmp/gann.sock --level-table levels.tbl
+
+    POST /levels  {"method": "gann_box", "sentiment": "bullish", "price": 2000}
+                  {"method": "rev_lvl", "sentiment": "bearish", "prices": [1.1234, 1.1301],
+                   "tick_size": "0.0001"}
+                  {"method": "middle_l", "high": 2010.5, "low": 1990.25}
+    GET /health   GET /metrics
+
+"price" (or "high"/"low") answers with one row of levels, "prices" (or
+"highs"/"lows") with a list of rows; rejected anchors come back as null.
+"tick_size", or "symbol" with ``--tick-sizes``, selects fixed-point ticks.
+
+Connections are persistent. Requests that arrive together are grouped by
+(method, sentiment, tick size) and computed as one vectorized batch on a
+bounded worker pool (small batches run inline on the event loop, which is
+cheaper than a thread hand-off). When ``--max-pending`` anchors are already waiting,
+new requests get 503 with Retry-After instead of queueing without limit.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import batch
+import engine
+import level_tables
+import metrics
+import ticks
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_PENDING = 20_000
+# Batches up to this many anchors are computed on the event loop: at tens of
+# microseconds they cost less than the hand-off to a worker thread and back.
+DEFAULT_INLINE_BATCH = 256
+MAX_BODY_BYTES = 1 << 20
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class RequestError(ValueError):
+    """A request the service answers with 400 Bad Request."""
+
+
+class Overloaded(Exception):
+    """The pending queue is full; the client should retry later."""
+
+
+# --- Requests ---
+
+def parse_levels_request(payload, tick_sizes=None):
+    """Returns ((method, sentiment, tick size), anchors, single) for a /levels body."""
+    if not isinstance(payload, dict):
+        raise RequestError("body must be a JSON object")
+    method = payload.get('method')
+    if method not in engine.METHODS:
+        raise RequestError(f"method must be one of: {', '.join(engine.METHODS)}")
+
+    sentiment = None
+    if method != 'middle_l':
+        sentiment = payload.get('sentiment')
+        if sentiment not in engine.SENTIMENTS:
+            raise RequestError("sentiment must be 'bullish' or 'bearish'")
+
+    tick_size = None
+    if payload.get('tick_size') is not None:
+        tick_size = ticks.parse_tick_size(payload['tick_size'])
+    elif tick_sizes and payload.get('symbol') in tick_sizes:
+        tick_size = tick_sizes[payload['symbol']]
+
+    if method == 'middle_l':
+        single = 'high' in payload
+        highs = [payload.get('high')] if single else payload.get('highs')
+        lows = [payload.get('low')] if single else payload.get('lows')
+        if not isinstance(highs, list) or not isinstance(lows, list) or len(highs) != len(lows):
+            raise RequestError("middle_l needs high and low, or equal-length highs and lows")
+        anchors = list(zip(highs, lows))
+    else:
+        single = 'price' in payload
+        anchors = [payload.get('price')] if single else payload.get('prices')
+        if not isinstance(anchors, list):
+            raise RequestError("send a price or a list of prices")
+    values = [value for anchor in anchors for value in (anchor if method == 'middle_l' else (anchor,))]
+    if any(not isinstance(value, (int, float)) or isinstance(value, bool) for value in values):
+        raise RequestError("prices must be numbers")
+    # Python's json accepts NaN, Infinity and integers of any size; none of them fit the engine.
+    if any(isinstance(value, float) and not math.isfinite(value) or abs(value) > engine.MAX_PRICE
+           for value in values):
+        raise RequestError(f"prices must be finite and at most {engine.MAX_PRICE} in size")
+    return (method, sentiment, tick_size), anchors, single
+
+
+def compute_batch(key, requests):
+    """Runs many requests for one key as a single engine call; returns a response body each.
+
+    If the merged call fails, each request is computed on its own, so a
+    request that still fails gets its exception in place of a body and the
+    others are answered normally.
+    """
+    try:
+        return _batch_bodies(key, requests)
+    except Exception as e:
+        if len(requests) == 1:
+            return [e]
+        return [compute_batch(key, [request])[0] for request in requests]
+
+
+def _batch_bodies(key, requests):
+    method, sentiment, tick_size = key
+    anchors = [anchor for request_anchors, _ in requests for anchor in request_anchors]
+    if method == 'middle_l':
+        prices = (np.array([a[0] for a in anchors], dtype=np.float64),
+                  np.array([a[1] for a in anchors], dtype=np.float64))
+    else:
+        prices = np.array(anchors)
+    levels, valid = batch.method_levels(method, prices, sentiment, tick_size)
+    rows = [row if ok else None for row, ok in zip(levels.tolist(), valid.tolist())]
+
+    bodies = []
+    start = 0
+    for request_anchors, single in requests:
+        stop = start + len(request_anchors)
+        result = rows[start] if single else rows[start:stop]
+        bodies.append(json.dumps({'levels': result}).encode())
+        start = stop
+    return bodies
+
+
+class Batcher:
+    """Coalesces concurrent requests per key and runs them on a bounded pool.
+
+    Items queued while every worker is busy are merged into the next batch,
+    so batches grow with load instead of the queue of engine calls.
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, max_batch=DEFAULT_MAX_BATCH, max_pending=DEFAULT_MAX_PENDING,
+                 inline_batch=DEFAULT_INLINE_BATCH):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.inline_batch = inline_batch
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='levels')
+        self.queues = {}        # key -> deque of (anchors, single, future), oldest key first
+        self.pending = 0        # anchors queued or computing
+        self.running = 0
+        self._scheduled = False
+
+    def submit(self, key, anchors, single):
+        """Queues one request; the returned future resolves to its response body."""
+        if self.pending + len(anchors) > self.max_pending:
+            raise Overloaded()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queues.setdefault(key, collections.deque()).append((anchors, single, future))
+        self.pending += len(anchors)
+        if not self._scheduled:
+            # call_soon runs after the reads that are already ready, which
+            # is what lets simultaneous requests land in the same batch.
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self):
+        self._scheduled = False
+        loop = asyncio.get_running_loop()
+        while self.running < self.workers and self.queues:
+            key = next(iter(self.queues))
+            queue = self.queues.pop(key)
+            taken, size = [], 0
+            while queue and (not taken or size + len(queue[0][0]) <= self.max_batch):
+                item = queue.popleft()
+                taken.append(item)
+                size += len(item[0])
+            if queue:
+                self.queues[key] = queue
+            metrics.count('gann_service_batches_total', method=key[0])
+            metrics.count('gann_service_batched_anchors_total', size, method=key[0])
+            requests = [(anchors, single) for anchors, single, _ in taken]
+            if size <= self.inline_batch:
+                try:
+                    bodies = compute_batch(key, requests)
+                except Exception as e:
+                    self._resolve(taken, size, error=e)
+                else:
+                    self._resolve(taken, size, bodies)
+                continue
+            self.running += 1
+            work = loop.run_in_executor(self.executor, compute_batch, key, requests)
+            work.add_done_callback(functools.partial(self._finished, taken, size))
+
+    def _finished(self, taken, size, work):
+        self.running -= 1
+        try:
+            bodies = work.result()
+        except Exception as e:
+            self._resolve(taken, size, error=e)
+        else:
+            self._resolve(taken, size, bodies)
+        if self.queues and not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self._dispatch)
+
+    def _resolve(self, taken, size, bodies=None, error=None):
+        self.pending -= size
+        for i, (_, _, future) in enumerate(taken):
+            if future.done():
+                continue
+            result = error if error is not None else bodies[i]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def metric_samples(self):
+        return [
+            ('gann_service_pending_anchors', {}, self.pending),
+            ('gann_service_running_batches', {}, self.running),
+        ]
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+# --- HTTP ---
+
+async def read_request(reader):
+    """Reads one HTTP/1.1 request: (verb, path, headers, body), or None at end of stream."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise RequestError("incomplete request")
+    except asyncio.LimitOverrunError:
+        raise RequestError("headers too large")
+    request_line, *header_lines = head.decode('latin1').split('\r\n')
+    try:
+        verb, path, _ = request_line.split(' ', 2)
+    except ValueError:
+        raise RequestError("malformed request line")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise RequestError("bad Content-Length")
+    if not 0 <= length <= MAX_BODY_BYTES:
+        raise RequestError("body too large")
+    body = await reader.readexactly(length) if length else b''
+    return verb, path, headers, body
+
+
+def format_response(status, body, content_type='application/json', keep_alive=True, extra_headers=()):
+    head = [
+        f'HTTP/1.1 {status} {REASONS[status]}',
+        f'Content-Type: {content_type}',
+        f'Content-Length: {len(body)}',
+        'Connection: ' + ('keep-alive' if keep_alive else 'close'),
+    ]
+    head.extend(f'{name}: {value}' for name, value in extra_headers)
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin1') + body
+
+
+def error_body(message):
+    return json.dumps({'error': message}).encode()
+
+
+class LevelService:
+    """HTTP front end of a Batcher; one coroutine per persistent connection."""
+    def __init__(self, batcher, tick_sizes=None):
+        self.batcher = batcher
+        self.tick_sizes = tick_sizes or {}
+        self.servers = []
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        self.servers.append(server)
+        return server
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as e:
+                    writer.write(format_response(400, error_body(str(e)), keep_alive=False))
+                    break
+                if request is None:
+                    break
+                verb, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(await self.respond(verb, path, body, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, verb, path, body, keep_alive):
+        start = time.perf_counter()
+        path = path.split('?', 1)[0]
+        if path == '/levels':
+            if verb != 'POST':
+                return format_response(405, error_body("use POST"), keep_alive=keep_alive)
+            try:
+                key, anchors, single = parse_levels_request(json.loads(body or b'null'), self.tick_sizes)
+                result = await self.batcher.submit(key, anchors, single)
+            except (RequestError, ValueError) as e:
+                metrics.count('gann_service_requests_total', status='400')
+                return format_response(400, error_body(str(e)), keep_alive=keep_alive)
+            except Overloaded:
+                metrics.count('gann_service_requests_total', status='503')
+                return format_response(503, error_body("overloaded"), keep_alive=keep_alive,
+                                       extra_headers=[('Retry-After', '1')])
+            except Exception as e:
+                metrics.count('gann_service_requests_total', status='500')
+                return format_response(500, error_body(f"could not compute levels: {e}"), keep_alive=keep_alive)
+            metrics.count('gann_service_requests_total', status='200')
+            metrics.observe('gann_service_request_seconds', time.perf_counter() - start, method=key[0])
+            return format_response(200, result, keep_alive=keep_alive)
+        if path == '/health':
+            body = json.dumps({'status': 'ok', 'pending': self.batcher.pending}).encode()
+            return format_response(200, body, keep_alive=keep_alive)
+        if path == '/metrics':
+            return format_response(200, metrics.render().encode(), 'text/plain; version=0.0.4', keep_alive)
+        return format_response(404, error_body("not found"), keep_alive=keep_alive)
+
+
+# --- Entry Point ---
+
+async def serve(args):
+    batcher = Batcher(args.workers, args.max_batch, args.max_pending, args.inline_batch)
+    metrics.register_collector(batcher.metric_samples)
+    tick_sizes = ticks.load_tick_sizes(args.tick_sizes) if args.tick_sizes else None
+    service = LevelService(batcher, tick_sizes)
+    server = await service.start(args.host, args.port, args.unix)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"serving levels on {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batcher.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the level methods to local clients.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="threads computing batches (default: %(default)s)")
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help="most anchors per engine call (default: %(default)s)")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help="queued anchors before answering 503 (default: %(default)s)")
+    parser.add_argument('--inline-batch', type=int, default=DEFAULT_INLINE_BATCH,
+                        help="largest batch computed on the event loop (default: %(default)s)")
+    parser.add_argument('--level-table', metavar='PATH',
+                        help="serve GANN BOX / 369 LVL levels from a table built by level_tables.py")
+    parser.add_argument('--tick-sizes', metavar='PATH', help="CSV of symbol,tick_size for per-instrument ticks")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.max_batch < 1 or args.max_pending < 1:
+        parser.error("--workers, --max-batch and --max-pending must be positive")
+
+    metrics.configure_from_env()
+    try:
+        level_tables.install(args.level_table)
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"service: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import alerts
+
+
+def _anchors(tmp_path, name, rows):
+    path = tmp_path / name
+    path.write_text("symbol,timestamp,high,low\n" + "".join(f"XAUUSD,{row}\n" for row in rows))
+    return str(path)
+
+
+def test_load_anchors_skips_rows_that_are_not_finite(tmp_path):
+    good = _anchors(tmp_path, 'good.csv', ["1,2050,1990"])
+    mixed = _anchors(tmp_path, 'mixed.csv', ["1,2050,1990", "2,nan,1990", "3,,1990", "4,inf,1990", "5,2050,-inf"])
+    expected = alerts.load_anchors(alerts.AlertEngine(), good)
+    assert expected > 0
+    assert alerts.load_anchors(alerts.AlertEngine(), mixed) == expected
+
+
+def test_non_finite_ticks_fire_no_events(tmp_path):
+    alert_engine = alerts.AlertEngine()
+    alerts.load_anchors(alert_engine, _anchors(tmp_path, 'anchors.csv', ["1,2050,1990"]))
+    events = []
+    alert_engine.subscribe(events.append)
+    ticks = tmp_path / 'ticks.csv'
+    ticks.write_text("symbol,timestamp,price\n"
+                     "XAUUSD,1,2001\nXAUUSD,2,2002\nXAUUSD,3,nan\nXAUUSD,4,\nXAUUSD,5,inf\nXAUUSD,6,2003\n")
+    alert_engine.replay(str(ticks))
+    assert events == []
+    assert alert_engine.ticks == 3
+    assert alert_engine.on_tick('XAUUSD', float('-inf')) == 0
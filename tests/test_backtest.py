@@ -0,0 +1,49 @@
+import datetime
+
+import numpy as np
+
+import backtest
+
+
+def _epoch(*args):
+    return int(datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _write_bars(path, days, symbols=('EURUSD', 'XAUUSD'), step=300):
+    rng = np.random.default_rng(7)
+    with open(path, 'w') as f:
+        f.write("symbol,timestamp,open,high,low,close\n")
+        for symbol in symbols:
+            price = 1500.0
+            for day in days:
+                for t in range(day, day + backtest.SECONDS_PER_DAY, step):
+                    close = price + rng.normal(0, 2.0)
+                    high, low = max(price, close) + rng.random(), min(price, close) - rng.random()
+                    f.write(f"{symbol},{t},{price:.2f},{high:.2f},{low:.2f},{close:.2f}\n")
+                    price = close
+
+
+def test_rev_lvl_window_follows_london_time():
+    winter, summer = _epoch(2024, 1, 15), _epoch(2024, 7, 15)
+    assert backtest.anchor_window('rev_lvl', winter) == (_epoch(2024, 1, 15, 8), _epoch(2024, 1, 15, 16, 30))
+    assert backtest.anchor_window('rev_lvl', summer) == (_epoch(2024, 7, 15, 7), _epoch(2024, 7, 15, 15, 30))
+    assert backtest.anchor_window('gann_box', winter) == (winter, winter + 3600)
+
+
+def test_classify_levels_counts_rejections_and_breaks():
+    opens = np.array([100.0, 101.0, 104.0])
+    highs = np.array([101.0, 105.0, 106.0])
+    lows = np.array([99.0, 100.5, 103.0])
+    closes = np.array([101.0, 104.0, 103.5])
+    # 102 is crossed and closed through, 104.5 is touched and rejected, 110 is never reached.
+    assert backtest.classify_levels([102.0, 104.5, 110.0], opens, highs, lows, closes) == (2, 1, 1)
+
+
+def test_pool_matches_single_process(tmp_path):
+    path = tmp_path / "bars.csv"
+    _write_bars(path, [_epoch(2024, 1, 15), _epoch(2024, 1, 16), _epoch(2024, 7, 15)])
+    single = backtest.run(str(path), workers=1, chunk_size=500)
+    pooled = backtest.run(str(path), workers=2, chunk_size=500)
+    assert pooled == single
+    assert set(single) == {'EURUSD', 'XAUUSD'}
+    assert all(stats[method][0] for stats in single.values() for method in backtest.ANCHOR_WINDOWS)
@@ -0,0 +1,76 @@
+import csv
+
+import numpy as np
+import pytest
+
+import batch
+import engine
+
+ANCHORS = """symbol,timestamp,high,low
+A,2024-01-01,2050,1990
+B,2024-01-02,abc,1990
+C,2024-01-03,5,3
+
+D,2024-01-04,2050.5
+E,2024-01-05,-40,-50
+"""
+
+
+def _read(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def anchors(tmp_path):
+    path = tmp_path / "anchors.csv"
+    path.write_text(ANCHORS)
+    return str(path)
+
+
+def test_bad_rows_are_reported_and_skipped(anchors, tmp_path, capsys):
+    output = str(tmp_path / "levels.csv")
+    assert batch.main([anchors, output]) == 0
+    err = capsys.readouterr().err.splitlines()
+    assert err == [
+        "5 anchor rows processed",
+        "  gann_box: 7 anchors rejected",
+        "  lvl369: 5 anchors rejected",
+        "  rev_lvl: 4 anchors rejected",
+        "  middle_l: 3 anchors rejected",
+    ]
+    rows = _read(output)
+    assert all(np.isfinite(float(row['value'])) for row in rows)
+    by_method = {method: {(row['symbol'], row['anchor']) for row in rows if row['method'] == method}
+                 for method in engine.METHODS}
+    assert by_method['gann_box'] == {('A', 'high'), ('A', 'low'), ('B', 'low')}
+    assert by_method['middle_l'] == {('A', 'high_low'), ('C', 'high_low')}
+    assert ('D', 'high') in by_method['rev_lvl'] and ('D', 'low') not in by_method['rev_lvl']
+    gann = [float(row['value']) for row in rows
+            if row['symbol'] == 'A' and row['method'] == 'gann_box' and row['anchor'] == 'high'
+            and row['sentiment'] == 'bullish']
+    levels, _ = engine.gann_box_levels([2050], 'bullish')
+    assert gann == levels[0].tolist()
+
+
+def test_chunking_and_dedupe_do_not_change_the_output(anchors, tmp_path):
+    whole, chunked = str(tmp_path / "whole.csv"), str(tmp_path / "chunked.csv")
+    assert batch.main([anchors, whole]) == 0
+    assert batch.main([anchors, chunked, '--chunk-size', '2', '--dedupe']) == 0
+    # Rows come out method by method within each chunk, so only the order may differ.
+    key = lambda row: tuple(row.values())
+    assert sorted(_read(chunked), key=key) == sorted(_read(whole), key=key)
+
+
+def test_missing_columns_fail_cleanly(tmp_path, capsys):
+    path = tmp_path / "anchors.csv"
+    path.write_text("symbol,high,low\nA,2050,1990\n")
+    assert batch.main([str(path), str(tmp_path / "levels.csv")]) == 1
+    assert capsys.readouterr().err == f"batch: {path}: missing column(s) timestamp\n"
+
+
+def test_bad_arguments_exit(anchors, tmp_path):
+    with pytest.raises(SystemExit):
+        batch.main([anchors, str(tmp_path / "levels.csv"), '--methods', 'gann_box,nope'])
+    with pytest.raises(SystemExit):
+        batch.main([anchors, str(tmp_path / "levels.csv"), '--chunk-size', '0'])
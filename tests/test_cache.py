@@ -0,0 +1,32 @@
+import json
+
+import cache
+import ticks
+
+
+def test_saved_entries_are_hits_after_a_restart(tmp_path):
+    path = str(tmp_path / 'levels.json')
+    warm = cache.LevelCache(path=path)
+    anchors = [('gann_box', 2000, 'bullish', None), ('rev_lvl', 1234.5, 'bearish', None),
+               ('middle_l', (2050.0, 1990.0), None, None), ('lvl369', 123456, 'bullish', ticks.TickSize(1, 2)),
+               ('gann_box', -5, 'bullish', None)]
+    expected = [warm.levels(*anchor) for anchor in anchors]
+    warm.save()
+
+    restarted = cache.LevelCache(path=path)
+    assert len(restarted) == len(anchors)
+    assert [restarted.levels(*anchor) for anchor in anchors] == expected
+    assert (restarted.hits, restarted.misses) == (len(anchors), 0)
+
+
+def test_other_file_versions_are_ignored(tmp_path):
+    path = tmp_path / 'levels.json'
+    path.write_text(json.dumps({'version': 1, 'entries': [['gann_box', 2000, 'bullish', [1, 2]]]}))
+    assert cache.LevelCache().load(str(path)) == 0
+
+
+def test_path_from_env(monkeypatch):
+    monkeypatch.delenv('GANN_LEVEL_CACHE', raising=False)
+    assert cache.path_from_env() is None
+    monkeypatch.setenv('GANN_LEVEL_CACHE', '/tmp/levels.json')
+    assert cache.path_from_env() == '/tmp/levels.json'
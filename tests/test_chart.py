@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import chart
+
+
+def _series(prices):
+    series = chart.PriceSeries()
+    series.extend(np.arange(len(prices), dtype=np.float64), prices)
+    return series
+
+
+def test_spikes_outside_the_view_are_not_drawn():
+    prices = np.zeros(20_000)
+    prices[5001] = 100.0
+    prices[10_000] = -100.0
+    xs, ys = _series(prices).view(5002, 10_000, 50)
+    assert ys.max() == 0.0 and ys.min() == 0.0
+
+
+@pytest.mark.parametrize('start, stop, columns', [(0, 20_000, 50), (5002, 10_000, 50), (1, 19_999, 7),
+                                                  (333, 17_777, 300), (12_345, 19_990, 64)])
+def test_envelope_covers_exactly_the_view(start, stop, columns):
+    prices = np.random.default_rng(start).normal(size=20_003).cumsum()
+    xs, ys = _series(prices).view(start, stop, columns)
+    assert ys.min() == prices[start:stop].min()
+    assert ys.max() == prices[start:stop].max()
+    assert xs.min() >= start and xs.max() < stop
@@ -0,0 +1,31 @@
+import numpy as np
+
+import confluence
+import engine
+
+
+def _methods(index):
+    return {engine.METHODS[m] for m in np.unique(index.methods)}
+
+
+def test_fractional_session_anchors_get_every_method():
+    index = confluence.ConfluenceIndex()
+    assert len(index.add_session(2050.37, 1990.62)) == 7
+    assert _methods(index) == set(engine.METHODS)
+    assert index.anchors[0] == ('gann_box', 2050.0, 'bullish')
+
+
+def test_add_sessions_matches_add_session():
+    highs, lows = [2050.37, 1500.5, 1234.49], [1990.62, 1400.25, 1200.75]
+    one_by_one = confluence.ConfluenceIndex()
+    for high, low in zip(highs, lows):
+        one_by_one.add_session(high, low)
+    batched = confluence.ConfluenceIndex()
+    batched.add_sessions(highs, lows)
+    assert _methods(batched) == set(engine.METHODS)
+    # Equal values may come in a different method order; the levels and zones are the same.
+    for index in (batched, one_by_one):
+        order = np.lexsort((index.methods, index.values))
+        index.sorted_levels = index.values[order], index.methods[order]
+    np.testing.assert_array_equal(batched.sorted_levels, one_by_one.sorted_levels)
+    np.testing.assert_array_equal(batched.breaks, one_by_one.breaks)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import engine
+
+
+# The GANN BOX arithmetic as the calculator first did it: digit sums until one digit, then the gate table.
+def reference_digital_root(n):
+    s = sum(int(digit) for digit in str(n))
+    return s if s < 10 else reference_digital_root(s)
+
+
+def reference_gate(n):
+    if n in [1, 4, 7]:
+        return 12
+    elif n in [2, 5, 8]:
+        return 15
+    elif n in [3, 6, 9]:
+        return 18
+    else:
+        return 0
+
+
+def supported_values():
+    """Every value below 10^5, then edges and random values up to MAX_PRICE."""
+    rng = np.random.default_rng(2)
+    edges = [base + offset for k in range(1, 16) for base in (10 ** k, 9 * 10 ** k)
+             for offset in (-1, 0, 1)]
+    edges += [engine.MAX_PRICE - offset for offset in range(20)]
+    edges += [int('9' * k) for k in range(1, 16)]
+    randoms = rng.integers(0, engine.MAX_PRICE, size=100_000, endpoint=True).tolist()
+    return np.array(list(range(100_000)) + edges + randoms, dtype=np.int64)
+
+
+VALUES = supported_values()
+
+
+def test_digital_root_matches_repeated_digit_sums():
+    expected = np.array([reference_digital_root(n) for n in VALUES.tolist()])
+    np.testing.assert_array_equal(engine.digital_root(VALUES), expected)
+
+
+def test_gate_values_match_the_gate_rules():
+    roots = engine.digital_root(VALUES)
+    expected = np.array([reference_gate(root) for root in roots.tolist()])
+    np.testing.assert_array_equal(engine.gate_values(roots), expected)
+
+
+@pytest.mark.parametrize('n', [0, 1, 9, 10, 18, 19, 2000, 99999, 10 ** 15 + 7, engine.MAX_PRICE])
+def test_scalar_paths_match_the_array_paths(n):
+    root = engine.digital_root(n)
+    assert root == reference_digital_root(n)
+    assert engine.gate_values(root) == reference_gate(root)
+
+
+def test_369_takes_negative_anchors():
+    levels, valid = engine.lvl369_levels(np.array([-5, -10, 0, 5, 10, -engine.MAX_PRICE - 1]), 'bullish')
+    np.testing.assert_array_equal(valid, [True, True, False, False, True, False])
+    np.testing.assert_array_equal(levels[:2], [[-2, 4, 13], [-7, -1, 8]])
+    float_levels, float_valid = engine.lvl369_levels([-5.0, -5.5, 12.0], 'bearish')
+    np.testing.assert_array_equal(float_valid, [True, False, True])
+    np.testing.assert_array_equal(float_levels[0], [-8, -14, -23])
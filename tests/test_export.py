@@ -0,0 +1,85 @@
+import csv
+
+import numpy as np
+import pytest
+
+import engine
+import export
+
+
+def _log(timestamp=1.0):
+    log = export.CalculationLog(capacity=4)
+    levels, valid = engine.gann_box_levels([2000, 5, 2048], 'bullish')
+    log.record_batch('gann_box', [2000, 5, 2048], 'bullish', levels, valid, timestamp=timestamp)
+    log.record('middle_l', (2050.5, 1990.25), None, [2020.375], timestamp=timestamp)
+    log.record('rev_lvl', 1234.5, 'bearish', [1200.125, 1166.0], timestamp=timestamp)
+    return log
+
+
+def assert_records_equal(actual, expected):
+    # NaN anchor lows never compare equal inside a structured array; compare field by field.
+    assert len(actual) == len(expected)
+    for name in export.RECORD_DTYPE.names:
+        np.testing.assert_array_equal(actual[name], expected[name])
+
+
+def test_record_batch_matches_record():
+    levels, valid = engine.lvl369_levels([369, 1000], 'bearish')
+    batched = export.CalculationLog()
+    batched.record_batch('lvl369', [369, 1000], 'bearish', levels, valid, timestamp=5.0)
+    single = export.CalculationLog()
+    for anchor, row in zip([369, 1000], levels):
+        single.record('lvl369', anchor, 'bearish', row, timestamp=5.0)
+    assert_records_equal(batched.view(), single.view())
+
+
+def test_npy_append_round_trip(tmp_path):
+    path = str(tmp_path / "session.npy")
+    first, second = _log(1.0), _log(2.0)
+    expected = np.concatenate([first.view().copy(), second.view().copy()])
+    assert first.flush(path) == 2 * engine.GANN_BOX_DEPTH + 3
+    assert len(first) == 0
+    second.flush(path)
+    loaded = np.load(path, mmap_mode='r')
+    assert loaded.dtype == export.RECORD_DTYPE
+    assert_records_equal(loaded, expected)
+    assert np.isnan(loaded['anchor_low'][0]) and loaded['anchor_low'][2 * engine.GANN_BOX_DEPTH] == 1990.25
+
+
+def test_npy_append_rejects_another_layout(tmp_path):
+    path = str(tmp_path / "other.npy")
+    np.save(path, np.zeros(3))
+    with pytest.raises(ValueError):
+        _log().flush(path)
+
+
+def test_csv_append_round_trip(tmp_path):
+    path = str(tmp_path / "session.csv")
+    first, second = _log(1.0), _log(2.0)
+    expected = np.concatenate([first.view().copy(), second.view().copy()])
+    first.flush(path)
+    second.flush(path)
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(export.RECORD_DTYPE.names)
+    assert len(rows) == len(expected) + 1
+    assert [row[1] for row in rows[1:]] == [engine.METHODS[m] for m in expected['method']]
+    np.testing.assert_array_equal([float(row[6]) for row in rows[1:]], expected['value'])
+    np.testing.assert_array_equal([float(row[3]) for row in rows[1:]], expected['anchor_low'])
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'arrow'])
+def test_arrow_parts_round_trip(tmp_path, extension):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.dataset
+
+    path = str(tmp_path / f"session.{extension}")
+    first, second = _log(1.0), _log(2.0)
+    expected = np.concatenate([first.view().copy(), second.view().copy()])
+    first.flush(path)
+    second.flush(path)
+    table = pyarrow.dataset.dataset(path, format='ipc' if extension == 'arrow' else 'parquet').to_table()
+    assert table.num_rows == len(expected)
+    assert table.column('method').to_pylist() == [engine.METHODS[m] for m in expected['method']]
+    np.testing.assert_array_equal(table.column('value').to_numpy(), expected['value'])
+    np.testing.assert_array_equal(table.column('timestamp').to_numpy(), expected['timestamp'])
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+import feed
+import ticks
+
+
+@pytest.mark.parametrize('price', ['nan', 'inf', '-inf', 'NaN'])
+def test_non_finite_prices_are_bad_lines(price):
+    assert feed.parse_tick(f"EURUSD,1700000000,{price}") is None
+
+
+class ListFeed(feed.PriceFeed):
+    def __init__(self, rows, **kwargs):
+        super().__init__('list', **kwargs)
+        self.rows = rows
+
+    async def tick_source(self):
+        for row in self.rows:
+            yield row
+
+
+@pytest.mark.parametrize('tick_sizes', [None, {'EURUSD': ticks.TickSize(1, 5)}])
+def test_non_finite_ticks_do_not_stop_the_feed(tick_sizes):
+    price_feed = ListFeed([('EURUSD', 0.0, 1.1), ('EURUSD', 1.0, float('nan')),
+                           ('EURUSD', 2.0, float('inf')), ('EURUSD', 3.0, 1.2)], tick_sizes=tick_sizes)
+    asyncio.run(price_feed._main())
+    assert price_feed.error is None
+    assert price_feed.ticks == 2
+    assert price_feed.drain()['EURUSD'].high == 1.2
+
+
+def test_stop_after_the_source_has_ended():
+    price_feed = ListFeed([('EURUSD', 0.0, 1.1)])
+    price_feed.start()
+    price_feed._thread.join(timeout=5)
+    assert not price_feed._thread.is_alive()
+    price_feed.stop()
+    assert price_feed.error is None
+    assert price_feed.drain()['EURUSD'].price == 1.1
+
+
+def test_stop_after_a_replay_has_finished(tmp_path):
+    import replay
+    path = tmp_path / 'ticks.csv'
+    path.write_text("symbol,timestamp,price\nEURUSD,1,1.1\nEURUSD,2,1.2\n")
+    replay_feed = replay.ReplayFeed(str(path), None)
+    replay_feed.start()
+    replay_feed._thread.join(timeout=5)
+    assert replay_feed.finished
+    replay_feed.stop()
+    assert replay_feed.ticks == 2
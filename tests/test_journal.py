@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import journal
+import up5
+
+
+def test_a_second_instance_cannot_open_the_journal(tmp_path):
+    path = str(tmp_path / 'session.gj')
+    first = journal.Journal(path)
+    first.record('rev_lvl', 1234.5, 'bullish', [1305.2])
+    with pytest.raises(journal.JournalLocked):
+        journal.Journal(path)
+    first.record('rev_lvl', 1000.0, 'bearish', [937.5])
+    first.close()
+
+    reopened = journal.Journal(path)
+    assert len(reopened) == 2
+    assert reopened.latest[('rev_lvl', 'bearish')].anchor == 1000.0
+    reopened.close()
+
+
+class FailingJournal:
+    closed = False
+
+    def record(self, *args):
+        raise OSError(28, "No space left on device")
+
+    def close(self):
+        self.closed = True
+
+
+def test_a_failing_journal_does_not_fail_the_calculation(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(up5.messagebox, 'showwarning', lambda title, message: warnings.append(message))
+    failing = FailingJournal()
+    monkeypatch.setattr(up5, 'JOURNAL', failing)
+    up5.record_levels('rev_lvl', 1234.5, 'bullish', np.array([1305.2]), None)
+    assert up5.JOURNAL is None and failing.closed
+    assert len(warnings) == 1 and "No space left" in warnings[0]
+    assert up5.CALCULATED_LEVELS['rev_lvl'] == ('bullish', [1305.2])
+
+
+def _session(path, calculations, start=0):
+    session = journal.Journal(path)
+    restored = len(session.unsaved())
+    session.start_session()
+    for i in range(start, start + calculations):
+        session.record('rev_lvl', 1000.0 + i, 'bullish' if i % 2 else 'bearish', [1100.0 + i, 1200.0 + i])
+    session.close()
+    return restored
+
+
+def test_the_file_holds_one_session(tmp_path):
+    path = str(tmp_path / 'session.gj')
+    assert _session(path, 10_000) == 0
+    assert _session(path, 10_000, 10_000) == 20_000      # only the previous session's records come back
+    assert _session(path, 10, 20_000) == 20_000
+    size = (tmp_path / 'session.gj').stat().st_size
+    assert size < journal.HEADER_SIZE + 100 * journal.RECORD_DTYPE.itemsize
+
+    reopened = journal.Journal(path)
+    assert len(reopened.unsaved()) == 20
+    assert reopened.latest[('rev_lvl', 'bullish')].anchor == 1000.0 + 20_009
+    reopened.mark_saved()
+    assert len(reopened.unsaved()) == 0
+    assert reopened.latest[('rev_lvl', 'bearish')].anchor == 1000.0 + 20_008
+    reopened.close()
+
+
+def test_a_compaction_cut_short_still_restores(tmp_path):
+    path = str(tmp_path / 'session.gj')
+    session = journal.Journal(path)
+    for i in range(100):
+        session.record('rev_lvl', 1000.0 + i, 'bullish', [1100.0 + i])
+    latest = session.latest[('rev_lvl', 'bullish')].anchor
+    # Cut the file after the front copy, before the header points at it.
+    write_header, calls = session._write_header, []
+    session._write_header = lambda: write_header() if not calls.append(1) and len(calls) == 1 else None
+    session.compact()
+    session.close()
+
+    reopened = journal.Journal(path)
+    assert reopened.latest[('rev_lvl', 'bullish')].anchor == latest
+    assert len(reopened.unsaved()) == 0
+    reopened.close()
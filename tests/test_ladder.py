@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import engine
+import ladder
+import ticks
+
+ANCHORS = [10, 2000, 2048, 9999, 123457]
+
+
+def _rungs(gann, count=400):
+    return [gann.anchor + gann.step * k for k in range(1, count + 1)]
+
+
+@pytest.mark.parametrize('sentiment', engine.SENTIMENTS)
+@pytest.mark.parametrize('anchor', ANCHORS)
+def test_first_levels_match_the_engine(anchor, sentiment):
+    gann = ladder.GannLadder(anchor, sentiment)
+    levels, valid = engine.gann_box_levels([anchor], sentiment)
+    assert valid[0]
+    assert list(gann[:engine.GANN_BOX_DEPTH]) == levels[0].tolist()
+    assert gann.level(25) == _rungs(gann)[24]
+
+
+@pytest.mark.parametrize('sentiment', engine.SENTIMENTS)
+@pytest.mark.parametrize('anchor', ANCHORS)
+def test_between_matches_a_scan(anchor, sentiment):
+    gann = ladder.GannLadder(anchor, sentiment)
+    rungs = _rungs(gann)
+    rng = np.random.default_rng(anchor)
+    for low, high in rng.uniform(anchor - 3000, anchor + 3000, (50, 2)):
+        low, high = min(low, high), max(low, high)
+        expected = [level for level in rungs if low <= level <= high]
+        assert list(gann.between(low, high)) == expected
+    # Integer bounds sitting exactly on a rung include it.
+    low, high = sorted((rungs[2], rungs[5]))
+    assert list(gann.between(low, high)) == rungs[2:6]
+    assert list(gann.between(anchor, anchor)) == []
+
+
+@pytest.mark.parametrize('sentiment', engine.SENTIMENTS)
+@pytest.mark.parametrize('anchor', ANCHORS)
+def test_nearest_matches_a_scan(anchor, sentiment):
+    gann = ladder.GannLadder(anchor, sentiment)
+    rungs = _rungs(gann)
+    rng = np.random.default_rng(anchor + 1)
+    prices = list(rng.uniform(anchor - 2000, anchor + 2000, 100))
+    # Midpoints between rungs tie; they go to the rung nearer the anchor.
+    prices += [(rungs[3] + rungs[4]) / 2, rungs[7], float(anchor)]
+    for price in prices:
+        # min() keeps the first of equal distances, which is the rung nearer the anchor.
+        k = min(range(len(rungs)), key=lambda i: abs(rungs[i] - price)) + 1
+        assert gann.nearest(price) == (k, rungs[k - 1])
+
+
+def test_membership_and_bad_input():
+    gann = ladder.GannLadder(2000, 'bullish')
+    assert gann.step == 15
+    assert 2015 in gann and 2000 not in gann and 2016 not in gann and 1985 not in gann
+    with pytest.raises(ValueError):
+        ladder.GannLadder(9, 'bullish')
+    with pytest.raises(IndexError):
+        gann[-1]
+    with pytest.raises(ValueError):
+        gann[5:]
+
+
+def test_tick_sized_ladder_counts_ticks():
+    tick = ticks.TickSize(1, 2)
+    gann = ladder.GannLadder(200012, 'bearish', tick)
+    root = engine.digital_root(200012)
+    assert gann.step == -int(engine.gate_values(root))
+    assert gann.nearest(gann.level(3) + 1) == (3, gann.level(3))
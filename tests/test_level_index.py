@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import confluence
+import level_index
+
+
+def _remove_by_scan(arrays, anchor_id):
+    keep = arrays[3] != anchor_id
+    return [array[keep] for array in arrays]
+
+
+@pytest.mark.parametrize('index_class', [level_index.LevelIndex, confluence.ConfluenceIndex])
+def test_remove_anchor_matches_a_full_scan(index_class):
+    rng = np.random.default_rng(5)
+    index = index_class()
+    anchor_ids = []
+    for _ in range(200):
+        # Few distinct values, so many anchors share levels and even repeat their own.
+        levels = rng.integers(0, 40, size=rng.integers(1, 8)).astype(np.float64)
+        anchor_ids.append(index.add_levels(levels, 'rev_lvl', float(levels[0]), 'bullish'))
+    rng.shuffle(anchor_ids)
+    for anchor_id in anchor_ids:
+        before = [index.values, index.methods, index.directions, index.anchor_ids]
+        expected = _remove_by_scan(before, anchor_id)
+        assert index.remove_anchor(anchor_id) == len(before[0]) - len(expected[0])
+        for array, expected_array in zip([index.values, index.methods, index.directions, index.anchor_ids], expected):
+            np.testing.assert_array_equal(array, expected_array)
+        if index_class is confluence.ConfluenceIndex:
+            breaks = index.breaks.copy()
+            index.set_tolerance(index.tolerance / index.tick_size)
+            np.testing.assert_array_equal(breaks, index.breaks)
+    assert len(index) == 0 and not index.anchor_levels
+    assert index.remove_anchor(anchor_ids[0]) == 0
+
+
+def test_remove_anchor_after_add_sessions():
+    index = confluence.ConfluenceIndex()
+    index.add_sessions([2050.0, 1500.0], [1990.0, 1400.0])
+    for anchor_id in list(index.anchors):
+        expected = _remove_by_scan([index.values, index.methods, index.directions, index.anchor_ids], anchor_id)
+        index.remove_anchor(anchor_id)
+        np.testing.assert_array_equal(index.anchor_ids, expected[3])
+    assert len(index) == 0
+
+
+def test_batched_updates_match_updates_read_one_by_one():
+    rng = np.random.default_rng(11)
+    batched, stepwise = level_index.LevelIndex(), level_index.LevelIndex()
+    live = []
+    for step in range(300):
+        if live and rng.random() < 0.4:
+            anchor_id = live.pop(rng.integers(len(live)))
+            assert batched.remove_anchor(anchor_id) == stepwise.remove_anchor(anchor_id)
+        else:
+            levels = rng.integers(0, 60, size=rng.integers(1, 6)).astype(np.float64)
+            method, sentiment = ('middle_l', None) if step % 3 else ('gann_box', 'bearish')
+            live.append(batched.add_levels(levels, method, float(levels[0]), sentiment))
+            assert stepwise.add_levels(levels, method, float(levels[0]), sentiment) == live[-1]
+        stepwise.values  # read after every update
+        if step % 50 == 49:
+            # Equal values may sit in another order; the sorted levels and their rows are the same.
+            rows = [np.lexsort((index.anchor_ids, index.values)) for index in (batched, stepwise)]
+            for name in ('values', 'methods', 'directions', 'anchor_ids'):
+                np.testing.assert_array_equal(getattr(batched, name)[rows[0]], getattr(stepwise, name)[rows[1]])
+            assert np.all(np.diff(batched.values) >= 0)
+    for anchor_id in live:
+        assert batched.anchor_ids[batched.anchor_positions(anchor_id)].tolist() == [anchor_id] * len(
+            batched.anchor_levels[anchor_id])
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import engine
+import level_tables
+
+
+def test_built_table_matches_the_engine(tmp_path):
+    path = str(tmp_path / 'levels.tbl')
+    level_tables.build(path, 10, 5000)
+    table = level_tables.LevelTable(path)
+    prices = np.arange(10, 5001, dtype=np.int64)
+    for method, sentiment in level_tables.SECTIONS:
+        np.testing.assert_array_equal(table.lookup(method, prices, sentiment),
+                                      engine.ANCHOR_METHODS[method](prices, sentiment)[0])
+
+
+def test_interrupted_build_keeps_the_old_table(tmp_path, monkeypatch):
+    path = str(tmp_path / 'levels.tbl')
+    level_tables.build(path, 10, 100)
+    with open(path, 'rb') as f:
+        before = f.read()
+
+    def interrupted(prices, sentiment):
+        raise KeyboardInterrupt
+    monkeypatch.setitem(engine.ANCHOR_METHODS, 'lvl369', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        level_tables.build(path, 10, 5000)
+
+    with open(path, 'rb') as f:
+        assert f.read() == before
+    assert [p.name for p in tmp_path.iterdir()] == ['levels.tbl']
@@ -0,0 +1,47 @@
+import pytest
+
+import cache
+import metrics
+
+
+@pytest.fixture
+def clean_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, 'enabled', False)
+    monkeypatch.setattr(metrics, '_collectors', [])
+    yield
+    metrics.reset()
+
+
+def test_cache_totals_are_exported_as_counters(clean_metrics):
+    level_cache = cache.LevelCache()
+    level_cache.levels('gann_box', 2000, 'bullish')
+    level_cache.levels('gann_box', 2000, 'bullish')
+    metrics.register_collector(lambda: level_cache.metric_samples('gui'))
+    text = metrics.render()
+    assert '# TYPE gann_cache_entries gauge' in text
+    for name in ('hits', 'misses', 'evictions'):
+        assert f'# TYPE gann_cache_{name}_total counter' in text
+    assert 'gann_cache_hits_total{cache="gui"} 1' in text
+
+
+@pytest.mark.parametrize('port', ['abc', '70000', '-1'])
+def test_a_bad_metrics_port_does_not_stop_startup(clean_metrics, monkeypatch, capsys, port):
+    monkeypatch.setenv('GANN_METRICS_PORT', port)
+    monkeypatch.delenv('GANN_METRICS_FILE', raising=False)
+    monkeypatch.delenv('GANN_PROFILE', raising=False)
+    metrics.configure_from_env()
+    assert not metrics.enabled
+    assert 'GANN_METRICS_PORT' in capsys.readouterr().err
+
+
+def test_values_keep_every_digit_and_labels_are_escaped(clean_metrics):
+    metrics.enable()
+    metrics.count('gann_engine_rows_total', 1234567, method='gann_box')
+    metrics.count('gann_engine_rows_total', 2 ** 53, method='lvl369')
+    metrics.register_collector(lambda: [('gann_feed_queue_depth', {'source': 'C:\\ticks\\"a"\nb'}, 0.1 + 0.2),
+                                        ('gann_replay_behind_seconds', {}, float('inf'))])
+    lines = metrics.render().splitlines()
+    assert 'gann_engine_rows_total{method="gann_box"} 1234567' in lines
+    assert f'gann_engine_rows_total{{method="lvl369"}} {2 ** 53}' in lines
+    assert 'gann_feed_queue_depth{source="C:\\\\ticks\\\\\\"a\\"\\nb"} 0.30000000000000004' in lines
+    assert 'gann_replay_behind_seconds +Inf' in lines
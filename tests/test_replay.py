@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import replay
+
+
+class FakeTime:
+    """perf_counter and asyncio.sleep on a shared clock that only moves when slept."""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def perf_counter(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        if seconds:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(replay.time, 'perf_counter', fake.perf_counter)
+    monkeypatch.setattr(replay.asyncio, 'sleep', fake.sleep)
+    return fake
+
+
+def _write_ticks(path, rows):
+    path.write_text("symbol,timestamp,price\n" + "".join(f"{s},{t},{p}\n" for s, t, p in rows))
+    return str(path)
+
+
+@pytest.mark.parametrize('text, speed', [('100', 100.0), ('100x', 100.0), (' MAX ', None), ('1', 1.0)])
+def test_parse_speed(text, speed):
+    assert replay.parse_speed(text) == speed
+
+
+@pytest.mark.parametrize('text', ['0', '1001', 'fast', 'maxx'])
+def test_parse_speed_rejects(text):
+    with pytest.raises(ValueError):
+        replay.parse_speed(text)
+
+
+def test_clock_paces_by_timestamp(fake_time):
+    clock = replay.ReplayClock(10)
+    assert clock.delay(1000.0) == 0.0
+    assert clock.delay(1005.0) == pytest.approx(0.5)
+    fake_time.now += 2.0
+    assert clock.delay(1010.0) == pytest.approx(-1.0)
+    assert clock.behind == pytest.approx(1.0)
+    # A speed change restarts the pacing from the next tick.
+    clock.set_speed(None)
+    assert clock.behind == 0.0 and clock.delay(5000.0) == 0.0
+    clock.set_speed(2)
+    assert clock.delay(5000.0) == 0.0
+    assert clock.delay(5001.0) == pytest.approx(0.5)
+
+
+def test_ticks_are_read_at_their_pace(tmp_path, fake_time):
+    path = _write_ticks(tmp_path / "ticks.csv", [('A', 0, 1.0), ('A', 1, 1.1), ('B', 1.0005, 2.0), ('A', 3, 1.2)])
+
+    async def read():
+        return [tick async for tick in replay.replay_ticks(path, replay.ReplayClock(2), chunk_size=2)]
+
+    assert asyncio.run(read()) == [('A', 0, 1.0), ('A', 1, 1.1), ('B', 1.0005, 2.0), ('A', 3, 1.2)]
+    # The tick 0.25 ms after its neighbour is due too soon to sleep for.
+    assert fake_time.sleeps == pytest.approx([0.5, 1.0])
+
+
+def test_step_speed_walks_the_steps():
+    feed = replay.ReplayFeed('unused.csv', 7)
+    feed.step_speed(1)
+    assert feed.speed == 10
+    feed.step_speed(100)
+    assert feed.speed is None
+    feed.step_speed(-1)
+    assert feed.speed == 1000
+    feed.step_speed(-100)
+    assert feed.speed == 1
+
+
+def test_replay_reaches_the_end(tmp_path):
+    path = _write_ticks(tmp_path / "ticks.csv", [('A', i, 2000 + i) for i in range(50)] + [('B', 60, 1500.5)])
+    feed = replay.ReplayFeed(path, None, chunk_size=8)
+    feed.start()
+    feed._thread.join(timeout=5)
+    assert feed.finished and feed.error is None
+    assert feed.ticks == 51
+    latest = feed.drain()
+    assert latest['A'].price == 2049 and latest['A'].high == 2049 and latest['B'].price == 1500.5
+    assert feed.status_text() == "replay max done"
+
+
+def test_headless_run_reports_the_ticks(tmp_path, capsys):
+    path = _write_ticks(tmp_path / "ticks.csv", [('A', i, 2000 + i) for i in range(20)])
+    assert replay.main([path, '--frame-ms', '1']) == 0
+    assert capsys.readouterr().out.startswith("20 ticks in ")
+    assert replay.main([path, '--speed', '5000']) == 1
+    assert capsys.readouterr().err.startswith("replay: replay speed must be from 1x to 1000x")
@@ -0,0 +1,87 @@
+import csv
+import datetime
+
+import numpy as np
+import pytest
+
+import resample
+
+START = int(datetime.datetime(2024, 3, 29, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _ticks(count=3000, seed=3):
+    rng = np.random.default_rng(seed)
+    # Three days around the spring DST change, symbols interleaved in time.
+    timestamps = np.sort(START + rng.uniform(0, 3 * resample.SECONDS_PER_DAY, count))
+    symbols = rng.choice(['EURUSD', 'XAUUSD', 'BTCUSD'], count)
+    prices = 1000 + np.cumsum(rng.normal(0, 1, count))
+    return symbols, timestamps, prices
+
+
+def _resample(frames, symbols, timestamps, prices, chunk_size):
+    resampler = resample.Resampler(frames)
+    bars = []
+    for start in range(0, len(symbols), chunk_size):
+        part = slice(start, start + chunk_size)
+        p = prices[part]
+        bars.extend(resample.anchor_bars(resampler.process(symbols[part], timestamps[part], p, p, p, p)))
+    bars.extend(resample.anchor_bars(resampler.flush()))
+    return sorted(bars), resampler
+
+
+def _reference(frames, symbols, timestamps, prices):
+    bars = {}
+    for frame in frames:
+        buckets, starts, ends = frame.buckets(timestamps)
+        for i in np.flatnonzero(buckets >= 0):
+            key = (symbols[i], frame.name, buckets[i])
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = [symbols[i], frame.name, starts[i], ends[i], prices[i], prices[i], prices[i], prices[i]]
+            else:
+                bar[5], bar[6], bar[7] = max(bar[5], prices[i]), min(bar[6], prices[i]), prices[i]
+    return sorted(resample.AnchorBar(*bar) for bar in bars.values())
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 250, 10_000])
+def test_chunked_matches_a_single_pass(chunk_size):
+    frames = resample.parse_frames('15m,1h,1d,london')
+    data = _ticks()
+    bars, resampler = _resample(frames, *data, chunk_size)
+    assert bars == _reference(frames, *data)
+    assert resampler.rows == len(data[0]) and resampler.late == 0
+
+
+def test_london_session_follows_dst():
+    frame = resample.parse_frame('london')
+    buckets, starts, ends = frame.buckets(np.array([START + 9 * 3600, START + 4 * resample.SECONDS_PER_DAY + 9 * 3600]))
+    # 29 March is still GMT; 2 April is BST, an hour ahead of UTC.
+    assert starts.tolist() == [START + 8 * 3600, START + 4 * resample.SECONDS_PER_DAY + 7 * 3600]
+    assert (ends - starts).tolist() == [int(8.5 * 3600)] * 2
+    assert frame.buckets(np.array([START + 17 * 3600]))[0].tolist() == [-1]
+
+
+def test_late_ticks_are_skipped():
+    frames = [resample.parse_frame('1h')]
+    resampler = resample.Resampler(frames)
+    one = np.ones(2)
+    resampler.process(np.array(['A', 'A']), np.array([START + 10, START + 3700.0]), one, one, one, one)
+    late = resampler.process(np.array(['A']), np.array([START + 20.0]), one[:1], one[:1], one[:1], one[:1])
+    assert len(late['symbol']) == 0 and resampler.late == 1
+    assert resampler.current('A', '1h').start == START + 3600
+
+
+def test_run_writes_completed_bars(tmp_path):
+    symbols, timestamps, prices = _ticks(500)
+    source = tmp_path / "ticks.csv"
+    with open(source, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(resample.TICK_COLUMNS)
+        writer.writerows(zip(symbols, timestamps.tolist(), prices.tolist()))
+    output = tmp_path / "anchors.csv"
+    assert resample.main([str(source), str(output), '--frames', '1h', '--chunk-size', '64', '--include-open']) == 0
+    with open(output, newline='') as f:
+        rows = list(csv.DictReader(f))
+    expected = _reference([resample.parse_frame('1h')], symbols, timestamps, prices)
+    assert len(rows) == len(expected)
+    assert {(r['symbol'], int(r['timestamp'])) for r in rows} == {(b.symbol, b.start) for b in expected}
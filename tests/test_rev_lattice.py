@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import batch
+import engine
+import rev_lattice
+import ticks
+
+# Roots below and above the step, exact squares and prices that are not valid.
+PRICES = np.array([0.0, 0.5, 1.1234, 3.9, 4.0, 7.3, 16.0, 1024.0, 2500.5, 98765.4321, -1.0, np.nan])
+
+
+@pytest.mark.parametrize('sentiment', engine.SENTIMENTS)
+def test_first_ring_is_the_engine_level(sentiment):
+    levels, valid = rev_lattice.lattice_levels(PRICES, sentiment, 1)
+    expected, expected_valid = engine.rev_lvl_levels(PRICES, sentiment)
+    np.testing.assert_array_equal(valid, expected_valid)
+    np.testing.assert_array_equal(levels, expected)
+
+
+def test_small_anchors_keep_their_bearish_ring():
+    levels, _ = rev_lattice.lattice_levels([1.1234, 3.9], 'bearish', 2)
+    np.testing.assert_allclose(levels[:, 0], [0.8838, 0.00063], atol=5e-5)
+    assert not np.isnan(levels).any()
+
+
+@pytest.mark.parametrize('tick_size', [ticks.UNIT_TICK, ticks.TickSize(1, 2), ticks.TickSize(25, 2), ticks.TickSize(1, 5)])
+@pytest.mark.parametrize('sentiment', engine.SENTIMENTS)
+def test_first_ring_is_the_tick_level(tick_size, sentiment):
+    anchors = np.array([0, 1, 3, 11234, 39000, 160000, 10 ** 9, -5])
+    levels, valid = rev_lattice.RevLattice(anchors, tick_size=tick_size).levels(sentiment, 1)
+    expected, expected_valid = ticks.rev_lvl_ticks(anchors, sentiment, tick_size)
+    np.testing.assert_array_equal(valid, expected_valid)
+    np.testing.assert_array_equal(levels[valid], expected[valid])
+
+
+def test_batch_rings_keep_every_row(tmp_path):
+    source, out = tmp_path / 'anchors.csv', tmp_path / 'out.csv'
+    source.write_text("symbol,timestamp,high,low\nX,1,3.9,1.1234\nX,2,2500,1024\n")
+    batch.run(str(source), str(out), methods=('rev_lvl',), rev_rings=2)
+    assert len(out.read_text().splitlines()) == 1 + 2 * 2 * 2 * 2
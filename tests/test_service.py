@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+import service
+
+
+@pytest.mark.parametrize('price', [10 ** 400, -10 ** 400, float('nan'), float('inf'), 2 ** 60])
+def test_unrepresentable_prices_are_bad_requests(price):
+    with pytest.raises(service.RequestError):
+        service.parse_levels_request({'method': 'gann_box', 'sentiment': 'bullish', 'price': price})
+    with pytest.raises(service.RequestError):
+        service.parse_levels_request({'method': 'middle_l', 'high': price, 'low': 1.0})
+
+
+def test_json_nan_is_a_bad_request():
+    with pytest.raises(service.RequestError):
+        service.parse_levels_request(json.loads('{"method": "rev_lvl", "sentiment": "bullish", "price": NaN}'))
+
+
+def test_one_failing_request_does_not_fail_its_batch():
+    key = ('gann_box', 'bullish', None)
+    bodies = service.compute_batch(key, [([2000], True), ([10 ** 400], True), ([1000, 5], False)])
+    assert json.loads(bodies[0])['levels'][:3] == [2015, 2030, 2045]
+    assert isinstance(bodies[1], Exception)
+    assert json.loads(bodies[2])['levels'][1] is None
@@ -0,0 +1,31 @@
+import pytest
+
+import cache
+import ticks
+
+
+def levels(method, text, sentiment, tick_size):
+    count = ticks.text_to_ticks(text, tick_size, exact=True)
+    return [ticks.format_ticks(level, tick_size) for level in cache.compute_levels(method, count, sentiment, tick_size)]
+
+
+@pytest.mark.parametrize('a, b', [('2000', '2000.0'), ('2000', '2000.00'), ('1.1', '1.10'), ('0.5', '.50')])
+def test_trailing_zeros_do_not_change_the_tick(a, b):
+    assert ticks.tick_size_of(a) == ticks.tick_size_of(b)
+
+
+def test_formatting_does_not_change_levels():
+    for method in ('gann_box', 'lvl369'):
+        assert levels(method, '2000', 'bullish', ticks.UNIT_TICK) == levels(method, '2000.0', 'bullish', ticks.UNIT_TICK)
+    fx = ticks.TickSize(1, 4)
+    assert levels('gann_box', '1.1', 'bullish', fx) == levels('gann_box', '1.10', 'bullish', fx) \
+        == ['1.1015', '1.1030', '1.1045', '1.1060', '1.1075', '1.1090', '1.1105', '1.1120', '1.1135', '1.1150']
+
+
+def test_off_tick_prices_are_rejected_not_rounded():
+    with pytest.raises(ticks.OffTickError):
+        ticks.text_to_ticks('2000.5', ticks.UNIT_TICK, exact=True)
+    with pytest.raises(ticks.OffTickError):
+        ticks.text_to_ticks('1.12345', ticks.TickSize(1, 4), exact=True)
+    assert ticks.text_to_ticks('1.12350', ticks.TickSize(1, 4), exact=True) == 11235
+    assert ticks.text_to_ticks('1.12345', ticks.TickSize(1, 4)) == 11234
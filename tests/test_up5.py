@@ -0,0 +1,204 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_batch_mode_does_not_import_the_gui(tmp_path):
+    anchors, out = tmp_path / 'anchors.csv', tmp_path / 'out.csv'
+    anchors.write_text("symbol,timestamp,high,low\nXAUUSD,1700000000,2050.5,1990.25\n")
+    result = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(ROOT, 'up5.py'), str(anchors), str(out)],
+                            capture_output=True, text=True, cwd=tmp_path, env={**os.environ, 'GANN_METRICS_PORT': ''})
+    assert result.returncode == 0, result.stderr
+    imported = {line.split('|')[-1].strip() for line in result.stderr.splitlines() if line.startswith('import time:')}
+    assert 'batch' in imported
+    assert not imported & {'tkinter', 'chart', 'export', 'ladder'}
+    assert out.read_text()
+
+
+class Field:
+    """Stands in for the Entry and Label widgets of a calculator."""
+    def __init__(self, text=''):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def config(self, **options):
+        self.options = options
+
+
+@pytest.fixture
+def errors(monkeypatch):
+    import up5
+    shown = []
+    monkeypatch.setattr(up5.messagebox, 'showerror', lambda title, message: shown.append(message))
+    monkeypatch.setattr(up5, 'JOURNAL', None)
+    up5.LEVEL_CACHE.clear()
+    yield shown
+    up5.LEVEL_CACHE.clear()
+
+
+@pytest.mark.parametrize('text, sentiment, expected', [
+    ('-5', 'bullish', ('-2', '4', '13')),
+    ('-5', 'bearish', ('-8', '-14', '-23')),
+    ('-10', 'bullish', ('-7', '-1', '8')),
+    ('10', 'bullish', ('13', '19', '28')),
+])
+def test_369_accepts_every_integer_of_two_characters(errors, text, sentiment, expected):
+    import up5
+    program = up5.Lvl369Program.__new__(up5.Lvl369Program)
+    assert program.calculate(text, sentiment) == expected
+    assert not errors
+
+
+@pytest.mark.parametrize('text', ['5', '0', '-0'])
+def test_369_rejects_single_digits(errors, text):
+    import up5
+    program = up5.Lvl369Program.__new__(up5.Lvl369Program)
+    assert program.calculate(text, 'bullish') == (None, None, None)
+    assert errors == ["Please enter a valid price level (a number with at least 2 digits)."]
+
+
+@pytest.mark.parametrize('text, message', [
+    ('nan', "Please enter a valid number for the price."),
+    ('inf', "Please enter a valid number for the price."),
+    ('1e400', "Please enter a valid number for the price."),
+    ('1e-400', "Please enter a valid number for the price."),
+    ('-1', "Price cannot be negative."),
+])
+def test_rev_lvl_messages(errors, text, message):
+    import up5
+    program = up5.RevLvlProgram.__new__(up5.RevLvlProgram)
+    program.price_entry, program.result_label = Field(text), Field()
+    program.calculate('bullish')
+    assert errors == [message]
+
+
+@pytest.mark.parametrize('text, message', [
+    ('-5', "Please enter a valid number for the price."),
+    ('-10', "Please enter a valid number for the price."),
+    ('5', "Please enter a price with at least 2 digits."),
+    ('abc', "Please enter a valid number for the price."),
+])
+def test_gann_box_messages(errors, text, message):
+    import up5
+    program = up5.GannBoxProgram.__new__(up5.GannBoxProgram)
+    assert program.calculate_levels(text, 'bullish') is None
+    assert errors == [message]
+
+
+def test_gann_box_reports_a_missing_gate(errors, monkeypatch):
+    import engine
+    import up5
+    gates = engine.GATE_TABLE.copy()
+    gates[1] = 0
+    monkeypatch.setattr(engine, 'GATE_TABLE', gates)
+    program = up5.GannBoxProgram.__new__(up5.GannBoxProgram)
+    assert program.calculate_levels('10', 'bullish') is None
+    assert errors == ["The sum of digits did not match any gate."]
+
+
+class Canvas:
+    """Records the text items a watchlist creates and patches."""
+    def __init__(self):
+        self.text = {}
+        self.patches = []
+
+    def create_text(self, x, y, text, **options):
+        self.text[len(self.text)] = text
+        return len(self.text) - 1
+
+    def itemconfigure(self, item, text):
+        self.text[item] = text
+        self.patches.append(item)
+
+    def delete(self, item):
+        del self.text[item]
+
+
+class Scrollbar:
+    def set(self, first, last):
+        self.view = (first, last)
+
+
+def _update(symbol, price, tick_size=None):
+    import feed
+    levels = {
+        ('gann_box', 'bullish'): [2015, 2030], ('gann_box', 'bearish'): [1985],
+        ('rev_lvl', 'bullish'): [price + 1.5], ('middle_l', None): [price - 0.25],
+    }
+    return feed.LevelUpdate(symbol, 0, price, price + 1, price - 1, levels, tick_size)
+
+
+@pytest.fixture
+def watchlist():
+    import up5
+    program = up5.WatchlistProgram.__new__(up5.WatchlistProgram)
+    program.symbols, program.rows, program.dirty = [], {}, set()
+    program.first_row, program.cells, program.cell_text = 0, [], []
+    program._layout_changed, program._render_job = True, None
+    program.row_height, program.column_x = 10, list(range(len(up5.WATCHLIST_COLUMNS)))
+    program.canvas, program.scrollbar = Canvas(), Scrollbar()
+    program.after_idle = lambda callback: 'job'
+    program.winfo_ismapped = lambda: True
+    program.on_resize(type('Event', (), {'height': 25})())   # three pooled rows
+    program.render()
+    return program
+
+
+def _shown(program):
+    return [[program.canvas.text[item] for item in row] for row in program.cells]
+
+
+def test_watchlist_row_cells():
+    import up5
+    assert up5.watchlist_row(_update('XAUUSD', 2000.0)) == (
+        'XAUUSD', '2000.00', '2001.00', '1999.00', '2015', '1985', '-', '-', '2001.50', '-', '1999.75')
+
+
+def test_watchlist_inserts_symbols_in_order(watchlist):
+    watchlist.show_feed_updates({s: _update(s, 2000.0) for s in ('XAUUSD', 'EURUSD', 'BTCUSD', 'US30')})
+    watchlist.render()
+    assert watchlist.symbols == ['BTCUSD', 'EURUSD', 'US30', 'XAUUSD']
+    assert [row[0] for row in _shown(watchlist)] == ['BTCUSD', 'EURUSD', 'US30']
+    assert watchlist.scrollbar.view == (0.0, 0.75)
+
+
+def test_watchlist_patches_only_changed_cells(watchlist):
+    import up5
+    watchlist.show_feed_updates({s: _update(s, 2000.0) for s in ('BTCUSD', 'EURUSD', 'XAUUSD')})
+    watchlist.render()
+    watchlist.canvas.patches.clear()
+
+    watchlist.show_feed_updates({'EURUSD': _update('EURUSD', 2000.0)})
+    assert not watchlist.dirty
+    watchlist.show_feed_updates({'EURUSD': _update('EURUSD', 2002.0)})
+    watchlist.render()
+    row = watchlist.cells[1]
+    # Last, High, Low, REV + and MID move with the price; the GANN cells stay.
+    assert sorted(watchlist.canvas.patches) == [row[1], row[2], row[3], row[8], row[10]]
+    assert _shown(watchlist)[1] == list(up5.watchlist_row(_update('EURUSD', 2002.0)))
+
+
+def test_watchlist_scrolls_the_pool(watchlist):
+    symbols = [f'S{i:02d}' for i in range(10)]
+    watchlist.show_feed_updates({s: _update(s, 2000.0 + i) for i, s in enumerate(symbols)})
+    watchlist.render()
+    items = [list(row) for row in watchlist.cells]
+
+    watchlist.scroll_to(99)
+    watchlist.render()
+    assert watchlist.first_row == 7
+    assert watchlist.cells == items
+    assert [row[0] for row in _shown(watchlist)] == symbols[7:]
+
+    # An update off screen changes the model but no item.
+    watchlist.canvas.patches.clear()
+    watchlist.show_feed_updates({'S00': _update('S00', 1500.0)})
+    watchlist.render()
+    assert not watchlist.canvas.patches
+    assert watchlist.rows['S00'][1] == '1500.00'
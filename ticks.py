@@ -0,0 +1,266 @@
+"""Fixed-point prices: int64 tick counts with a per-instrument tick size.
+
+A TickSize is ``units`` times ``10 ** -decimals`` (0.0001 is (1, 4), 0.25
+is (25, 2)), so every tick-aligned price is an exact integer and all four
+methods work on decimal prices:
+
+    GANN BOX    gate from the digital root of the price's digits, steps in ticks
+    369 LVL     the anchor shifted by 3, 6 and 9 ticks
+    REV LVL     (sqrt(price) +/- 2) ** 2, exactly rounded to the nearest tick
+    Middle L    sqrt(high * low), exactly rounded to the nearest tick
+
+With a tick size of 1 the results are the engine's integer results. Each
+function takes and returns tick counts, as ``(levels, valid)`` like the
+engine; invalid rows are 0.
+
+Instrument tick sizes are read from a "symbol,tick_size" CSV, such as the
+file named by ``GANN_TICK_SIZES``.
+"""
+import collections
+import csv
+import decimal
+import math
+import os
+
+import numpy as np
+
+import engine
+
+TickSize = collections.namedtuple('TickSize', 'units decimals')
+
+UNIT_TICK = TickSize(1, 0)
+# Typed prices with more decimals than float64 carries have no usable tick.
+MAX_DECIMALS = 15
+# Exact fallback for REV LVL rows whose float result is this close to a half tick.
+TIE_TOLERANCE = 1e-9
+TIE_RELATIVE_TOLERANCE = 4e-15
+EXACT_PRECISION = 60
+# Middle L squares tick counts; above this the product leaves int64.
+MAX_INT64_PRODUCT = 2 ** 62
+
+
+class OffTickError(ValueError):
+    """A typed price that is not a whole number of ticks."""
+
+
+def parse_tick_size(value):
+    """TickSize from a string, number or Decimal such as '0.01' or '0.25'."""
+    if isinstance(value, TickSize):
+        return value
+    try:
+        size = decimal.Decimal(str(value)).normalize()
+    except decimal.InvalidOperation:
+        raise ValueError(f"invalid tick size: {value!r}")
+    if not size.is_finite() or size <= 0:
+        raise ValueError(f"invalid tick size: {value!r}")
+    sign, digits, exponent = size.as_tuple()
+    units = int(''.join(map(str, digits)))
+    if exponent > 0:
+        return TickSize(units * 10 ** exponent, 0)
+    return TickSize(units, -exponent)
+
+
+def tick_size_of(text, min_decimals=0):
+    """The coarsest decimal tick (at least ``min_decimals``) that holds the price in ``text``.
+
+    Trailing zeros don't count, so "1.1" and "1.10" give the same tick.
+    """
+    try:
+        exponent = decimal.Decimal(text.strip()).normalize().as_tuple().exponent
+    except decimal.InvalidOperation:
+        raise ValueError(f"invalid price: {text!r}")
+    if not isinstance(exponent, int) or -exponent > MAX_DECIMALS:
+        raise ValueError(f"invalid price: {text!r}")
+    return TickSize(1, max(-exponent, min_decimals, 0))
+
+
+# --- Conversion ---
+
+def text_to_ticks(text, tick_size, exact=False):
+    """Exact tick count of a typed price, rounded half-even to the tick.
+
+    With ``exact`` a price that is not a whole number of ticks raises OffTickError instead.
+    """
+    try:
+        price = decimal.Decimal(text.strip())
+    except decimal.InvalidOperation:
+        raise ValueError(f"invalid price: {text!r}")
+    if not price.is_finite():
+        raise ValueError(f"invalid price: {text!r}")
+    scaled = price.scaleb(tick_size.decimals) / tick_size.units
+    count = scaled.to_integral_value(decimal.ROUND_HALF_EVEN)
+    if exact and count != scaled:
+        raise OffTickError(f"The price {text.strip()} is not a multiple of the tick size {format_ticks(1, tick_size)}.")
+    return int(count)
+
+
+def to_ticks(prices, tick_size):
+    """int64 tick counts of numeric prices and the mask of finite, non-negative ones."""
+    arr = np.atleast_1d(np.asarray(prices))
+    if arr.dtype.kind in 'iu' and tick_size == UNIT_TICK:
+        ticks = arr.astype(np.int64, copy=False)
+        return ticks, (ticks >= 0) & (ticks <= engine.MAX_PRICE)
+    arr = arr.astype(np.float64)
+    scale = 10.0 ** tick_size.decimals / tick_size.units
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = np.rint(arr * scale)
+        valid = np.isfinite(scaled) & (scaled >= 0) & (scaled <= engine.MAX_PRICE)
+    return np.where(valid, scaled, 0).astype(np.int64), valid
+
+
+def price_to_ticks(price, tick_size):
+    """Tick count of one float price, rounded half-even like to_ticks."""
+    return round(price * 10 ** tick_size.decimals / tick_size.units)
+
+
+def from_ticks(ticks, tick_size):
+    """Tick counts as float64 prices (the nearest double to each exact price)."""
+    return np.asarray(ticks, dtype=np.int64) * tick_size.units / 10 ** tick_size.decimals
+
+
+def format_ticks(ticks, tick_size):
+    """Exact decimal text of one tick count, e.g. 11246 at 0.0001 -> '1.1246'."""
+    scaled = int(ticks) * tick_size.units
+    if not tick_size.decimals:
+        return str(scaled)
+    sign = '-' if scaled < 0 else ''
+    whole, fraction = divmod(abs(scaled), 10 ** tick_size.decimals)
+    return f"{sign}{whole}.{fraction:0{tick_size.decimals}d}"
+
+
+# --- Methods ---
+
+def gann_box_ticks(ticks, sentiment, tick_size=UNIT_TICK, depth=engine.GANN_BOX_DEPTH):
+    """GANN BOX in ticks: the gate comes from the digits of the price as written."""
+    if tick_size == UNIT_TICK:
+        return engine.gann_box_levels(ticks, sentiment, depth)
+    sign = engine.sentiment_sign(sentiment)
+    ticks = np.atleast_1d(np.asarray(ticks, dtype=np.int64))
+    valid = (ticks >= 0) & (ticks <= engine.MAX_PRICE // tick_size.units)
+    digits = np.where(valid, ticks, 0) * tick_size.units
+    valid &= digits >= engine.MIN_INT_PRICE
+    gates = engine.gate_values(engine.digital_root(np.where(valid, digits, 0)))
+    steps = np.arange(1, depth + 1, dtype=np.int64)
+    levels = ticks[:, None] + sign * gates[:, None] * steps
+    levels[~valid] = 0
+    return levels, valid
+
+
+def lvl369_ticks(ticks, sentiment, tick_size=UNIT_TICK):
+    """369 LVL in ticks: the anchor shifted by 3, 6 and 9 ticks."""
+    if tick_size == UNIT_TICK:
+        return engine.lvl369_levels(ticks, sentiment)
+    sign = engine.sentiment_sign(sentiment)
+    ticks = np.atleast_1d(np.asarray(ticks, dtype=np.int64))
+    bound = engine.MAX_PRICE // tick_size.units
+    valid = (ticks >= -bound) & (ticks <= bound)
+    # Negative anchors are accepted, as in engine.lvl369_levels.
+    valid &= (ticks < 0) | (ticks * tick_size.units >= engine.MIN_INT_PRICE)
+    levels = ticks[:, None] + sign * np.cumsum(engine.LVL369_STEPS, dtype=np.int64)
+    levels[~valid] = 0
+    return levels, valid
+
+
+def _exact_square_root_ticks(ticks, offset, tick_size):
+    with decimal.localcontext() as context:
+        context.prec = EXACT_PRECISION
+        size = decimal.Decimal(tick_size.units).scaleb(-tick_size.decimals)
+        root = (ticks * size).sqrt() + decimal.Decimal(offset)
+        return int((root * root / size).to_integral_value(decimal.ROUND_HALF_EVEN))
+
+
+def square_root_ticks(ticks, offsets, tick_size=UNIT_TICK):
+    """``(sqrt(price) + offset) ** 2`` in ticks, exact even near half ticks.
+
+    ``ticks`` (non-negative) and ``offsets`` (in price units) broadcast
+    together, e.g. a column of anchors against a row of offsets.
+    """
+    ticks, offsets = np.broadcast_arrays(np.atleast_1d(np.asarray(ticks, dtype=np.int64)), np.asarray(offsets))
+    size = tick_size.units / 10 ** tick_size.decimals
+    roots = np.sqrt(ticks * size) + offsets
+    exact = roots * roots / size
+    rounded = np.rint(exact)
+    # Floats can only put the wrong side of a half tick when they land next to one.
+    near_tie = np.abs(np.abs(exact - rounded) - 0.5) <= TIE_TOLERANCE + exact * TIE_RELATIVE_TOLERANCE
+    levels = rounded.astype(np.int64)
+    for index in zip(*np.nonzero(near_tie)):
+        levels[index] = _exact_square_root_ticks(int(ticks[index]), offsets[index].item(), tick_size)
+    return levels
+
+
+def rev_lvl_ticks(ticks, sentiment, tick_size=UNIT_TICK):
+    """REV LVL rounded to the nearest tick (half-even), exact even near half ticks."""
+    sign = engine.sentiment_sign(sentiment)
+    ticks = np.atleast_1d(np.asarray(ticks, dtype=np.int64))
+    valid = (ticks >= 0) & (ticks <= engine.MAX_PRICE)
+    levels = square_root_ticks(np.where(valid, ticks, 0)[:, None], sign * engine.REV_LVL_STEP, tick_size)
+    levels[~valid] = 0
+    return levels, valid
+
+
+def middle_l_ticks(high_ticks, low_ticks):
+    """Middle L in ticks: round(sqrt(high * low)) in integer arithmetic."""
+    highs = np.atleast_1d(np.asarray(high_ticks, dtype=np.int64))
+    lows = np.atleast_1d(np.asarray(low_ticks, dtype=np.int64))
+    if highs.shape != lows.shape:
+        raise ValueError("highs and lows must have the same length")
+    valid = (highs >= 0) & (lows >= 0) & (highs <= engine.MAX_PRICE) & (lows <= engine.MAX_PRICE)
+    highs = np.where(valid, highs, 0)
+    lows = np.where(valid, lows, 0)
+    fits = highs <= MAX_INT64_PRODUCT // np.maximum(lows, 1)
+    products = np.where(fits, highs * np.where(fits, lows, 0), 0)
+
+    # Float sqrt is within one of isqrt here; fix it up, then round: sqrt(n)
+    # rounds up exactly when n > r*r + r, as n is an integer and never a tie.
+    roots = np.sqrt(products.astype(np.float64)).astype(np.int64)
+    roots -= roots * roots > products
+    roots += (roots + 1) * (roots + 1) <= products
+    roots += products - roots * roots > roots
+    for i in np.flatnonzero(~fits):
+        product = int(highs[i]) * int(lows[i])
+        root = math.isqrt(product)
+        roots[i] = root + (product - root * root > root)
+
+    levels = roots[:, None]
+    levels[~valid] = 0
+    return levels, valid
+
+
+TICK_METHODS = {
+    'gann_box': gann_box_ticks,
+    'lvl369': lvl369_ticks,
+    'rev_lvl': rev_lvl_ticks,
+}
+
+
+def price_levels(method, prices, sentiment, tick_size):
+    """Numeric prices in, tick-aligned float prices out; Middle L takes (highs, lows)."""
+    if method == 'middle_l':
+        highs, valid_high = to_ticks(prices[0], tick_size)
+        lows, valid_low = to_ticks(prices[1], tick_size)
+        levels, valid = middle_l_ticks(highs, lows)
+        valid &= valid_high & valid_low
+    else:
+        anchors, valid = to_ticks(prices, tick_size)
+        levels, method_valid = TICK_METHODS[method](anchors, sentiment, tick_size)
+        valid &= method_valid
+    levels = from_ticks(levels, tick_size)
+    levels[~valid] = np.nan
+    return levels, valid
+
+
+# --- Instruments ---
+
+def load_tick_sizes(path):
+    """{symbol: TickSize} from a CSV with symbol and tick_size columns."""
+    tick_sizes = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            tick_sizes[row['symbol'].strip()] = parse_tick_size(row['tick_size'])
+    return tick_sizes
+
+
+def tick_sizes_from_env():
+    """The table named by GANN_TICK_SIZES, or an empty one."""
+    path = os.environ.get('GANN_TICK_SIZES')
+    return load_tick_sizes(path) if path else {}
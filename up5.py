@@ -1,11 +1,136 @@
+import sys
+
+if __name__ == "__main__" and sys.argv[1:] and sys.argv[1] not in ("--feed", "--replay"):
+    # python up5.py anchors.csv out.csv [options] is batch.py, which needs neither Tk nor the GUI modules.
+    import batch
+    sys.exit(batch.main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, filedialog
 import tkinter.messagebox as messagebox
-import math
-import pyperclip
-import sys
-import threading
-import random
+import bisect
+import os
+import time
+
+import cache
+import chart
+import engine
+import export
+import ladder
+import metrics
+import ticks
+
+# Shared by every program frame so repeated anchors are not recomputed.
+LEVEL_CACHE = cache.LevelCache()
+metrics.register_collector(lambda: LEVEL_CACHE.metric_samples('gui'))
+# Every level calculated in this session, for "save file".
+SESSION_LOG = export.CalculationLog()
+# Every calculation is also appended here (see journal.py) so the next start can restore it.
+JOURNAL = None
+# Tick size of the instrument the calculators work on (use_instrument); None when there is none.
+INSTRUMENT_TICK_SIZE = None
+# The last levels calculated by each program, drawn on the chart: method -> (sentiment, prices).
+CALCULATED_LEVELS = {}
+# REV LVL and Middle L results show at least this many decimals.
+DISPLAY_DECIMALS = 2
+# GANN BOX levels added each time the results are scrolled past the end.
+LADDER_PAGE = 10
+
+def show_input_error(method, message):
+    """Shows an invalid-input dialog and counts it per method."""
+    metrics.count('gann_validation_failures_total', method=method)
+    messagebox.showerror("Invalid Input", message)
+
+def copy_to_clipboard(text):
+    """Copies text with pyperclip, which is only imported on the first copy."""
+    try:
+        import pyperclip
+    except ImportError:
+        return False
+    try:
+        pyperclip.copy(text)
+    except pyperclip.PyperclipException:
+        return False
+    return True
+
+def set_entry(entry, value):
+    """Replaces the text of an Entry widget."""
+    entry.delete(0, tk.END)
+    entry.insert(0, str(value))
+
+def use_instrument(tick_size):
+    """Reads typed prices on an instrument's tick (from GANN_TICK_SIZES); None stops."""
+    global INSTRUMENT_TICK_SIZE
+    INSTRUMENT_TICK_SIZE = tick_size
+
+def read_price(text, default_tick=None, min_decimals=0):
+    """
+    Parses a typed price into (tick count, tick size). The tick is the
+    instrument's, else ``default_tick``, else the coarsest one that holds the
+    price, so "2000" and "2000.0" are the same price. Off-tick prices are a
+    ValueError, never rounded.
+    """
+    tick_size = INSTRUMENT_TICK_SIZE or default_tick or ticks.tick_size_of(text, min_decimals)
+    return ticks.text_to_ticks(text, tick_size, exact=True), tick_size
+
+def price_error(error, message):
+    """The dialog text for a read_price error: the tick for off-tick prices, else ``message``."""
+    return str(error) if isinstance(error, ticks.OffTickError) else message
+
+def format_levels(levels, tick_size, decimals=None):
+    """Display text for levels: exact for tick counts, else ``decimals`` places."""
+    if tick_size is not None:
+        return [ticks.format_ticks(level, tick_size) for level in levels]
+    if decimals is None:
+        return [str(level) for level in levels]
+    return [f"{level:.{decimals}f}" for level in levels]
+
+def feed_anchor_text(price, tick_size, whole=False):
+    """Entry text for a feed anchor: on the instrument's tick, or rounded for whole-number methods."""
+    if tick_size is not None:
+        return ticks.format_ticks(ticks.price_to_ticks(price, tick_size), tick_size)
+    return round(price) if whole else price
+
+def record_levels(method, anchor, sentiment, levels, tick_size):
+    """Logs a calculation for "save file", converting tick counts back to prices."""
+    if tick_size is not None:
+        if method == 'middle_l':
+            anchor = tuple(ticks.from_ticks(anchor, tick_size).tolist())
+        else:
+            anchor = float(ticks.from_ticks(anchor, tick_size))
+        levels = ticks.from_ticks(levels, tick_size)
+    SESSION_LOG.record(method, anchor, sentiment, levels)
+    CALCULATED_LEVELS[method] = (sentiment, [float(level) for level in levels])
+    if JOURNAL is not None:
+        try:
+            JOURNAL.record(method, anchor, sentiment, levels, tick_size)
+        except Exception as e:
+            disable_journal(e)
+
+def disable_journal(error):
+    """Turns the journal off after a failed write; calculations and saves go on without it."""
+    global JOURNAL
+    failed, JOURNAL = JOURNAL, None
+    try:
+        failed.close()
+    except OSError:
+        pass
+    messagebox.showwarning("Journal Disabled", f"Calculations are no longer journaled: {error}")
+
+def restored_calculation(calculations, method):
+    """The newest journaled ``method`` calculation as (sentiment, anchor, levels, tick size), or None."""
+    found = [calculation for (name, _), calculation in calculations.items() if name == method]
+    if not found:
+        return None
+    calculation = max(found, key=lambda calculation: calculation.timestamp)
+    anchor, levels, tick_size = calculation.anchor, calculation.levels, calculation.tick_size
+    if tick_size is not None:
+        if method == 'middle_l':
+            anchor = tuple(ticks.price_to_ticks(price, tick_size) for price in anchor)
+        else:
+            anchor = ticks.price_to_ticks(anchor, tick_size)
+        levels = ticks.to_ticks(levels, tick_size)[0]
+    return calculation.sentiment, anchor, levels, tick_size
 
 # --- Styles Configuration ---
 def configure_styles():
@@ -53,50 +178,45 @@ class GannBoxProgram(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg='#333333') # Semi-transparent gray for background effect
         self.last_result = ""
+        self.sentiment = 'bullish'
+        # Lazy ladder of the shown anchor, for levels beyond the first ten.
+        self.ladder = None
+        self.ladder_tick_size = None
+        self.shown_levels = 0
         self.create_widgets()
 
     def sum_digits(self, n):
-        s = sum(int(digit) for digit in str(n))
-        return s if s < 10 else self.sum_digits(s)
+        return engine.digital_root(n)
 
     def get_gate_value(self, n):
-        if n in [1, 4, 7]:
-            return 12
-        elif n in [2, 5, 8]:
-            return 15
-        elif n in [3, 6, 9]:
-            return 18
-        else:
-            return None
+        if 0 < n < len(engine.GATE_TABLE):
+            return engine.gate_values(n)
+        return None
 
     def calculate_levels(self, price_level, sentiment):
         try:
-            lvl = int(price_level)
-            if len(str(lvl)) < 2:
-                messagebox.showerror("Invalid Input", "Please enter a price with at least 2 digits.")
-                return None
-
-            single_digit_sum = self.sum_digits(lvl)
-            gate_value = self.get_gate_value(single_digit_sum)
-
-            if gate_value is None:
-                messagebox.showerror("Invalid Input", "The sum of digits did not match any gate.")
-                return None
-
-            results = []
-            current_lvl = lvl
-            for i in range(10):
-                if sentiment == 'bullish':
-                    current_lvl += gate_value
-                else:
-                    current_lvl -= gate_value
-                results.append(current_lvl)
-            return results
-
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid number for the price.")
+            lvl, tick_size = read_price(price_level, ticks.UNIT_TICK)
+        except ValueError as e:
+            show_input_error('gann_box', price_error(e, "Please enter a valid number for the price."))
             return None
 
+        levels = LEVEL_CACHE.levels('gann_box', lvl, sentiment, tick_size)
+        if levels is None:
+            price = lvl * tick_size.units
+            if price < 0:
+                show_input_error('gann_box', "Please enter a valid number for the price.")
+            elif price < engine.MIN_INT_PRICE:
+                show_input_error('gann_box', "Please enter a price with at least 2 digits.")
+            elif price <= engine.MAX_PRICE and not engine.gate_values(engine.digital_root(lvl)):
+                show_input_error('gann_box', "The sum of digits did not match any gate.")
+            else:
+                show_input_error('gann_box', "The price is outside the supported range.")
+            return None
+        record_levels('gann_box', lvl, sentiment, levels, tick_size)
+        self.ladder = ladder.GannLadder(lvl, sentiment, tick_size)
+        self.ladder_tick_size = tick_size
+        return format_levels(levels, tick_size)
+
     def create_widgets(self):
         main_frame = tk.Frame(self, padx=20, pady=20, bg=self['bg'])
         main_frame.pack(expand=True, fill="both")
@@ -126,6 +246,9 @@ class GannBoxProgram(tk.Frame):
 
         self.results_text = tk.Text(main_frame, height=12, width=30, font=("Arial", 12), wrap=tk.WORD, state=tk.DISABLED, bg=self['bg'], fg="white")
         self.results_text.pack(pady=10)
+        # Scrolling down past the last level reveals deeper ones.
+        for sequence in ('<MouseWheel>', '<Button-5>', '<Down>', '<Next>'):
+            self.results_text.bind(sequence, self.on_results_scroll, add='+')
 
         copy_button = ttk.Button(
             main_frame,
@@ -135,10 +258,14 @@ class GannBoxProgram(tk.Frame):
         )
         copy_button.pack(pady=5)
 
+    @metrics.timed('gann_gui_action_seconds', action='gann_box.update_results')
     def update_results(self, sentiment):
+        self.sentiment = sentiment
         price_level = self.price_entry.get()
         calculated_levels = self.calculate_levels(price_level, sentiment)
-        
+        self.show_levels(sentiment, calculated_levels)
+
+    def show_levels(self, sentiment, calculated_levels):
         self.results_text.config(state=tk.NORMAL)
         self.results_text.delete("1.0", tk.END)
         
@@ -148,17 +275,62 @@ class GannBoxProgram(tk.Frame):
                 results_string += f"Level {i}: {level}\n"
             self.last_result = results_string
             self.results_text.insert(tk.END, results_string)
+            self.shown_levels = len(calculated_levels)
         else:
             self.last_result = ""
+            self.ladder = None
 
         self.results_text.config(state=tk.DISABLED)
 
+    def on_results_scroll(self, event):
+        if getattr(event, 'delta', 0) > 0:
+            return
+        # The Text scrolls after this binding, so check the position once it has.
+        self.after_idle(self.extend_levels_at_end)
+
+    def extend_levels_at_end(self):
+        if self.ladder is not None and self.results_text.yview()[1] >= 1.0:
+            self.extend_levels()
+
+    def extend_levels(self, count=LADDER_PAGE):
+        """Appends the next ``count`` levels from the ladder without rebuilding the text."""
+        first = self.shown_levels + 1
+        values = format_levels(self.ladder.levels(count, first), self.ladder_tick_size)
+        lines = "".join(f"Level {k}: {value}\n" for k, value in enumerate(values, first))
+        self.results_text.config(state=tk.NORMAL)
+        self.results_text.insert(tk.END, lines)
+        self.results_text.config(state=tk.DISABLED)
+        self.last_result += lines
+        self.shown_levels += count
+
+    def restore_calculations(self, calculations):
+        """Shows the newest journaled GANN BOX calculation."""
+        restored = restored_calculation(calculations, 'gann_box')
+        if restored is None:
+            return
+        self.sentiment, anchor, levels, tick_size = restored
+        set_entry(self.price_entry, format_levels([anchor], tick_size)[0])
+        self.show_levels(self.sentiment, format_levels(levels, tick_size))
+        self.ladder = ladder.GannLadder(anchor, self.sentiment, tick_size)
+        self.ladder_tick_size = tick_size
+
+    def show_feed_update(self, update):
+        """Re-anchors on the feed's session high (bullish) or low (bearish)."""
+        anchor = update.high if self.sentiment == 'bullish' else update.low
+        set_entry(self.price_entry, feed_anchor_text(anchor, update.tick_size, whole=True))
+        levels = update.levels[('gann_box', self.sentiment)]
+        self.show_levels(self.sentiment, levels and format_levels(levels, update.tick_size))
+        if levels:
+            if update.tick_size is not None:
+                anchor = ticks.price_to_ticks(anchor, update.tick_size)
+            self.ladder = ladder.GannLadder(round(anchor), self.sentiment, update.tick_size)
+            self.ladder_tick_size = update.tick_size
+
     def copy_result(self):
         if self.last_result:
-            try:
-                pyperclip.copy(self.last_result)
+            if copy_to_clipboard(self.last_result):
                 messagebox.showinfo("Copied", "Results copied to clipboard!")
-            except pyperclip.PyperclipException:
+            else:
                 messagebox.showerror("Copy Error", "Could not copy to clipboard. Ensure pyperclip is configured.")
 
 class Lvl369Program(tk.Frame):
@@ -166,6 +338,7 @@ class Lvl369Program(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg='#333333') # Semi-transparent gray
         self.last_result = ""
+        self.sentiment = 'bullish'
         self.create_widgets()
 
     def create_widgets(self):
@@ -193,75 +366,71 @@ class Lvl369Program(tk.Frame):
         )
         copy_button.pack(pady=5)
 
-    def calculate_bullish(self, price_level):
+    def calculate(self, price_level, sentiment):
+        message = "Please enter a valid price level (a number with at least 2 digits)."
         try:
-            price = int(price_level)
-            if len(str(price)) < 2:
-                messagebox.showerror("Invalid Input", "Please enter a valid price level (a number with at least 2 digits).")
-                return None, None, None
-            
-            last_two_digits = price % 100
-            
-            new_last_two_digits_3 = last_two_digits + 3
-            level_3 = (price // 100) * 100 + new_last_two_digits_3
-            
-            new_last_two_digits_6 = new_last_two_digits_3 + 6
-            level_6 = (price // 100) * 100 + new_last_two_digits_6
-            
-            new_last_two_digits_9 = new_last_two_digits_6 + 9
-            level_9 = (price // 100) * 100 + new_last_two_digits_9
-            
-            return level_3, level_6, level_9
-        
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid price level (a number with at least 2 digits).")
+            price, tick_size = read_price(price_level, ticks.UNIT_TICK)
+            levels = LEVEL_CACHE.levels('lvl369', price, sentiment, tick_size)
+        except ValueError as e:
+            message = price_error(e, message)
+            levels = None
+        if levels is None:
+            show_input_error('lvl369', message)
             return None, None, None
+        record_levels('lvl369', price, sentiment, levels, tick_size)
+        level_3, level_6, level_9 = format_levels(levels, tick_size)
+        return level_3, level_6, level_9
+
+    def calculate_bullish(self, price_level):
+        return self.calculate(price_level, 'bullish')
 
     def calculate_bearish(self, price_level):
-        try:
-            price = int(price_level)
-            if len(str(price)) < 2:
-                messagebox.showerror("Invalid Input", "Please enter a valid price level (a number with at least 2 digits).")
-                return None, None, None
-                
-            last_two_digits = price % 100
-            
-            new_last_two_digits_3 = last_two_digits - 3
-            level_3 = (price // 100) * 100 + new_last_two_digits_3
-            
-            new_last_two_digits_6 = new_last_two_digits_3 - 6
-            level_6 = (price // 100) * 100 + new_last_two_digits_6
-            
-            new_last_two_digits_9 = new_last_two_digits_6 - 9
-            level_9 = (price // 100) * 100 + new_last_two_digits_9
-            
-            return level_3, level_6, level_9
-        
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid price level (a number with at least 2 digits).")
-            return None, None, None
+        return self.calculate(price_level, 'bearish')
     
     def copy_result(self):
         if self.last_result:
-            try:
-                pyperclip.copy(self.last_result)
+            if copy_to_clipboard(self.last_result):
                 messagebox.showinfo("Copied", "Results copied to clipboard!")
-            except pyperclip.PyperclipException:
+            else:
                 messagebox.showerror("Copy Error", "Could not copy to clipboard. Ensure pyperclip is configured.")
 
+    def show_levels(self, levels):
+        level_3, level_6, level_9 = levels
+        self.last_result = f"Level 3: {level_3}\nLevel 6: {level_6}\nLevel 9: {level_9}"
+        self.result_label.config(text=self.last_result)
+
+    @metrics.timed('gann_gui_action_seconds', action='lvl369.bullish')
     def bullish_action(self):
+        self.sentiment = 'bullish'
         price_level = self.entry_price.get()
         level_3, level_6, level_9 = self.calculate_bullish(price_level)
         if level_3 is not None:
-            self.last_result = f"Level 3: {level_3}\nLevel 6: {level_6}\nLevel 9: {level_9}"
-            self.result_label.config(text=self.last_result)
+            self.show_levels((level_3, level_6, level_9))
 
+    @metrics.timed('gann_gui_action_seconds', action='lvl369.bearish')
     def bearish_action(self):
+        self.sentiment = 'bearish'
         price_level = self.entry_price.get()
         level_3, level_6, level_9 = self.calculate_bearish(price_level)
         if level_3 is not None:
-            self.last_result = f"Level 3: {level_3}\nLevel 6: {level_6}\nLevel 9: {level_9}"
-            self.result_label.config(text=self.last_result)
+            self.show_levels((level_3, level_6, level_9))
+
+    def restore_calculations(self, calculations):
+        """Shows the newest journaled 369 LVL calculation."""
+        restored = restored_calculation(calculations, 'lvl369')
+        if restored is None:
+            return
+        self.sentiment, anchor, levels, tick_size = restored
+        set_entry(self.entry_price, format_levels([anchor], tick_size)[0])
+        self.show_levels(format_levels(levels, tick_size))
+
+    def show_feed_update(self, update):
+        """Re-anchors on the feed's session high (bullish) or low (bearish)."""
+        anchor = update.high if self.sentiment == 'bullish' else update.low
+        set_entry(self.entry_price, feed_anchor_text(anchor, update.tick_size, whole=True))
+        levels = update.levels[('lvl369', self.sentiment)]
+        if levels is not None:
+            self.show_levels(format_levels(levels, update.tick_size))
 
 
 class RevLvlProgram(tk.Frame):
@@ -269,6 +438,7 @@ class RevLvlProgram(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg='#333333') # Semi-transparent gray
         self.last_result = ""
+        self.sentiment = 'bullish'
         self.create_widgets()
 
     def create_widgets(self):
@@ -306,37 +476,51 @@ class RevLvlProgram(tk.Frame):
         self.result_label = tk.Label(self, text="Waiting for input...", bg=self['bg'], fg="white", font=("Arial", 14, "bold"))
         self.result_label.pack(expand=True, anchor="center", pady=10)
     
-    def calculate_bullish(self):
+    @metrics.timed('gann_gui_action_seconds', action='rev_lvl.calculate')
+    def calculate(self, sentiment):
+        self.sentiment = sentiment
         try:
-            price = float(self.price_entry.get())
-            if price < 0:
-                messagebox.showerror("Invalid Input", "Price cannot be negative.")
-                return
+            price, tick_size = read_price(self.price_entry.get(), min_decimals=DISPLAY_DECIMALS)
+        except ValueError as e:
+            show_input_error('rev_lvl', price_error(e, "Please enter a valid number for the price."))
+            return
 
-            x = math.sqrt(price)
-            y = x + 2
-            final_price = y ** 2
-            self.last_result = f"Final Bullish Price: {final_price:.2f}"
-            self.result_label.config(text=self.last_result)
+        levels = LEVEL_CACHE.levels('rev_lvl', price, sentiment, tick_size)
+        if levels is None:
+            # Non-negative prices are only rejected when they are too large to compute.
+            show_input_error('rev_lvl', "Price cannot be negative." if price < 0
+                             else "Please enter a valid number for the price.")
+            return
 
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid number for the price.")
+        record_levels('rev_lvl', price, sentiment, levels, tick_size)
+        self.show_level(sentiment, format_levels(levels, tick_size)[0])
 
-    def calculate_bearish(self):
-        try:
-            price = float(self.price_entry.get())
-            if price < 0:
-                messagebox.showerror("Invalid Input", "Price cannot be negative.")
-                return
+    def show_level(self, sentiment, final_price):
+        self.last_result = f"Final {sentiment.capitalize()} Price: {final_price}"
+        self.result_label.config(text=self.last_result)
 
-            x = math.sqrt(price)
-            y = x - 2
-            final_price = y ** 2
-            self.last_result = f"Final Bearish Price: {final_price:.2f}"
-            self.result_label.config(text=self.last_result)
+    def restore_calculations(self, calculations):
+        """Shows the newest journaled REV LVL calculation."""
+        restored = restored_calculation(calculations, 'rev_lvl')
+        if restored is None:
+            return
+        self.sentiment, anchor, levels, tick_size = restored
+        set_entry(self.price_entry, format_levels([anchor], tick_size)[0])
+        self.show_level(self.sentiment, format_levels(levels, tick_size, DISPLAY_DECIMALS)[0])
+
+    def show_feed_update(self, update):
+        """Re-anchors on the feed's session high (bullish) or low (bearish)."""
+        anchor = update.high if self.sentiment == 'bullish' else update.low
+        set_entry(self.price_entry, feed_anchor_text(anchor, update.tick_size))
+        levels = update.levels[('rev_lvl', self.sentiment)]
+        if levels is not None:
+            self.show_level(self.sentiment, format_levels(levels, update.tick_size, DISPLAY_DECIMALS)[0])
+
+    def calculate_bullish(self):
+        self.calculate('bullish')
 
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter a valid number for the price.")
+    def calculate_bearish(self):
+        self.calculate('bearish')
 
 class MiddleLProgram(tk.Frame):
     """A Frame containing the Middle L calculation program widgets."""
@@ -377,31 +561,474 @@ class MiddleLProgram(tk.Frame):
         )
         self.copy_button.pack(side=tk.RIGHT)
 
+    @metrics.timed('gann_gui_action_seconds', action='middle_l.calculate')
     def calculate_and_display(self):
+        high_text, low_text = self.entry_high.get(), self.entry_low.get()
         try:
-            price_high = float(self.entry_high.get())
-            price_low = float(self.entry_low.get())
+            # Without an instrument both prices go onto the finer of the ticks they need.
+            tick_size = INSTRUMENT_TICK_SIZE or ticks.TickSize(1, max(
+                ticks.tick_size_of(text, DISPLAY_DECIMALS).decimals for text in (high_text, low_text)))
+            anchor = (read_price(high_text, tick_size)[0], read_price(low_text, tick_size)[0])
+        except ValueError as e:
+            show_input_error('middle_l', price_error(e, "Please enter valid numbers."))
+            return
 
-            if price_high < 0 or price_low < 0:
-                messagebox.showerror("Invalid Input", "Prices cannot be negative.")
-                return
+        levels = LEVEL_CACHE.levels('middle_l', anchor, None, tick_size)
+        if levels is None:
+            show_input_error('middle_l', "Prices cannot be negative.")
+            return
 
-            result = math.sqrt(price_high * price_low)
-            self.last_result = f"Result: {result:.2f}"
-            self.result_label.config(text=self.last_result)
+        record_levels('middle_l', anchor, None, levels, tick_size)
+        self.show_result(format_levels(levels, tick_size)[0])
 
-        except ValueError:
-            messagebox.showerror("Invalid Input", "Please enter valid numbers.")
+    def show_result(self, result):
+        self.last_result = f"Result: {result}"
+        self.result_label.config(text=self.last_result)
+
+    def restore_calculations(self, calculations):
+        """Shows the newest journaled Middle L calculation."""
+        restored = restored_calculation(calculations, 'middle_l')
+        if restored is None:
+            return
+        _, anchor, levels, tick_size = restored
+        high, low = format_levels(anchor, tick_size)
+        set_entry(self.entry_high, high)
+        set_entry(self.entry_low, low)
+        self.show_result(format_levels(levels, tick_size, DISPLAY_DECIMALS)[0])
+
+    def show_feed_update(self, update):
+        """Re-anchors on the feed's session high and low."""
+        set_entry(self.entry_high, feed_anchor_text(update.high, update.tick_size))
+        set_entry(self.entry_low, feed_anchor_text(update.low, update.tick_size))
+        levels = update.levels[('middle_l', None)]
+        if levels is not None:
+            self.show_result(format_levels(levels, update.tick_size, DISPLAY_DECIMALS)[0])
 
     def copy_result(self):
         if self.last_result:
-            try:
-                result_value = self.last_result.split(": ")[1]
-                pyperclip.copy(result_value)
+            result_value = self.last_result.partition(": ")[2]
+            if result_value and copy_to_clipboard(result_value):
                 messagebox.showinfo("Copied", f"'{result_value}' copied to clipboard!")
-            except (IndexError, pyperclip.PyperclipException):
+            else:
                 messagebox.showerror("Copy Error", "Could not copy to clipboard. Ensure pyperclip is configured.")
 
+# Watchlist columns: (title, width in characters, level key or None for prices).
+WATCHLIST_COLUMNS = (
+    ("Symbol", 10, None),
+    ("Last", 12, None),
+    ("High", 12, None),
+    ("Low", 12, None),
+    ("GANN +", 12, ('gann_box', 'bullish')),
+    ("GANN -", 12, ('gann_box', 'bearish')),
+    ("369 +", 12, ('lvl369', 'bullish')),
+    ("369 -", 12, ('lvl369', 'bearish')),
+    ("REV +", 12, ('rev_lvl', 'bullish')),
+    ("REV -", 12, ('rev_lvl', 'bearish')),
+    ("MID", 12, ('middle_l', None)),
+)
+WATCHLIST_FONT = ("Courier", 11)
+WATCHLIST_HEADER_FONT = ("Courier", 11, "bold")
+
+def watchlist_row(update):
+    """Cell texts for one feed.LevelUpdate: prices, then the first level of each method."""
+    tick_size = update.tick_size
+    cells = [update.symbol]
+    for price in (update.price, update.high, update.low):
+        cells.append(feed_anchor_text(price, tick_size) if tick_size is not None else f"{price:.{DISPLAY_DECIMALS}f}")
+    for _, _, key in WATCHLIST_COLUMNS[4:]:
+        levels = update.levels.get(key)
+        decimals = DISPLAY_DECIMALS if key[0] in ('rev_lvl', 'middle_l') else None
+        cells.append(format_levels(levels[:1], tick_size, decimals)[0] if levels else "-")
+    return tuple(cells)
+
+class WatchlistProgram(tk.Frame):
+    """Levels for every symbol on the feed, in a virtualized table.
+
+    Only the rows that fit on screen exist as canvas text items. Scrolling
+    re-points that pool at other symbols, and live updates patch just the
+    cells whose text changed; everything is redrawn at most once per idle.
+    """
+    def __init__(self, master=None):
+        super().__init__(master, bg='#333333')
+        self.symbols = []           # sorted
+        self.rows = {}              # symbol -> cell texts
+        self.dirty = set()
+        self.first_row = 0
+        self.cells = []             # pool: one list of text item ids per visible row
+        self.cell_text = []         # text currently shown by each pooled item
+        self._layout_changed = True
+        self._render_job = None
+        self.create_widgets()
+
+    def create_widgets(self):
+        import tkinter.font as tkfont
+
+        font = tkfont.Font(font=WATCHLIST_FONT)
+        self.row_height = font.metrics('linespace') + 4
+        char_width = font.measure('0')
+        self.column_x = []
+        x = 6
+        for _, width, _ in WATCHLIST_COLUMNS:
+            self.column_x.append(x)
+            x += width * char_width
+
+        self.header = tk.Canvas(self, height=self.row_height + 4, bg='#222222', highlightthickness=0)
+        self.header.grid(row=0, column=0, sticky='ew')
+        for (title, _, _), column_x in zip(WATCHLIST_COLUMNS, self.column_x):
+            self.header.create_text(column_x, 4, text=title, anchor='nw', fill="#FFD700", font=WATCHLIST_HEADER_FONT)
+
+        self.canvas = tk.Canvas(self, bg=self['bg'], highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky='nsew')
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_rows(-1))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_rows(1))
+        self.canvas.bind('<Enter>', lambda e: self.canvas.focus_set())
+        self.canvas.bind('<Up>', lambda e: self.scroll_rows(-1))
+        self.canvas.bind('<Down>', lambda e: self.scroll_rows(1))
+        self.canvas.bind('<Prior>', lambda e: self.scroll_rows(-len(self.cells)))
+        self.canvas.bind('<Next>', lambda e: self.scroll_rows(len(self.cells)))
+        self.bind('<Map>', lambda e: self.schedule_render(layout=True))
+
+    # --- Model ---
+
+    def show_feed_updates(self, updates):
+        """Takes {symbol: LevelUpdate}; new symbols are inserted in order."""
+        for symbol, update in updates.items():
+            row = watchlist_row(update)
+            old = self.rows.get(symbol)
+            if old == row:
+                continue
+            if old is None:
+                self.symbols.insert(bisect.bisect_left(self.symbols, symbol), symbol)
+                self._layout_changed = True
+            self.rows[symbol] = row
+            self.dirty.add(symbol)
+        if self.dirty:
+            self.schedule_render()
+
+    # --- Scrolling ---
+
+    def max_first_row(self):
+        return max(0, len(self.symbols) - len(self.cells))
+
+    def scroll_rows(self, count):
+        self.scroll_to(self.first_row + count)
+
+    def scroll_to(self, first_row):
+        first_row = min(max(0, int(first_row)), self.max_first_row())
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self.schedule_render(layout=True)
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if args[0] == 'moveto':
+            self.scroll_to(round(float(args[1]) * len(self.symbols)))
+        elif args[0] == 'scroll':
+            step = len(self.cells) if args[2] == 'pages' else 1
+            self.scroll_rows(int(args[1]) * step)
+
+    def on_resize(self, event):
+        """Grows or shrinks the pool of row items to what fits on screen."""
+        visible = max(1, event.height // self.row_height + 1)
+        while len(self.cells) < visible:
+            y = len(self.cells) * self.row_height + 2
+            self.cells.append([
+                self.canvas.create_text(x, y, text="", anchor='nw', fill="white", font=WATCHLIST_FONT)
+                for x in self.column_x
+            ])
+            self.cell_text.append([""] * len(WATCHLIST_COLUMNS))
+        while len(self.cells) > visible:
+            for item in self.cells.pop():
+                self.canvas.delete(item)
+            self.cell_text.pop()
+        self.first_row = min(self.first_row, self.max_first_row())
+        self.schedule_render(layout=True)
+
+    # --- Rendering ---
+
+    def schedule_render(self, layout=False):
+        self._layout_changed |= layout
+        if self._render_job is None:
+            self._render_job = self.after_idle(self.render)
+
+    def render(self):
+        """Writes the visible rows: every pooled row after a scroll, else only dirty symbols."""
+        self._render_job = None
+        if not self.winfo_ismapped():
+            return
+        if self._layout_changed:
+            self._layout_changed = False
+            self.dirty.clear()
+            for slot in range(len(self.cells)):
+                self.write_row(slot)
+            total = len(self.symbols)
+            if total:
+                self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + len(self.cells)) / total))
+            else:
+                self.scrollbar.set(0.0, 1.0)
+            return
+        dirty, self.dirty = self.dirty, set()
+        last_row = self.first_row + len(self.cells)
+        for symbol in dirty:
+            index = bisect.bisect_left(self.symbols, symbol)
+            if self.first_row <= index < last_row:
+                self.write_row(index - self.first_row)
+
+    def write_row(self, slot):
+        """Patches the cells of one pooled row whose text differs from the model."""
+        index = self.first_row + slot
+        row = self.rows[self.symbols[index]] if index < len(self.symbols) else ("",) * len(WATCHLIST_COLUMNS)
+        shown = self.cell_text[slot]
+        items = self.cells[slot]
+        for column, text in enumerate(row):
+            if shown[column] != text:
+                self.canvas.itemconfigure(items[column], text=text)
+                shown[column] = text
+
+CHART_FONT = ("Arial", 9)
+CHART_AXIS_WIDTH = 70
+CHART_PRICE_LABELS = 5
+CHART_DEFAULT_SPAN = 2000
+CHART_MIN_SPAN = 20
+CHART_ZOOM_STEP = 1.25
+CHART_LINE_COLOR = "#4FC3F7"
+CHART_LEVEL_COLORS = {'bullish': "#66BB6A", 'bearish': "#EF5350", None: "#FFD700"}
+CHART_METHOD_NAMES = {'gann_box': "GANN BOX", 'lvl369': "369 LVL", 'rev_lvl': "REV LVL", 'middle_l': "MIDDLE L"}
+
+class ChartProgram(tk.Frame):
+    """Price chart of the followed symbol with its levels drawn across it.
+
+    The series is decimated to the canvas width (see chart.py). The price
+    line, level lines and axis labels are a fixed set of canvas items that
+    pan, zoom and live updates move with coords() instead of recreating.
+    """
+    def __init__(self, master=None):
+        super().__init__(master, bg='#333333')
+        self.series = chart.PriceSeries()
+        self.symbol = None
+        self.feed_levels = []       # (method, sentiment, price) from the latest feed update
+        self.start = 0
+        self.span = CHART_DEFAULT_SPAN
+        self.follow = True          # keep the newest price in view as prices arrive
+        self.decimation = 'minmax'
+        self.level_items = []       # pool: [line id, label id, shown state]
+        self.label_items = []       # (text id, shown state) of the price axis
+        self.title_text = ""
+        self._drag = None
+        self._render_job = None
+        self.create_widgets()
+
+    def create_widgets(self):
+        toolbar = tk.Frame(self, bg=self['bg'])
+        toolbar.pack(fill="x", padx=5, pady=5)
+        self.title_label = tk.Label(toolbar, text="No prices yet", bg=self['bg'], fg="white", font=("Arial", 11))
+        self.title_label.pack(side="left")
+        load_button = ttk.Button(toolbar, text="Load", command=self.load_prices, style="TransparentYellow.TButton")
+        load_button.pack(side="right")
+
+        self.canvas = tk.Canvas(self, bg='#1E1E1E', highlightthickness=0)
+        self.canvas.pack(expand=True, fill="both")
+        self.price_line = self.canvas.create_line(0, 0, 0, 0, fill=CHART_LINE_COLOR, state='hidden')
+        for _ in range(CHART_PRICE_LABELS):
+            item = self.canvas.create_text(0, 0, text="", anchor='e', fill="#AAAAAA", font=CHART_FONT)
+            self.label_items.append([item, None])
+
+        self.canvas.bind('<Configure>', lambda e: self.schedule_render())
+        self.canvas.bind('<ButtonPress-1>', self.on_drag_start)
+        self.canvas.bind('<B1-Motion>', self.on_drag)
+        self.canvas.bind('<MouseWheel>', lambda e: self.zoom(CHART_ZOOM_STEP if e.delta < 0 else 1 / CHART_ZOOM_STEP, e.x))
+        self.canvas.bind('<Button-4>', lambda e: self.zoom(1 / CHART_ZOOM_STEP, e.x))
+        self.canvas.bind('<Button-5>', lambda e: self.zoom(CHART_ZOOM_STEP, e.x))
+        self.canvas.bind('<Enter>', lambda e: self.canvas.focus_set())
+        self.canvas.bind('<End>', lambda e: self.follow_latest())
+        self.canvas.bind('<l>', lambda e: self.toggle_decimation())
+        self.bind('<Map>', lambda e: self.schedule_render())
+
+    # --- Data ---
+
+    def append_prices(self, prices):
+        """Appends the charted symbol's (symbol, timestamp, price) ticks."""
+        if self.symbol is None and prices:
+            self.symbol = prices[0][0]
+        rows = [(timestamp, price) for symbol, timestamp, price in prices if symbol == self.symbol]
+        if not rows:
+            return
+        timestamps, values = zip(*rows)
+        self.series.extend(timestamps, values)
+        if self.follow:
+            self.start = max(0, len(self.series) - self.span)
+        self.schedule_render()
+
+    def show_feed_update(self, update):
+        """Draws the feed's levels for the charted symbol."""
+        if self.symbol is None:
+            self.symbol = update.symbol
+        if update.symbol != self.symbol:
+            return
+        levels = []
+        for (method, sentiment), values in update.levels.items():
+            if values is None:
+                continue
+            if update.tick_size is not None:
+                values = ticks.from_ticks(values, update.tick_size)
+            levels.extend((method, sentiment, float(value)) for value in values)
+        self.feed_levels = levels
+        self.schedule_render()
+
+    def levels(self):
+        """Feed levels plus the last result of each calculator."""
+        levels = list(self.feed_levels)
+        for method, (sentiment, values) in CALCULATED_LEVELS.items():
+            levels.extend((method, sentiment, value) for value in values)
+        return levels
+
+    def load_prices(self):
+        """Replaces the series with one symbol's prices from a tick file (see resample.py)."""
+        path = filedialog.askopenfilename(filetypes=[("Tick files", "*.csv *.parquet *.npy"), ("All files", "*")])
+        if not path:
+            return
+        import resample
+
+        series = chart.PriceSeries()
+        symbol = self.symbol
+        try:
+            for symbols, timestamps, _, _, _, prices in resample.iter_chunks(path):
+                if symbol is None and len(symbols):
+                    symbol = str(symbols[0])
+                rows = symbols == symbol
+                series.extend(timestamps[rows], prices[rows])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load Error", f"Could not read prices: {e}")
+            return
+        if not len(series):
+            messagebox.showerror("Load Error", f"No prices for {symbol} in:\n{path}")
+            return
+        self.series = series
+        self.symbol = symbol
+        self.set_view(0, len(series))
+
+    # --- View ---
+
+    def set_view(self, start, span):
+        self.span = max(CHART_MIN_SPAN, int(span))
+        self.start = min(max(0, int(start)), max(0, len(self.series) - self.span))
+        self.follow = self.start + self.span >= len(self.series)
+        self.schedule_render()
+
+    def zoom(self, factor, x):
+        """Zooms around the sample under canvas position ``x``."""
+        fraction = x / max(1, self.canvas.winfo_width() - CHART_AXIS_WIDTH)
+        span = min(round(self.span * factor), max(CHART_MIN_SPAN, len(self.series)))
+        self.set_view(self.start + (self.span - span) * fraction, span)
+
+    def on_drag_start(self, event):
+        self._drag = (event.x, self.start)
+
+    def on_drag(self, event):
+        x, start = self._drag
+        plot_width = max(1, self.canvas.winfo_width() - CHART_AXIS_WIDTH)
+        self.set_view(start - (event.x - x) * self.span / plot_width, self.span)
+
+    def follow_latest(self):
+        self.set_view(len(self.series) - self.span, self.span)
+
+    def toggle_decimation(self):
+        self.decimation = 'lttb' if self.decimation == 'minmax' else 'minmax'
+        self.schedule_render()
+
+    # --- Rendering ---
+
+    def schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self.render)
+
+    def render(self):
+        """Moves the pooled items to the current view."""
+        self._render_job = None
+        if not self.winfo_ismapped():
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        plot_width = max(1, width - CHART_AXIS_WIDTH)
+        xs, ys = self.series.view(self.start, self.start + self.span, plot_width, self.decimation)
+        levels = self.levels()
+        if len(ys):
+            low, high = float(ys.min()), float(ys.max())
+        elif levels:
+            low, high = min(level[2] for level in levels), max(level[2] for level in levels)
+        else:
+            low = high = None
+        if low is not None:
+            padding = (high - low) * 0.05 or abs(high) * 0.001 or 1.0
+            low, high = low - padding, high + padding
+
+        if low is not None and len(xs) >= 2:
+            coords = chart.to_pixels(xs, ys, self.start, self.span, low, high, plot_width, height)
+            self.canvas.coords(self.price_line, *coords)
+            self.canvas.itemconfigure(self.price_line, state='normal')
+        else:
+            self.canvas.itemconfigure(self.price_line, state='hidden')
+        if low is None:
+            levels = []
+        else:
+            levels = [level for level in levels if low <= level[2] <= high]
+        self.write_levels(levels, low, high, plot_width, height)
+        self.write_price_labels(low, high, width, height)
+
+        title = f"{self.symbol}  {len(self.series):,} prices  ({self.decimation})" if self.symbol else "No prices yet"
+        if title != self.title_text:
+            self.title_label.config(text=title)
+            self.title_text = title
+
+    def write_levels(self, levels, low, high, plot_width, height):
+        """Points the level pool at ``levels``; only items whose line or label changed are touched."""
+        while len(self.level_items) < len(levels):
+            line = self.canvas.create_line(0, 0, 0, 0, dash=(4, 2), state='hidden')
+            label = self.canvas.create_text(0, 0, text="", anchor='sw', font=CHART_FONT, state='hidden')
+            self.level_items.append([line, label, None])
+        for slot, item in enumerate(self.level_items):
+            state = None
+            if slot < len(levels):
+                method, sentiment, price = levels[slot]
+                y = round((high - price) * (height - 1) / (high - low), 1)
+                state = (y, plot_width, f"{CHART_METHOD_NAMES[method]} {price:.10g}", CHART_LEVEL_COLORS[sentiment])
+            if state == item[2]:
+                continue
+            line, label, _ = item
+            item[2] = state
+            if state is None:
+                self.canvas.itemconfigure(line, state='hidden')
+                self.canvas.itemconfigure(label, state='hidden')
+                continue
+            y, plot_width, text, color = state
+            self.canvas.coords(line, 0, y, plot_width, y)
+            self.canvas.coords(label, 2, y - 1)
+            self.canvas.itemconfigure(line, fill=color, state='normal')
+            self.canvas.itemconfigure(label, text=text, fill=color, state='normal')
+
+    def write_price_labels(self, low, high, width, height):
+        labels = chart.price_labels(low, high, CHART_PRICE_LABELS) if low is not None else []
+        for slot, item in enumerate(self.label_items):
+            state = None
+            if slot < len(labels):
+                price, text = labels[slot]
+                state = (width - 4, round((high - price) * (height - 1) / (high - low), 1), text)
+            if state == item[1]:
+                continue
+            item[1] = state
+            if state is None:
+                self.canvas.itemconfigure(item[0], state='hidden')
+                continue
+            x, y, text = state
+            self.canvas.coords(item[0], x, y)
+            self.canvas.itemconfigure(item[0], text=text, state='normal')
+
 class HowToUseProgram(tk.Frame):
     """A frame to display the "how to use" instructions."""
     def __init__(self, master=None):
@@ -446,6 +1073,19 @@ https://www.instagram.com/mk_algo1
 
 
 # --- Main Application ---
+
+# The star field is drawn from a few pre-rendered tiles laid out in a grid, so
+# a resize only adds the tiles a bigger canvas needs. The density matches the
+# original 200 stars on a 1280x720 canvas, so star count scales with area.
+STAR_COLORS = ("#FFFFCC", "#E0E0E0", "#FFD700") # Pale yellow, light gray, gold
+STAR_TILE_SIZE = 256
+STAR_TILE_VARIANTS = 4
+STARS_PER_TILE = 200 * STAR_TILE_SIZE * STAR_TILE_SIZE // (1280 * 720)
+STAR_REDRAW_DELAY_MS = 100
+
+# Live feed updates are applied at most once per display frame.
+FEED_REFRESH_MS = 16
+
 class Application(tk.Frame):
     """
     A GUI application class that manages all program functionalities
@@ -475,24 +1115,67 @@ class Application(tk.Frame):
         
         # Display frame for programs (now centered)
         self.display_frame = tk.Frame(self.bg_canvas, bg='#333333', relief='raised', borderwidth=2)
+        self.display_frame.grid_rowconfigure(0, weight=1)
+        self.display_frame.grid_columnconfigure(0, weight=1)
         
+        # Program frames are built on first use and kept, so switching
+        # programs keeps the entered prices and results.
+        self.program_frames = {}
         self.active_frame = None
+        # Optional callback(program_class, seconds) called once a switch has been drawn.
+        self.on_program_switch = None
+        self.last_switch_time = None
+        self.price_feed = None
+        self.feed_symbol = None
+        self.latest_feed_update = None
+        self.feed_stats = None
+        self.title_text = ""
+        # Newest journaled calculation per (method, sentiment), shown by frames as they are built.
+        self.restored_calculations = {}
+        # Newest update of every symbol seen on the feed, for the watchlist.
+        self.feed_updates = {}
+        self.star_tiles = []
+        self.star_cells = {}
+        self._star_job = None
         self.create_widgets()
-        self.draw_stars()
+        # Stars are drawn once the canvas has a size, and again after resizes.
+        self.bg_canvas.bind('<Configure>', self.on_canvas_configure)
+
+    def on_canvas_configure(self, event):
+        """Debounces resizes so a window drag redraws the stars once."""
+        if self._star_job is not None:
+            self.after_cancel(self._star_job)
+        self._star_job = self.after(STAR_REDRAW_DELAY_MS, self.draw_stars)
         
+    def render_star_tile(self, rng):
+        """Renders one transparent tile with a random pattern of stars."""
+        tile = tk.PhotoImage(width=STAR_TILE_SIZE, height=STAR_TILE_SIZE)
+        for _ in range(STARS_PER_TILE):
+            size = rng.randint(1, 3)
+            x = rng.randrange(STAR_TILE_SIZE - size)
+            y = rng.randrange(STAR_TILE_SIZE - size)
+            tile.put(rng.choice(STAR_COLORS), to=(x, y, x + size, y + size))
+        return tile
+
     def draw_stars(self):
-        """Draws a random pattern of stars on the background canvas."""
-        self.bg_canvas.delete("stars")
+        """Covers the background canvas with star tiles, adding only missing ones."""
+        import random
+
+        self._star_job = None
+        if not self.star_tiles:
+            self.star_tiles = [self.render_star_tile(random) for _ in range(STAR_TILE_VARIANTS)]
+
         width = self.bg_canvas.winfo_width()
         height = self.bg_canvas.winfo_height()
-        
-        num_stars = 200
-        for _ in range(num_stars):
-            x = random.randint(0, width)
-            y = random.randint(0, height)
-            size = random.randint(1, 3)
-            color = random.choice(["#FFFFCC", "#E0E0E0", "#FFD700"]) # Pale yellow, light gray, gold
-            self.bg_canvas.create_oval(x, y, x + size, y + size, fill=color, outline=color, tags="stars")
+        columns = -(-width // STAR_TILE_SIZE)
+        rows = -(-height // STAR_TILE_SIZE)
+        for row in range(rows):
+            for column in range(columns):
+                if (column, row) not in self.star_cells:
+                    self.star_cells[(column, row)] = self.bg_canvas.create_image(
+                        column * STAR_TILE_SIZE, row * STAR_TILE_SIZE,
+                        image=random.choice(self.star_tiles), anchor='nw', tags="stars"
+                    )
             
     def create_widgets(self):
         """
@@ -541,6 +1224,24 @@ class Application(tk.Frame):
         )
         btn_middle_l.pack(pady=5, expand=True)
         self.btn_middle_l = btn_middle_l
+
+        btn_watchlist = ttk.Button(
+            program_frame,
+            text="WATCHLIST",
+            command=self.show_watchlist,
+            **btn_style
+        )
+        btn_watchlist.pack(pady=5, expand=True)
+        self.btn_watchlist = btn_watchlist
+
+        btn_chart = ttk.Button(
+            program_frame,
+            text="CHART",
+            command=self.show_chart,
+            **btn_style
+        )
+        btn_chart.pack(pady=5, expand=True)
+        self.btn_chart = btn_chart
         
         # Frame for "how to use" button in the bottom left
         instructions_frame = tk.Frame(self, bg='black')
@@ -582,20 +1283,120 @@ class Application(tk.Frame):
         )
         btn_exit.pack(side=tk.LEFT, padx=5)
 
+    @metrics.timed('gann_gui_action_seconds', action='show_program')
     def show_program(self, program_class):
         """
-        Clears the display frame and shows the new program.
+        Shows the program in the display frame, building it only the first time.
         """
-        # Destroy existing widgets in the display frame
-        for widget in self.display_frame.winfo_children():
-            widget.destroy()
+        start = time.perf_counter()
 
         # Place the display frame in the center of the canvas
         self.display_frame.place(relx=0.5, rely=0.5, anchor='center', relwidth=0.5, relheight=0.5)
 
-        # Create and pack the new program frame
-        self.active_frame = program_class(self.display_frame)
-        self.active_frame.pack(expand=True, fill='both')
+        frame = self.program_frames.get(program_class)
+        if frame is None:
+            frame = program_class(self.display_frame)
+            self.program_frames[program_class] = frame
+            if hasattr(frame, 'restore_calculations'):
+                frame.restore_calculations(self.restored_calculations)
+            if hasattr(frame, 'show_feed_updates'):
+                frame.show_feed_updates(self.feed_updates)
+            if hasattr(frame, 'append_prices') and self.price_feed is not None:
+                frame.symbol = self.feed_symbol
+                frame.append_prices(self.price_feed.drain_prices())
+
+        if self.active_frame is not None and self.active_frame is not frame:
+            self.active_frame.grid_remove()
+        frame.grid(row=0, column=0, sticky='nsew')
+        frame.tkraise()
+        self.active_frame = frame
+        if self.latest_feed_update is not None and hasattr(frame, 'show_feed_update'):
+            frame.show_feed_update(self.latest_feed_update)
+
+        self.after_idle(self.finish_program_switch, program_class, start)
+
+    def finish_program_switch(self, program_class, start):
+        """Records how long the switch took, including the redraw."""
+        self.last_switch_time = time.perf_counter() - start
+        if self.on_program_switch is not None:
+            self.on_program_switch(program_class, self.last_switch_time)
+
+    def restore_session(self, journal):
+        """
+        Takes the previous session's calculations from a journal.Journal: the newest
+        ones go back into their programs and the chart, unsaved ones into "save file".
+        """
+        SESSION_LOG.extend(journal.unsaved())
+        self.restored_calculations = dict(journal.latest)
+        for calculation in sorted(journal.latest.values(), key=lambda calculation: calculation.timestamp):
+            CALCULATED_LEVELS[calculation.method] = (calculation.sentiment, calculation.levels.tolist())
+        try:
+            journal.start_session()
+        except OSError as e:
+            disable_journal(e)
+
+    def attach_feed(self, price_feed, symbol=None):
+        """Starts a feed.PriceFeed (or replay.ReplayFeed) and applies its updates from the Tk loop."""
+        import feed
+
+        self.price_feed = price_feed
+        self.feed_symbol = symbol
+        self.feed_stats = feed.FeedStats()
+        if symbol is not None:
+            use_instrument(price_feed.anchors.tick_sizes.get(symbol, INSTRUMENT_TICK_SIZE))
+        metrics.register_collector(price_feed.metric_samples)
+        if hasattr(price_feed, 'step_speed'):
+            self.master.bind_all('<Control-period>', lambda e: price_feed.step_speed(1))
+            self.master.bind_all('<Control-comma>', lambda e: price_feed.step_speed(-1))
+        price_feed.start()
+        self.after(FEED_REFRESH_MS, self.drain_feed)
+
+    def drain_feed(self):
+        """Applies queued updates: the followed symbol to the calculators, every symbol to the watchlist.
+
+        However many ticks arrived, the widgets are updated once per call,
+        and the next call is timed so the calls keep a FEED_REFRESH_MS cadence.
+        """
+        start = time.perf_counter()
+        chart_frame = self.program_frames.get(ChartProgram)
+        if chart_frame is not None:
+            chart_frame.append_prices(self.price_feed.drain_prices())
+        latest = self.price_feed.drain()
+        if latest:
+            self.feed_updates.update(latest)
+            watchlist = self.program_frames.get(WatchlistProgram)
+            if watchlist is not None:
+                watchlist.show_feed_updates(latest)
+            if self.feed_symbol is None:
+                self.feed_symbol = next(iter(latest))
+            update = latest.get(self.feed_symbol)
+            if update is not None:
+                self.latest_feed_update = update
+                if update.tick_size is not None:
+                    use_instrument(update.tick_size)
+                if self.active_frame is not None and hasattr(self.active_frame, 'show_feed_update'):
+                    self.active_frame.show_feed_update(update)
+            lag = time.perf_counter() - self.price_feed.oldest_queued_at
+            self.feed_stats.observe_lag(lag)
+            metrics.observe('gann_feed_ui_lag_seconds', lag)
+        self.show_feed_title()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.after(max(1, round(FEED_REFRESH_MS - elapsed_ms)), self.drain_feed)
+
+    def show_feed_title(self):
+        """Shows the followed price, plus speed, ticks/s and UI lag while replaying, or why the feed stopped."""
+        title = "GANN PROGRAMS"
+        update = self.latest_feed_update
+        if update is not None:
+            title += f" - {update.symbol} {update.price}"
+        if self.price_feed.error is not None:
+            title += f"  |  feed stopped: {self.price_feed.error}"
+        report = self.feed_stats.sample(self.price_feed.ticks)
+        if hasattr(self.price_feed, 'status_text'):
+            title += f"  |  {self.price_feed.status_text(report)}"
+        if title != self.title_text:
+            self.master.title(title)
+            self.title_text = title
 
     def show_gann_box(self):
         self.show_program(GannBoxProgram)
@@ -608,44 +1409,149 @@ class Application(tk.Frame):
 
     def show_middle_l(self):
         self.show_program(MiddleLProgram)
+
+    def show_watchlist(self):
+        self.show_program(WatchlistProgram)
+
+    def show_chart(self):
+        self.show_program(ChartProgram)
     
     def show_instructions(self):
         self.show_program(HowToUseProgram)
 
+    @metrics.timed('gann_gui_action_seconds', action='clear')
     def clear_action(self):
         self.display_frame.place_forget()
+        if self.active_frame is not None:
+            self.active_frame.grid_remove()
         self.active_frame = None
         messagebox.showinfo("Clear", "Display cleared.")
 
+    @metrics.timed('gann_gui_action_seconds', action='save_file')
     def save_file_action(self):
-        if not self.active_frame or not hasattr(self.active_frame, 'last_result') or not self.active_frame.last_result:
+        """
+        Appends every calculation of the session to a columnar file, or saves
+        the active result as text.
+        """
+        has_result = bool(self.active_frame and getattr(self.active_frame, 'last_result', ""))
+        if not has_result and not len(SESSION_LOG):
             messagebox.showerror("Save Error", "No results to save. Please perform a calculation first.")
             return
 
-        results_to_save = self.active_frame.last_result
-        if isinstance(results_to_save, bytes):
-              results_to_save = results_to_save.decode("utf-8")
-        
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
-            initialfile="gann_results.txt"
+            defaultextension=".npy",
+            filetypes=[
+                ("NumPy records, all calculations", "*.npy"),
+                ("Parquet dataset, all calculations", "*.parquet"),
+                ("Arrow IPC dataset, all calculations", "*.arrow"),
+                ("CSV, all calculations", "*.csv"),
+                ("Text, current result", "*.txt"),
+            ],
+            initialfile="gann_results.npy"
         )
+        if not file_path:
+            return
 
-        if file_path:
+        if file_path.endswith(".txt"):
+            self.save_text_result(file_path)
+            return
+
+        if not len(SESSION_LOG):
+            messagebox.showerror("Save Error", "All calculations have already been saved.")
+            return
+        try:
+            written = SESSION_LOG.flush(file_path)
+        except Exception as e:
+            messagebox.showerror("Save Error", f"An error occurred while saving the file: {e}")
+            return
+        if JOURNAL is not None:
             try:
-                with open(file_path, "w") as f:
-                    f.write(results_to_save)
-                messagebox.showinfo("Success", f"Results successfully saved to:\n{file_path}")
+                JOURNAL.mark_saved()
             except Exception as e:
-                messagebox.showerror("Save Error", f"An error occurred while saving the file: {e}")
+                disable_journal(e)
+        messagebox.showinfo("Success", f"{written} levels appended to:\n{file_path}")
+
+    def save_text_result(self, file_path):
+        if not self.active_frame or not getattr(self.active_frame, 'last_result', ""):
+            messagebox.showerror("Save Error", "No results to save. Please perform a calculation first.")
+            return
+
+        results_to_save = self.active_frame.last_result
+        if isinstance(results_to_save, bytes):
+              results_to_save = results_to_save.decode("utf-8")
+
+        try:
+            with open(file_path, "w") as f:
+                f.write(results_to_save)
+            messagebox.showinfo("Success", f"Results successfully saved to:\n{file_path}")
+        except Exception as e:
+            messagebox.showerror("Save Error", f"An error occurred while saving the file: {e}")
 
     def exit_app(self):
         if messagebox.askyesno("Exit", "Are you sure you want to exit?"):
+            if self.price_feed is not None:
+                self.price_feed.stop()
+            if JOURNAL is not None:
+                JOURNAL.close()
             self.master.destroy()
 
 if __name__ == "__main__":
+    metrics.configure_from_env()
+    args = sys.argv[1:]
+    feed_source = replay_path = None
+    if args[:1] == ["--feed"] and len(args) in (2, 3):
+        # python up5.py --feed ticks.csv|tcp://host:port [SYMBOL]
+        feed_source = args[1]
+        feed_symbol = args[2] if len(args) == 3 else None
+    elif args[:1] == ["--replay"] and len(args) in (2, 3, 4):
+        # python up5.py --replay ticks.csv [SPEED|max [SYMBOL]]
+        import replay
+        replay_path = args[1]
+        feed_symbol = args[3] if len(args) == 4 else None
+        try:
+            replay_speed = replay.parse_speed(args[2] if len(args) >= 3 else 1)
+        except ValueError as e:
+            print(f"up5: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args:
+        # A --feed or --replay with the wrong arguments; batch.main prints the usage.
+        import batch
+        sys.exit(batch.main(args))
+
+    LEVEL_CACHE.path = cache.path_from_env()
+    if LEVEL_CACHE.path:
+        LEVEL_CACHE.load()
+
+    import journal
+    journal_path = journal.path_from_env()
+    if journal_path:
+        try:
+            JOURNAL = journal.Journal(journal_path)
+        except (OSError, ValueError) as e:
+            print(f"up5: journal disabled: {e}", file=sys.stderr)
+
+    # GANN_SYMBOL names the instrument whose GANN_TICK_SIZES tick typed prices are read on.
+    instrument = os.environ.get('GANN_SYMBOL')
+    if instrument:
+        tick_size = ticks.tick_sizes_from_env().get(instrument)
+        if tick_size is None:
+            print(f"up5: GANN_TICK_SIZES has no tick size for {instrument}", file=sys.stderr)
+        use_instrument(tick_size)
+
     root = tk.Tk()
     configure_styles()
     app = Application(master=root)
+    if JOURNAL is not None:
+        app.restore_session(JOURNAL)
+    if feed_source:
+        import feed
+        app.attach_feed(feed.PriceFeed(feed_source, tick_sizes=ticks.tick_sizes_from_env()), feed_symbol)
+    elif replay_path:
+        app.attach_feed(replay.ReplayFeed(replay_path, replay_speed, tick_sizes=ticks.tick_sizes_from_env()),
+                        feed_symbol)
     app.mainloop()
+    if LEVEL_CACHE.path:
+        try:
+            LEVEL_CACHE.save()
+        except OSError as e:
+            print(f"up5: level cache not saved: {e}", file=sys.stderr)